@@ -0,0 +1,144 @@
+"""
+Synthetic DOCX / PPTX / PDF corpus for benchmarks.
+
+Files are small but structurally valid OOXML packages and PDFs, padded with
+incompressible bytes to reach the requested size, so copy/move/hash stages
+see realistic I/O. Generation is deterministic for a given seed.
+"""
+import argparse, random, zipfile
+from pathlib import Path
+
+_CT = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_DOCX_PARTS = {
+    "[Content_Types].xml": _CT + (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Default Extension="bin" ContentType="application/octet-stream"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'),
+    "_rels/.rels": _CT + (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/></Relationships>'),
+}
+
+_PPTX_PARTS = {
+    "[Content_Types].xml": _CT + (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Default Extension="bin" ContentType="application/octet-stream"/>'
+        '<Override PartName="/ppt/presentation.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml"/>'
+        '</Types>'),
+    "_rels/.rels": _CT + (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="ppt/presentation.xml"/></Relationships>'),
+}
+
+
+def _paragraphs(rng: random.Random, n: int) -> list[str]:
+    words = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+    return [" ".join(rng.choice(words) for _ in range(12)) for _ in range(n)]
+
+
+def make_docx(path: Path, size: int, rng: random.Random, pages: int = 3):
+    body = "".join(f"<w:p><w:r><w:t>{t}</w:t></w:r></w:p>" for t in _paragraphs(rng, pages * 20))
+    doc = _CT + (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>")
+    _write_package(path, dict(_DOCX_PARTS, **{"word/document.xml": doc}), "word/media/pad.bin", size, rng)
+
+
+def make_pptx(path: Path, size: int, rng: random.Random, slides: int = 5):
+    ids = "".join(f'<p:sldId id="{256 + i}"/>' for i in range(slides))
+    pres = _CT + (
+        '<p:presentation xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main">'
+        f"<p:sldIdLst>{ids}</p:sldIdLst></p:presentation>")
+    _write_package(path, dict(_PPTX_PARTS, **{"ppt/presentation.xml": pres}), "ppt/media/pad.bin", size, rng)
+
+
+def _write_package(path: Path, parts: dict, pad_name: str, size: int, rng: random.Random):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, text in parts.items():
+            z.writestr(name, text)
+        pad = max(0, size - 2048)
+        if pad:
+            z.writestr(zipfile.ZipInfo(pad_name), rng.randbytes(pad), compress_type=zipfile.ZIP_STORED)
+
+
+def make_pdf(path: Path, size: int, rng: random.Random, pages: int = 3):
+    """Minimal valid PDF: one Helvetica text page per page, plus a padding stream."""
+    objs: list[bytes] = []
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(pages))
+    objs.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objs.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    font_id = 3 + 2 * pages
+    for i in range(pages):
+        lines = _paragraphs(rng, 20)
+        text = "BT /F1 11 Tf 72 760 Td 14 TL " + " ".join(f"({t}) '" for t in lines) + " ET"
+        objs.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                     f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>").encode())
+        data = text.encode("latin-1")
+        objs.append(f"<< /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pad = max(0, size - 4096)
+    if pad:
+        data = rng.randbytes(pad)
+        objs.append(f"<< /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for n, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+MAKERS = {"docx": make_docx, "pptx": make_pptx, "pdf": make_pdf}
+
+# default mix: mostly small office files with a long tail of large ones
+DEFAULT_SIZES = [20_000] * 6 + [250_000] * 3 + [2_000_000]
+
+
+def generate(out_dir: str, count: int = 30, kinds=("docx", "pptx", "pdf"), sizes=None, seed: int = 1) -> list[Path]:
+    rng = random.Random(seed)
+    sizes = sizes or DEFAULT_SIZES
+    root = Path(out_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        size = sizes[i % len(sizes)]
+        p = root / f"{kind}_{i:05d}_{size // 1000}k.{kind}"
+        MAKERS[kind](p, size, rng)
+        paths.append(p)
+    return paths
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate a synthetic benchmark corpus.")
+    ap.add_argument("out_dir")
+    ap.add_argument("-n", "--count", type=int, default=30)
+    ap.add_argument("--kinds", default="docx,pptx,pdf")
+    ap.add_argument("--sizes", help="comma separated byte sizes to cycle through")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",")] if args.sizes else None
+    paths = generate(args.out_dir, args.count, tuple(args.kinds.split(",")), sizes, args.seed)
+    print(f"Wrote {len(paths)} files to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
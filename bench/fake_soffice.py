@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Stand-in for `soffice --convert-to` with controllable timing, for benchmarks.
+
+Understands the arguments convert_with_soffice passes (--convert-to, --outdir,
+-env:UserInstallation, input files) and copies each input to
+<outdir>/<stem>.<target>, so downstream stages see realistic file sizes.
+
+Behaviour is scripted through environment variables:
+
+  FAKE_SOFFICE_STARTUP        seconds of start-up before any work (default 0)
+  FAKE_SOFFICE_FIRST_RUN      extra seconds when the profile dir is empty (default 0)
+  FAKE_SOFFICE_RENDER         seconds per input file (default 0)
+  FAKE_SOFFICE_RENDER_PER_MB  extra seconds per MB of input (default 0)
+  FAKE_SOFFICE_FAIL_MATCH     inputs whose name contains this fail (exit 1)
+  FAKE_SOFFICE_CRASH_MATCH    inputs whose name contains this crash (SIGSEGV / exit 139)
+  FAKE_SOFFICE_HANG_MATCH     inputs whose name contains this hang forever
+"""
+import os, shutil, signal, sys, time
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+
+def _env_float(name: str) -> float:
+    try:
+        return float(os.environ.get(name, "0") or 0)
+    except ValueError:
+        return 0.0
+
+
+def _matches(var: str, path: str) -> bool:
+    pat = os.environ.get(var, "")
+    return bool(pat) and pat in os.path.basename(path)
+
+
+def main(argv: list[str]) -> int:
+    to, outdir, profile, files = None, ".", None, []
+    terminate_after_init = False
+    it = iter(argv)
+    for a in it:
+        if a == "--convert-to":
+            to = next(it)
+        elif a == "--outdir":
+            outdir = next(it)
+        elif a == "--infilter":
+            next(it)
+        elif a.startswith("-env:UserInstallation="):
+            profile = Path(unquote(urlparse(a.split("=", 1)[1]).path))
+        elif a == "--terminate_after_init":
+            terminate_after_init = True
+        elif not a.startswith("-"):
+            files.append(a)
+
+    time.sleep(_env_float("FAKE_SOFFICE_STARTUP"))
+    if profile is not None:
+        marker = profile / "user" / "registrymodifications.xcu"
+        if not marker.exists():
+            time.sleep(_env_float("FAKE_SOFFICE_FIRST_RUN"))
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.write_text("<oor:items/>\n", encoding="utf-8")
+    if terminate_after_init or not to:
+        return 0
+
+    target = to.split(":", 1)[0]
+    status = 0
+    for f in files:
+        if _matches("FAKE_SOFFICE_HANG_MATCH", f):
+            while True:
+                time.sleep(3600)
+        if _matches("FAKE_SOFFICE_CRASH_MATCH", f):
+            if hasattr(signal, "SIGSEGV") and os.name != "nt":
+                os.kill(os.getpid(), signal.SIGSEGV)
+            return 139
+        if not os.path.isfile(f) or _matches("FAKE_SOFFICE_FAIL_MATCH", f):
+            print(f"Error: source file could not be loaded: {f}", file=sys.stderr)
+            status = 1
+            continue
+        size_mb = os.path.getsize(f) / (1 << 20)
+        time.sleep(_env_float("FAKE_SOFFICE_RENDER") + size_mb * _env_float("FAKE_SOFFICE_RENDER_PER_MB"))
+        shutil.copyfile(f, os.path.join(outdir, Path(f).stem + "." + target))
+        print(f"convert {f} -> {target}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
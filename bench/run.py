@@ -0,0 +1,261 @@
+"""
+Conversion pipeline benchmark.
+
+    python -m bench.run                              # run, print a table
+    python -m bench.run --save-baseline              # store results in bench/baseline.json
+    python -m bench.run --check                      # exit 1 on regression vs the baseline
+
+Runs offline on Linux against bench/fake_soffice.py (configurable start-up
+and render delays) and a synthetic corpus from bench/corpus.py. Each
+scenario runs in its own Python process so its peak memory is its own:
+
+  config      load_config() lookups
+  move        utils.atomic_move_with_retries on a 2 MB file
+  single      get_converter(...) one file after another
+  batch       convert_many (grouped soffice runs)
+  concurrent  convert_parallel (one soffice per file, N at a time)
+  pdf2docx    PDF -> DOCX through pdf2docx (only if it is installed)
+  cold_start      one soffice run on a wiped, empty profile, repeated
+  template_start  the same with the profile seeded from the warmed-up template
+
+Reports latency percentiles, files/s and peak RSS. Baselines are machine
+specific: record one on the box that runs --check.
+"""
+import argparse, json, os, resource, shutil, statistics, subprocess, sys, tempfile, time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+BASELINE = HERE / "baseline.json"
+SCENARIOS = ["config", "move", "single", "batch", "concurrent", "pdf2docx", "cold_start", "template_start"]
+
+
+# ---------- scenario bodies (run in a child process) ----------
+def _office_inputs(corpus: Path) -> list[Path]:
+    return sorted(p for p in corpus.iterdir() if p.suffix in (".docx", ".pptx"))
+
+
+def _scenario(name: str, corpus: Path, out: Path, workers: int) -> dict:
+    sys.path.insert(0, str(ROOT))
+    import generation
+    from generation.config import load_config
+    from generation.utils import atomic_move_with_retries
+
+    latencies, errors = [], 0
+    if name == "cold_start":
+        os.environ["PDF_CREATOR_PROFILE_TEMPLATE"] = "0"
+    if name in ("cold_start", "template_start"):
+        from generation import profiles
+        from generation.api_runner import run_office_api
+        config = load_config()
+        profiles.get_template(config)  # one-off build, not part of the measurement
+    t0 = time.perf_counter()
+    if name == "config":
+        for _ in range(2000):
+            s = time.perf_counter()
+            load_config().api_path
+            latencies.append(time.perf_counter() - s)
+    elif name == "move":
+        blob = out / "blob.bin"
+        blob.write_bytes(os.urandom(2 << 20))
+        for i in range(200):
+            dst = out / f"moved_{i % 2}.bin"
+            s = time.perf_counter()
+            atomic_move_with_retries(str(blob), str(dst))
+            latencies.append(time.perf_counter() - s)
+            blob, dst = dst, blob
+    elif name == "single":
+        for p in _office_inputs(corpus):
+            s = time.perf_counter()
+            try:
+                generation.get_converter(p.suffix[1:], "pdf")(str(p), str(out / (p.stem + ".pdf")))
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - s)
+    elif name in ("batch", "concurrent"):
+        pairs = [(str(p), str(out / (p.stem + ".pdf"))) for p in _office_inputs(corpus)]
+        run = generation.convert_many if name == "batch" else generation.convert_parallel
+        for r in run(pairs, max_workers=workers):
+            latencies.append(r.seconds)
+            errors += 0 if r.ok else 1
+    elif name == "pdf2docx":
+        for p in sorted(corpus.glob("*.pdf")):
+            s = time.perf_counter()
+            try:
+                generation.get_converter("pdf", "docx")(str(p), str(out / (p.stem + ".docx")))
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - s)
+    elif name in ("cold_start", "template_start"):
+        profile = out / "profile"
+        src = _office_inputs(corpus)[0]
+        for _ in range(10):
+            s = time.perf_counter()
+            profiles.reset_profile(profile, config)
+            try:
+                run_office_api([profiles.profile_arg(profile), "--headless", "--convert-to", "pdf",
+                                "--outdir", str(out), str(src)], config=config)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - s)
+    wall = time.perf_counter() - t0
+    return {
+        "latencies": latencies,
+        "wall": wall,
+        "errors": errors,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "children_peak_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+# ---------- harness ----------
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, round(q * (len(s) - 1))))
+    return s[k]
+
+
+def summarize(raw: dict) -> dict:
+    lat = raw["latencies"]
+    n = len(lat)
+    return {
+        "count": n,
+        "errors": raw["errors"],
+        "wall_s": round(raw["wall"], 4),
+        "throughput": round(n / raw["wall"], 3) if raw["wall"] > 0 else 0.0,
+        "p50_ms": round(_pct(lat, 0.50) * 1000, 3),
+        "p90_ms": round(_pct(lat, 0.90) * 1000, 3),
+        "p99_ms": round(_pct(lat, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(lat) * 1000, 3) if lat else 0.0,
+        "peak_rss_mb": round(raw["peak_rss_kb"] / 1024, 1),
+        "children_peak_rss_mb": round(raw["children_peak_rss_kb"] / 1024, 1),
+    }
+
+
+def _write_fake_soffice(bin_dir: Path) -> Path:
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    launcher = bin_dir / "soffice"
+    launcher.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{HERE / "fake_soffice.py"}" "$@"\n')
+    launcher.chmod(0o755)
+    return launcher
+
+
+def run_all(args) -> dict:
+    from bench.corpus import generate
+    work = Path(tempfile.mkdtemp(prefix="pdfgen_bench_"))
+    try:
+        corpus = work / "corpus"
+        generate(str(corpus), count=args.files, seed=args.seed)
+        cfg = work / "config.json"
+        cfg.write_text(json.dumps({
+            "api_path": str(_write_fake_soffice(work / "bin")),
+            "soffice_pool": False,
+            "workers": args.workers,
+        }))
+        env = dict(os.environ)
+        for k in [k for k in env if k.startswith("PDF_CREATOR_")]:
+            del env[k]
+        env.update({
+            "PDF_CREATOR_CONFIG": str(cfg),
+            "FAKE_SOFFICE_STARTUP": str(args.startup),
+            "FAKE_SOFFICE_RENDER": str(args.render),
+            "FAKE_SOFFICE_RENDER_PER_MB": str(args.render_per_mb),
+            "FAKE_SOFFICE_FIRST_RUN": str(args.first_run),
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")])),
+        })
+        results = {}
+        for name in args.scenarios:
+            if name == "pdf2docx":
+                try:
+                    import pdf2docx  # noqa
+                except Exception:
+                    print("skip  pdf2docx (not installed)", file=sys.stderr)
+                    continue
+            out = work / f"out_{name}"
+            out.mkdir()
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.run", "--_scenario", name,
+                 "--_corpus", str(corpus), "--_out", str(out), "--workers", str(args.workers)],
+                cwd=str(ROOT), env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise RuntimeError(f"scenario {name} failed:\n{proc.stderr}")
+            results[name] = summarize(json.loads(proc.stdout.strip().splitlines()[-1]))
+        return results
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions: throughput below, or p90 above, the baseline by more than tolerance."""
+    problems = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["throughput"] and cur["throughput"] < base["throughput"] * (1 - tolerance):
+            problems.append(f"{name}: throughput {cur['throughput']} < baseline {base['throughput']}")
+        if base["p90_ms"] and cur["p90_ms"] > base["p90_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p90 {cur['p90_ms']}ms > baseline {base['p90_ms']}ms")
+        if cur["errors"] > base.get("errors", 0):
+            problems.append(f"{name}: {cur['errors']} errors (baseline {base.get('errors', 0)})")
+    return problems
+
+
+def print_table(results: dict):
+    cols = ["count", "errors", "throughput", "p50_ms", "p90_ms", "p99_ms", "peak_rss_mb", "children_peak_rss_mb"]
+    print(f"{'scenario':<16}" + "".join(f"{c:>22}" for c in cols))
+    for name, r in results.items():
+        print(f"{name:<16}" + "".join(f"{r[c]:>22}" for c in cols))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.run", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--files", type=int, default=30, help="corpus size")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--startup", type=float, default=0.2, help="fake soffice start-up seconds")
+    ap.add_argument("--first-run", type=float, default=1.0, help="fake soffice setup seconds on an empty profile")
+    ap.add_argument("--render", type=float, default=0.05, help="fake soffice seconds per file")
+    ap.add_argument("--render-per-mb", type=float, default=0.02, help="fake soffice seconds per MB")
+    ap.add_argument("--baseline", default=str(BASELINE))
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--check", action="store_true", help="exit 1 if results regress against the baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    ap.add_argument("--_scenario", help=argparse.SUPPRESS)
+    ap.add_argument("--_corpus", help=argparse.SUPPRESS)
+    ap.add_argument("--_out", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args._scenario:
+        print(json.dumps(_scenario(args._scenario, Path(args._corpus), Path(args._out), args.workers)))
+        return 0
+
+    args.scenarios = [s for s in args.scenarios.split(",") if s]
+    results = run_all(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    if args.check:
+        try:
+            baseline = json.loads(Path(args.baseline).read_text())
+        except FileNotFoundError:
+            print(f"No baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            return 2
+        problems = compare(results, baseline, args.tolerance)
+        for p in problems:
+            print("REGRESSION " + p, file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 from . import docx_to_pdf, ppt_to_pdf, pdf_to_docx
 from .utils import EXT_MAP, guess_ext
+from .cache import cached_converter
+from .routing import has_route, reachable, routed_converter
 
 _CONVERTERS = {
     ("docx", "pdf"): docx_to_pdf.convert,
@@ -9,11 +11,19 @@ _CONVERTERS = {
 }
 
 def get_converter(src_ext: str, dst_ext: str):
+    # direct or multi-hop; the route itself is planned per file (see routing.py)
     key = (src_ext.lower(), dst_ext.lower())
-    if key not in _CONVERTERS:
+    if not has_route(*key):
         raise RuntimeError(f"Unsupported conversion {src_ext} → {dst_ext}")
-    return _CONVERTERS[key]
+    return cached_converter(key[0], key[1], routed_converter(*key))
 
 def available_targets_for(src_ext: str):
-    s = src_ext.lower()
-    return [dst for (src, dst) in _CONVERTERS.keys() if src == s]
+    return reachable(src_ext.lower())
+
+def available_sources_for(dst_ext: str):
+    d = dst_ext.lower()
+    return sorted({src for (src, _) in _CONVERTERS if d in reachable(src)})
+
+from .parallel import convert_parallel, JobResult
+from .batch import convert_many
+from .streams import convert_bytes, convert_stream
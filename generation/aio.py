@@ -0,0 +1,261 @@
+"""
+asyncio counterpart of get_converter(...)(...).
+
+    await convert_async("in.docx", "out.pdf")
+    results = await convert_many_async(pairs)
+
+LibreOffice conversions run through asyncio.create_subprocess_exec, so a
+queued or running job is a coroutine rather than a blocked thread. Other
+backends (pdf2docx, Word/PowerPoint COM, the UNO pool) are blocking calls and
+run in the loop's default executor. A semaphore, sized like the profile
+slots, caps how many conversions run at once.
+
+Cancelling a task that is running soffice kills the process tree and removes
+the partial output. Executor jobs cannot be interrupted: cancellation returns
+at once, but the thread finishes its current document in the background.
+"""
+import asyncio, os, threading, time, weakref
+from functools import partial
+from pathlib import Path
+from .api_runner import (check_exit, child_memory_limit, get_api_path, job_timeout, kill_tree, new_group_kwargs,
+                         no_window_kwargs, with_memory_limit)
+from .batch import SOFFICE_FILTERS
+from .cache import backend_for, get_cache
+from .config import Config, load_config
+from .errors import BadInput, ConversionError
+from .instrument import conversion, enabled as instrumented, stage
+from .parallel import JobResult
+from . import pdf_optimize, profiles, soffice_pool
+from .profiles import profile_arg, reset_profile
+from .soffice_helper import _SOFFICE_FLAGS, DEFAULT_RETRIES, _find_produced, with_page_range
+from .utils import atomic_move_with_retries, ensure_parent_dir, guess_ext, normalize_pages, remove_if_exists, staging_dir
+
+# one semaphore per event loop; asyncio primitives must not cross loops
+_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _default_limit(config: Config) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _limits.get(loop)
+    if sem is None:
+        sem = _limits[loop] = asyncio.Semaphore(profiles.default_workers(config))
+    return sem
+
+
+async def _wait_for_slot(slots: profiles.ProfileSlots) -> Path:
+    # every slot may be held, possibly by synchronous callers in other threads.
+    # Wait for a release instead of blocking a thread in take(): a cancelled
+    # task could not stop that thread, which would then take a slot nobody releases.
+    loop = asyncio.get_running_loop()
+    freed = asyncio.Event()
+
+    def wake():
+        try:
+            loop.call_soon_threadsafe(freed.set)
+        except RuntimeError:
+            pass  # the loop is closed
+
+    slots.add_waiter(wake)
+    try:
+        while True:
+            p = slots.take(block=False)
+            if p is not None:
+                return p
+            await freed.wait()
+            freed.clear()
+    finally:
+        slots.remove_waiter(wake)
+
+
+async def _off_loop(slots: profiles.ProfileSlots, profile: Path, fn, *args):
+    """
+    fn(*args) on a worker thread, on a profile the caller holds. Seeding and
+    resetting may run soffice for minutes, which must not stall the loop. A
+    cancelled caller cannot stop the thread: the profile is released once fn
+    returns, so on CancelledError the caller must not release it.
+    """
+    lock = threading.Lock()
+    state = {"done": False, "abandoned": False}
+
+    def run():
+        try:
+            return fn(*args)
+        finally:
+            with lock:
+                state["done"] = True
+                if state["abandoned"]:
+                    slots.release(profile)
+
+    try:
+        return await asyncio.to_thread(run)
+    except asyncio.CancelledError:
+        with lock:
+            state["abandoned"] = not state["done"]
+            if state["done"]:
+                slots.release(profile)
+        raise
+
+
+async def _acquire_profile(slots: profiles.ProfileSlots) -> Path:
+    p = await _wait_for_slot(slots)
+    try:
+        await _off_loop(slots, p, slots.prepare, p)
+    except asyncio.CancelledError:
+        raise
+    except BaseException:
+        slots.release(p)
+        raise
+    return p
+
+
+async def _run_soffice_async(args: list[str], config: Config, timeout: float, input_path: str):
+    api = get_api_path(config)
+    retries = max(0, config.get_int("soffice_retries", DEFAULT_RETRIES))
+    slots = profiles.get_slots(config)
+    for attempt in range(retries + 1):
+        profile = await _acquire_profile(slots)
+        try:
+            cmd = [api, profile_arg(profile), *args]
+            with stage("soffice") as ev:
+                proc = await asyncio.create_subprocess_exec(
+                    *with_memory_limit(cmd, child_memory_limit(config)),
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                    **no_window_kwargs(), **new_group_kwargs())
+                timed_out = None
+                try:
+                    out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+                except asyncio.TimeoutError:
+                    kill_tree(proc)
+                    out, _ = await proc.communicate()
+                    timed_out = timeout
+                    ev.extra["timeout"] = timeout
+                except asyncio.CancelledError:
+                    kill_tree(proc)
+                    await proc.wait()
+                    raise
+                return check_exit(cmd, proc.returncode, out.decode("utf-8", "replace").strip(),
+                                  input_path, timed_out)
+        except ConversionError as e:
+            if not e.retryable or attempt == retries:
+                raise
+            try:
+                await _off_loop(slots, profile, reset_profile, profile, config)
+            except asyncio.CancelledError:
+                profile = None  # released by _off_loop
+                raise
+        finally:
+            if profile is not None:
+                slots.release(profile)
+
+
+async def _convert_with_soffice_async(input_path: str, output_path: str, to_filter: str, config: Config,
+                                      pages: str | None):
+    src = Path(input_path)
+    target_suffix = "." + Path(output_path).suffix.lstrip(".").lower()
+    with stage("prepare"):
+        ensure_parent_dir(output_path)
+        remove_if_exists(output_path)
+    if not src.is_file():
+        raise BadInput(f"Input file not found: {src}", input_path)
+
+    with staging_dir(output_path, "lo_convert_") as tmpdir:
+        run = await _run_soffice_async([
+            *_SOFFICE_FLAGS,
+            "--convert-to", with_page_range(to_filter, guess_ext(input_path), pages),
+            "--outdir", tmpdir,
+            str(src)
+        ], config, job_timeout(config, src.stat().st_size), input_path)
+        with stage("find_output"):
+            produced = _find_produced(Path(tmpdir), src.stem, target_suffix)
+        if produced is None:
+            raise BadInput(f"LibreOffice did not produce {src.stem + target_suffix}: {run.stdout[-300:]}",
+                           input_path, run.returncode, run.stdout)
+        # the move may back off for seconds while the target is locked
+        await asyncio.to_thread(atomic_move_with_retries, str(produced), output_path)
+
+
+def _uses_async_soffice(key: tuple[str, str], config: Config) -> bool:
+    if key not in SOFFICE_FILTERS:
+        return False
+    try:
+        api = get_api_path(config).lower()
+    except Exception:
+        return False
+    return "soffice" in api and not soffice_pool.available(config)
+
+
+async def convert_async(input_path: str, output_path: str, config: Config | None = None, pages=None,
+                        limit: asyncio.Semaphore | None = None):
+    """
+    Convert one file; the target format comes from the output suffix.
+    Raises like the synchronous converters. `limit` overrides the shared
+    per-loop semaphore.
+    """
+    from . import get_converter
+    input_path, output_path = str(input_path), str(output_path)
+    config = config or load_config()
+    pages = normalize_pages(pages)
+    key = (guess_ext(input_path), guess_ext(output_path))
+    converter = get_converter(*key)  # raises for unsupported pairs
+    limit = limit or _default_limit(config)
+
+    async with limit:
+        if not _uses_async_soffice(key, config):
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, partial(converter, input_path, output_path, config=config, pages=pages))
+            return
+
+        backend = backend_for(*key, config) if instrumented() else None
+        with conversion(input_path, output_path, backend):
+            cache = get_cache(config)
+            cache_key = None
+            if cache is not None:
+                try:
+                    cache_key = await asyncio.to_thread(cache.key_for, input_path, *key, config, pages)
+                    if await asyncio.to_thread(cache.fetch, cache_key, output_path):
+                        cache.count(hit=True)
+                        return
+                    cache.count(hit=False)
+                except OSError:
+                    cache_key = None  # unreadable input: let soffice report it
+            try:
+                await _convert_with_soffice_async(input_path, output_path, SOFFICE_FILTERS[key], config, pages)
+            except asyncio.CancelledError:
+                remove_if_exists(output_path)
+                raise
+            await asyncio.to_thread(pdf_optimize.maybe_optimize, output_path, config)
+            if cache_key is not None:
+                try:
+                    await asyncio.to_thread(cache.put, cache_key, output_path)
+                except OSError:
+                    pass
+
+
+async def convert_many_async(pairs, max_workers: int | None = None, on_done=None,
+                             config: Config | None = None) -> list[JobResult]:
+    """
+    Async convert_parallel: (input, output) pairs or (input, output, pages)
+    triples, results in input order with per-file errors. Cancelling the
+    awaiting task cancels every pending conversion.
+    """
+    config = config or load_config()
+    n = max(1, max_workers or profiles.default_workers(config))
+    profiles.set_concurrency(n, config)
+    limit = asyncio.Semaphore(n)
+
+    async def _one(job) -> JobResult:
+        inp, out = str(job[0]), str(job[1])
+        t0 = time.perf_counter()
+        try:
+            await convert_async(inp, out, config, job[2] if len(job) > 2 else None, limit=limit)
+            err = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            err = e
+        res = JobResult(inp, out, err, time.perf_counter() - t0)
+        if on_done:
+            on_done(res)
+        return res
+
+    return list(await asyncio.gather(*(_one(job) for job in pairs)))
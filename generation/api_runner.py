@@ -1,26 +1,203 @@
-import json, subprocess
-from pathlib import Path
-import subprocess
-
-CONFIG_PATH = Path("C:/PDF_Creator/config.json")
-
-def get_api_path() -> str:
-    if not CONFIG_PATH.exists():
-        raise FileNotFoundError(f"Config not found: {CONFIG_PATH}")
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        cfg = json.load(f)
-    api = cfg.get("api_path")
-    if not api:
-        raise RuntimeError("api_path missing in config.json")
-    return api
-
-def run_office_api(args: list[str]):
-    api = get_api_path()
-    # Silence stdout + stderr completely
-    return subprocess.run(
-        [api] + args,
-        check=True,
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        creationflags=subprocess.CREATE_NO_WINDOW  # hide console window on Windows
-    )
+import atexit, multiprocessing, os, signal, subprocess, tempfile, threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .config import Config, load_config
+from .errors import BackendCrash, BadInput, ConversionError, ConversionTimeout
+from .instrument import child_usage, stage
+
+# job timeout = base + per_mb * input size, capped; see job_timeout()
+TIMEOUT_BASE = 60.0
+TIMEOUT_PER_MB = 20.0
+TIMEOUT_MAX = 600.0
+
+# keep the end of the backend's output for error messages
+OUTPUT_TAIL = 4096
+
+# what soffice prints when it cannot open a document (it may still exit 0)
+_BAD_INPUT_MARKERS = ("source file could not be loaded", "general input/output error")
+
+def get_api_path(config: Config | None = None) -> str:
+    return (config or load_config()).api_path
+
+def no_window_kwargs() -> dict:
+    # CREATE_NO_WINDOW only exists on Windows; elsewhere there is no console to hide
+    flag = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    return {"creationflags": flag} if flag else {}
+
+def new_group_kwargs() -> dict:
+    """Popen kwargs that put the child in its own process group, so kill_tree reaches its children."""
+    if os.name == "nt":
+        return {}
+    return {"start_new_session": True}
+
+def kill_tree(proc: subprocess.Popen):
+    """Kill a process started with new_group_kwargs() together with everything it spawned."""
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **no_window_kwargs())
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def child_memory_limit(config: Config | None = None) -> int | None:
+    """Address space in bytes one office process may map ("child_memory_mb", else "memory_budget_mb")."""
+    config = config or load_config()
+    mb = config.get_int("child_memory_mb", 0) or config.get_int("memory_budget_mb", 0)
+    return mb << 20 if mb > 0 else None
+
+def with_memory_limit(cmd: list[str], limit: int | None) -> list[str]:
+    """
+    cmd behind a shell that lowers the address-space limit and execs it, so
+    the launcher and everything it starts (oosplash, soffice.bin) run under
+    the cap from the start and keep cmd's pid. POSIX only; a child that hits
+    the limit fails its allocation and dies. Unlike a preexec_fn this is safe
+    to start from a threaded process.
+    """
+    if not limit or os.name == "nt":
+        return cmd
+    # ulimit -v counts KiB; a shell that cannot lower it still runs cmd
+    script = 'ulimit -v %d 2>/dev/null; exec "$@"' % (limit >> 10)
+    return ["/bin/sh", "-c", script, "sh", *cmd]
+
+def limit_own_memory(limit: int | None):
+    """ProcessPoolExecutor initializer: cap the worker's own address space (POSIX)."""
+    if not limit:
+        return
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, OSError, ValueError):
+        pass
+
+_pools: dict[tuple[int, int | None], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def _process_pool(workers: int, memory_limit: int | None) -> ProcessPoolExecutor:
+    key = (max(1, workers), memory_limit)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ProcessPoolExecutor(
+                max_workers=key[0], mp_context=multiprocessing.get_context("spawn"),
+                initializer=limit_own_memory, initargs=(memory_limit,))
+        return pool
+
+def map_in_processes(fn, tasks: list, workers: int, memory_limit: int | None = None) -> list:
+    """
+    list(map(fn, tasks)) on the process pool shared by every conversion that
+    splits its work across processes (page-parallel pdf2docx, PDF
+    optimization). Jobs running side by side queue their chunks on it instead
+    of each starting `workers` processes. Workers are spawned, not forked:
+    callers usually have threads running.
+    """
+    pool = _process_pool(workers, memory_limit)
+    try:
+        return list(pool.map(fn, tasks))
+    except BrokenProcessPool:
+        # a worker died (e.g. at its memory limit); the next caller gets a new pool
+        with _pools_lock:
+            for key, p in list(_pools.items()):
+                if p is pool:
+                    del _pools[key]
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+@atexit.register
+def _shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def job_timeout(config: Config | None = None, input_bytes: int = 0) -> float:
+    """Seconds one soffice run may take for this much input (soffice_timeout* config keys)."""
+    config = config or load_config()
+    base = float(config.get("soffice_timeout", TIMEOUT_BASE))
+    per_mb = float(config.get("soffice_timeout_per_mb", TIMEOUT_PER_MB))
+    cap = float(config.get("soffice_timeout_max", TIMEOUT_MAX))
+    return min(cap, base + per_mb * input_bytes / (1 << 20))
+
+def crashed(code: int) -> bool:
+    # negative: killed by a signal (POSIX); 128+N: the same through a shell
+    # launcher; 0xC0000000+: Windows exception codes such as access violation
+    return code < 0 or 128 < code < 160 or code >= 0xC0000000
+
+def looks_like_bad_input(output: str) -> bool:
+    low = output.lower()
+    return any(m in low for m in _BAD_INPUT_MARKERS)
+
+def _tail(fh) -> str:
+    fh.seek(0, os.SEEK_END)
+    fh.seek(max(0, fh.tell() - OUTPUT_TAIL))
+    return fh.read().decode("utf-8", "replace").strip()
+
+def _wait(proc: subprocess.Popen, ev) -> int:
+    if not hasattr(os, "wait4"):
+        return proc.wait()
+    # wait4 reaps the child and reports its own CPU time and peak RSS, which
+    # stays correct while other threads run conversions of their own
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    for k, v in child_usage(rusage).items():
+        setattr(ev, k, v)
+    return proc.returncode
+
+def run_office_api(args: list[str], config: Config | None = None, timeout: float | None = None,
+                   input_path: str | None = None) -> subprocess.CompletedProcess:
+    """
+    Run the office binary with args and return its combined output.
+    Raises ConversionTimeout (the whole process tree is killed after `timeout`
+    seconds), BackendCrash (died on a signal / access violation) or
+    ConversionError (other non-zero exit; BadInput if the output says so).
+    """
+    api = get_api_path(config)
+    cmd = [api] + args
+    with stage("soffice" if "soffice" in api.lower() else "office_api") as ev, \
+            tempfile.TemporaryFile() as out:
+        proc = subprocess.Popen(
+            with_memory_limit(cmd, child_memory_limit(config)),
+            stdout=out,
+            stderr=subprocess.STDOUT,
+            **no_window_kwargs(),  # hide console window on Windows
+            **new_group_kwargs()
+        )
+        expired = threading.Event()
+
+        def _on_timeout():
+            if proc.returncode is None:
+                expired.set()
+                kill_tree(proc)
+
+        watchdog = threading.Timer(timeout, _on_timeout) if timeout else None
+        if watchdog:
+            watchdog.daemon = True
+            watchdog.start()
+        try:
+            code = _wait(proc, ev)
+        except BaseException:
+            kill_tree(proc)
+            proc.wait()
+            raise
+        finally:
+            if watchdog:
+                watchdog.cancel()
+        output = _tail(out)
+        if expired.is_set():
+            ev.extra["timeout"] = timeout
+        return check_exit(cmd, code, output, input_path, timeout if expired.is_set() else None)
+
+def check_exit(cmd: list[str], code: int, output: str, input_path: str | None = None,
+               timed_out: float | None = None) -> subprocess.CompletedProcess:
+    """Turn a finished office process into a CompletedProcess or the matching ConversionError."""
+    name = os.path.basename(cmd[0])
+    if timed_out is not None:
+        raise ConversionTimeout(f"{name} exceeded {timed_out:.1f}s and was killed", input_path, code, output)
+    if code != 0:
+        if crashed(code):
+            raise BackendCrash(f"{name} crashed (exit code {code})", input_path, code, output)
+        cls = BadInput if looks_like_bad_input(output) else ConversionError
+        raise cls(f"{name} failed with exit code {code}: {output[-300:]}", input_path, code, output)
+    return subprocess.CompletedProcess(cmd, code, stdout=output)
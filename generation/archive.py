@@ -0,0 +1,173 @@
+"""
+ZIP archives in, ZIP archives out: python -m generation.archive IN.zip OUT.zip [--to pdf]
+
+Members are extracted one at a time into a temp dir beside the output,
+converted with the regular converters, appended to the output archive and
+deleted again. At most `window` members, and roughly `max_temp_mb` of
+extracted input, are on disk at any moment, so temp usage and memory stay
+flat however large the archive is. Results are written in the same order
+as the members, even though several convert at once. Members that cannot be
+converted are copied through unchanged with --keep-others, and left out
+otherwise. The output archive is written under a temporary name and renamed
+into place when complete.
+"""
+import argparse, os, shutil, sys, time, zipfile
+from collections import deque
+from pathlib import PurePosixPath
+from .config import Config, load_config
+from .instrument import stage
+from .parallel import JobResult
+from .profiles import default_workers, set_concurrency
+from .scheduler import Scheduler, estimate
+from .utils import EXT_MAP, atomic_move_with_retries, normalize_pages, remove_if_exists, staging_dir
+
+COPY_BLOCK = 1 << 20
+DEFAULT_TEMP_MB = 1024
+
+
+def _extract(zin: zipfile.ZipFile, info: zipfile.ZipInfo, path: str):
+    with zin.open(info) as src, open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst, COPY_BLOCK)
+
+
+def _copy_member(zin: zipfile.ZipFile, info: zipfile.ZipInfo, zout: zipfile.ZipFile):
+    out_info = zipfile.ZipInfo(info.filename, info.date_time)
+    out_info.compress_type = info.compress_type
+    out_info.external_attr = info.external_attr
+    with zin.open(info) as src, zout.open(out_info, "w", force_zip64=info.file_size > 0x7FFFFFFF) as dst:
+        shutil.copyfileobj(src, dst, COPY_BLOCK)
+
+
+def _output_name(member: str, dst_ext: str, used: set[str]) -> str:
+    p = PurePosixPath(member)
+    name = str(p.with_suffix("." + dst_ext))
+    n = 1
+    while name.lower() in used:
+        # a.docx and a.pptx (or a kept a.pdf) in one folder: keep the source suffix in the name
+        name = str(p.with_name(p.name + ("" if n == 1 else f" ({n})") + "." + dst_ext))
+        n += 1
+    used.add(name.lower())
+    return name
+
+
+def convert_archive(input_zip: str, output_zip: str, dst_ext: str = "pdf", config: Config | None = None,
+                    pages=None, max_workers: int | None = None, window: int | None = None,
+                    max_temp_mb: int | None = None, keep_others: bool = False, on_done=None) -> list[JobResult]:
+    """
+    Convert every supported member of input_zip to dst_ext and write them to
+    output_zip in member order. Returns one JobResult per converted member
+    (input_path/output_path are member names); failed members are left out
+    of the archive and carry their error.
+    """
+    from . import available_sources_for, get_converter
+    config = config or load_config()
+    pages = normalize_pages(pages)
+    sources = set(available_sources_for(dst_ext))
+    if not sources:
+        raise RuntimeError(f"Unsupported target format: {dst_ext}")
+    n = max(1, max_workers or default_workers(config))
+    window = max(1, window or 2 * n)
+    temp_budget = (max_temp_mb or config.get_int("archive_temp_mb", DEFAULT_TEMP_MB)) << 20
+    set_concurrency(n, config)
+
+    results: list[JobResult] = []
+    with zipfile.ZipFile(input_zip) as zin, staging_dir(output_zip, "archive_") as td, \
+            Scheduler(n, config, name="archive") as sched:
+        # members copied through keep their names; converted outputs get out of their way
+        used = {info.filename.lower() for info in zin.infolist() if keep_others and not info.is_dir()
+                and PurePosixPath(info.filename).suffix.lower().lstrip(".") not in sources}
+        part = os.path.join(td, "out.zip")
+        # outputs are PDF/DOCX/PPTX, which are compressed already
+        with zipfile.ZipFile(part, "w", zipfile.ZIP_STORED) as zout:
+            inflight: deque = deque()   # (info, out_name, in_path, out_path, future | None) in member order
+            temp_bytes = 0
+
+            def _drain_one():
+                nonlocal temp_bytes
+                info, out_name, in_path, out_path, fut = inflight.popleft()
+                if fut is None:
+                    _copy_member(zin, info, zout)
+                    return
+                res = fut.result()
+                res.input_path, res.output_path = info.filename, out_name
+                if res.ok:
+                    with stage("archive_write"):
+                        zout.write(out_path, out_name)
+                remove_if_exists(in_path)
+                remove_if_exists(out_path)
+                temp_bytes -= info.file_size
+                results.append(res)
+                if on_done:
+                    on_done(res)
+
+            def _convert(src_ext: str, in_path: str, out_path: str) -> JobResult:
+                t0 = time.perf_counter()
+                try:
+                    get_converter(src_ext, dst_ext)(in_path, out_path, config=config, pages=pages)
+                    err = None
+                except Exception as e:
+                    err = e
+                return JobResult(in_path, out_path, err, time.perf_counter() - t0)
+
+            for i, info in enumerate(zin.infolist()):
+                if info.is_dir():
+                    continue
+                src_ext = PurePosixPath(info.filename).suffix.lower().lstrip(".")
+                if src_ext not in sources:
+                    if keep_others:
+                        # copied when its turn comes, after the members before it
+                        inflight.append((info, None, None, None, None))
+                    continue
+                # bounded temp usage: finish the oldest member before extracting more
+                while inflight and (len(inflight) >= window or temp_bytes + info.file_size > temp_budget):
+                    _drain_one()
+                in_path = os.path.join(td, f"{i:06d}.{src_ext}")
+                out_path = os.path.join(td, f"{i:06d}.{dst_ext}")
+                with stage("archive_read"):
+                    _extract(zin, info, in_path)
+                temp_bytes += info.file_size
+                fut = sched.submit(estimate(in_path, dst_ext, config), _convert, src_ext, in_path, out_path)
+                inflight.append((info, _output_name(info.filename, dst_ext, used), in_path, out_path, fut))
+            while inflight:
+                _drain_one()
+        atomic_move_with_retries(part, output_zip)
+    return results
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m generation.archive",
+                                 description="Convert the documents inside a ZIP archive into a new archive.")
+    ap.add_argument("input")
+    ap.add_argument("output")
+    ap.add_argument("-t", "--to", default="pdf", help="target format (default: pdf)")
+    ap.add_argument("-p", "--pages", help="only convert these pages, 1-based, e.g. 1-3,7")
+    ap.add_argument("-j", "--jobs", type=int, help="parallel conversions (default: CPU count)")
+    ap.add_argument("--window", type=int, help="members in flight at once (default: 2 x jobs)")
+    ap.add_argument("--max-temp-mb", type=int, help=f"extracted input kept on disk (default {DEFAULT_TEMP_MB})")
+    ap.add_argument("--keep-others", action="store_true", help="copy members that are not converted")
+    ap.add_argument("--config", help="path to config.json")
+    args = ap.parse_args(argv)
+
+    dst_ext = EXT_MAP.get(args.to.upper(), args.to.lower().lstrip("."))
+
+    def _report(res):
+        if res.ok:
+            print(f"OK    {res.seconds:8.2f}s  {res.input_path} -> {res.output_path}", flush=True)
+        else:
+            print(f"FAIL  {res.seconds:8.2f}s  {res.input_path}: {res.error}", flush=True)
+
+    t0 = time.perf_counter()
+    try:
+        results = convert_archive(args.input, args.output, dst_ext, load_config(args.config), args.pages,
+                                  args.jobs, args.window, args.max_temp_mb, args.keep_others, _report)
+    except (OSError, RuntimeError, ValueError, zipfile.BadZipFile) as e:
+        print(e, file=sys.stderr)
+        return 2
+    ok = sum(1 for r in results if r.ok)
+    print(f"\n{ok} converted, {len(results) - ok} failed in {time.perf_counter() - t0:.2f}s -> {args.output}",
+          file=sys.stderr)
+    return 0 if ok == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Several backends per conversion pair, picked by measured performance.
+
+Each (src, dst) pair has a list of Backends, e.g. pdf -> docx can use
+pdf2docx, LibreOffice or Word. For every job the selector ranks the
+available ones by expected time to a successful result in the job's size
+bucket:
+
+    (overhead + seconds_per_mb * MB) / success_rate
+
+The cost comes from the same decayed fit as the routing edges, with stats
+kept per backend and size bucket. A backend that has not been measured in a
+bucket is ranked by its prior; the priors reproduce the old fixed choice
+(LibreOffice, pdf2docx for PDF -> DOCX, or Office when api_path is Word), so
+a fresh install behaves as before. With probability
+"backend_explore" (default 0.05) an under-measured backend goes first so it
+gets measured. When a backend raises, the next one is tried; if all fail,
+the first error is raised. BadInput (a missing or rejected document) is
+raised at once and does not count against the backend.
+"""
+import importlib.util, os, random, sys, time
+from dataclasses import dataclass
+from .config import Config, load_config
+from .errors import BadInput
+from .instrument import stage
+from .utils import remove_if_exists
+
+# upper bounds in MB of the size buckets; the last bucket is open ended
+SIZE_BUCKETS = (1, 10, 50)
+MIN_SAMPLES = 3
+DEFAULT_EXPLORE = 0.05
+PREFERRED_FACTOR = 0.1  # prior scale for the backends api_path asks for
+
+
+@dataclass
+class Backend:
+    name: str
+    convert: object                    # convert(input_path, output_path, config, pages)
+    available: object                  # available(config) -> bool
+    prior: tuple[float, float] = (3.0, 1.0)   # (overhead s, s per MB) until measured
+    family: str = "python"             # "soffice", "com" or "python"
+    pages: bool = True                 # honours a page range
+
+
+_BACKENDS: dict[tuple[str, str], list[Backend]] = {}
+
+
+def register(src: str, dst: str, backend: Backend):
+    _BACKENDS.setdefault((src, dst), []).append(backend)
+
+
+def backends_for(src: str, dst: str) -> list[Backend]:
+    return list(_BACKENDS.get((src, dst), []))
+
+
+def available_backends(src: str, dst: str, config: Config | None = None) -> list[str]:
+    config = config or load_config()
+    return [b.name for b in backends_for(src, dst) if b.available(config)]
+
+
+# ---------- availability checks ----------
+def _api(config: Config) -> str:
+    try:
+        return config.api_path.lower()
+    except Exception:
+        return ""
+
+
+def soffice_available(config: Config) -> bool:
+    return "soffice" in _api(config)
+
+
+def com_available(config: Config) -> bool:
+    # Office automation stays opt-in next to LibreOffice: it starts Word/PowerPoint
+    if sys.platform != "win32" or importlib.util.find_spec("win32com") is None:
+        return False
+    return "winword" in _api(config) or config.get_bool("com_backends", False)
+
+
+def module_available(name: str):
+    def _check(config: Config) -> bool:
+        return importlib.util.find_spec(name) is not None
+    return _check
+
+
+# ---------- selection ----------
+def size_bucket(input_bytes: int) -> int:
+    mb = input_bytes / (1 << 20)
+    for i, limit in enumerate(SIZE_BUCKETS):
+        if mb < limit:
+            return i
+    return len(SIZE_BUCKETS)
+
+
+def stats_key(src: str, dst: str, backend: str, bucket: int) -> str:
+    return f"{src}>{dst}@{backend}#{bucket}"
+
+
+def expected_seconds(src: str, dst: str, b: Backend, input_bytes: int, config: Config) -> float:
+    from .routing import get_stats
+    st = get_stats(config).get(stats_key(src, dst, b.name, size_bucket(input_bytes)))
+    mb = input_bytes / (1 << 20)
+    prior = b.prior
+    if b.family == "com" and "winword" in _api(config):
+        # api_path names Word: Office stays first until measurements say otherwise
+        prior = (prior[0] * PREFERRED_FACTOR, prior[1] * PREFERRED_FACTOR)
+    overhead, per_mb = st.model(prior)
+    success = (st.ok + 1) / (st.ok + st.failed + 2)
+    return (overhead + per_mb * mb) / success
+
+
+def rank(src: str, dst: str, input_bytes: int, config: Config | None = None, pages: str | None = None) -> list[Backend]:
+    """Available backends for (src, dst), best first."""
+    from .routing import get_stats
+    config = config or load_config()
+    cands = [b for b in backends_for(src, dst) if b.available(config) and (b.pages or pages is None)]
+    cands.sort(key=lambda b: expected_seconds(src, dst, b, input_bytes, config))
+    explore = float(config.get("backend_explore", DEFAULT_EXPLORE))
+    if len(cands) > 1 and explore > 0 and random.random() < explore:
+        stats = get_stats(config)
+        bucket = size_bucket(input_bytes)
+        fresh = [b for b in cands[1:] if stats.get(stats_key(src, dst, b.name, bucket)).ok < MIN_SAMPLES]
+        if fresh:
+            pick = random.choice(fresh)
+            cands.remove(pick)
+            cands.insert(0, pick)
+    return cands
+
+
+def run_backends(src: str, dst: str, input_path: str, output_path: str, config: Config | None = None,
+                 pages: str | None = None) -> str:
+    """Convert with the best available backend, falling back to the next on failure; returns its name."""
+    from .routing import get_stats
+    config = config or load_config()
+    try:
+        size = os.path.getsize(input_path)
+    except OSError as e:
+        raise BadInput(f"Input file not found: {input_path}", input_path) from e
+    cands = rank(src, dst, size, config, pages)
+    if not cands:
+        names = ", ".join(b.name for b in backends_for(src, dst)) or "none"
+        raise RuntimeError(f"No backend available for {src} → {dst} (registered: {names}); check api_path")
+    stats = get_stats(config)
+    bucket = size_bucket(size)
+    first_err = None
+    for b in cands:
+        key = stats_key(src, dst, b.name, bucket)
+        t0 = time.perf_counter()
+        try:
+            with stage("backend", backend=b.name):
+                b.convert(input_path, output_path, config, pages)
+        except BadInput:
+            # the document is at fault, not the backend: no other backend will
+            # do better, and it must not count against this one's record
+            remove_if_exists(output_path)
+            raise
+        except Exception as e:
+            stats.record(key, size, time.perf_counter() - t0, None, ok=False)
+            remove_if_exists(output_path)
+            if first_err is None:
+                first_err = e
+            else:
+                first_err.add_note(f"{b.name} also failed: {type(e).__name__}: {e}")
+            continue
+        stats.record(key, size, time.perf_counter() - t0, os.path.getsize(output_path))
+        return b.name
+    raise first_err
@@ -0,0 +1,196 @@
+"""
+Many-file conversion that amortizes soffice start-up.
+
+`soffice --convert-to` takes any number of inputs per run, so jobs that
+LibreOffice would handle the same way (same source format, target format and
+output filter) are grouped and each group is converted by as few soffice
+invocations as possible. Groups are split across the profile slots so large
+batches still use every core. Everything else goes through the regular
+one-file converters.
+"""
+import math, time
+from pathlib import Path
+from .api_runner import get_api_path
+from .config import Config, load_config
+from .parallel import JobResult, run_job
+from . import pdf_optimize, profiles, soffice_pool
+from .cache import get_cache
+from .scheduler import JobCost, Scheduler, estimate
+from .journal import Journal
+from .instrument import enabled as instrumented, file_size, stage, tagged
+from .soffice_helper import convert_batch_with_soffice, with_page_range
+from .utils import guess_ext, normalize_pages
+
+# (src, dst) -> soffice --convert-to filter, for pairs LibreOffice handles
+SOFFICE_FILTERS = {
+    ("docx", "pdf"): "pdf",
+    ("ppt", "pdf"): "pdf",
+    ("pptx", "pdf"): "pdf",
+}
+
+# keep command lines well under the Windows 32k limit
+MAX_FILES_PER_RUN = 200
+
+
+def _uses_soffice(config: Config) -> bool:
+    try:
+        api = get_api_path(config).lower()
+    except Exception:
+        return False
+    # the UNO pool already keeps soffice warm; grouping only helps one-shot runs
+    return "soffice" in api and not soffice_pool.available(config)
+
+
+def _split_unique_stems(items: list[int], jobs) -> list[list[int]]:
+    """Split job indices into runs where no two inputs share a file stem."""
+    runs: list[tuple[set, list[int]]] = []
+    for i in items:
+        stem = _stem_key(jobs[i][0])
+        for stems, run in runs:
+            if stem not in stems and len(run) < MAX_FILES_PER_RUN:
+                stems.add(stem)
+                run.append(i)
+                break
+        else:
+            runs.append(({stem}, [i]))
+    return [run for _, run in runs]
+
+
+def _stem_key(path: str) -> str:
+    # Windows file systems are case-insensitive
+    return Path(path).stem.lower()
+
+
+def _chunk(run: list[int], parts: int) -> list[list[int]]:
+    size = max(1, math.ceil(len(run) / parts))
+    return [run[i:i + size] for i in range(0, len(run), size)]
+
+
+def convert_many(pairs, max_workers: int | None = None, on_done=None,
+                 config: Config | None = None, journal: str | Journal | None = None) -> list[JobResult]:
+    """
+    Convert (input_path, output_path) pairs, or (input_path, output_path, pages)
+    triples; results keep the input order and carry per-file errors instead
+    of raising. Jobs with different page ranges use different filters, so
+    they land in different groups.
+    For grouped soffice runs, `seconds` is the run's wall time shared evenly
+    between its files. Files left without output by a group run that timed
+    out or crashed are retried on their own.
+    With a journal (a path or a Journal), progress is recorded as jobs run,
+    and jobs an earlier run already finished are returned as skipped
+    without touching their outputs (see journal.py).
+    """
+    if journal is not None and not isinstance(journal, Journal):
+        with Journal(journal) as j:
+            return convert_many(pairs, max_workers, on_done, config, j)
+    jobs = [(str(p[0]), str(p[1]), normalize_pages(p[2] if len(p) > 2 else None)) for p in pairs]
+    results: list[JobResult | None] = [None] * len(jobs)
+    config = config or load_config()
+    n = max(1, max_workers or profiles.default_workers(config))
+    profiles.set_concurrency(n, config)
+
+    input_fps: dict[int, str | None] = {}
+
+    def _start(k: int):
+        if journal is not None:
+            input_fps[k] = journal.start(*jobs[k])
+
+    def _finish(k: int, res: JobResult):
+        results[k] = res
+        if journal is not None and not res.skipped:
+            journal.finish(*jobs[k], error=res.error, input_fp=input_fps.get(k))
+        if on_done:
+            on_done(res)
+
+    groups: dict[tuple, list[int]] = {}
+    singles: list[int] = []
+    cache = get_cache(config)
+    cache_keys: dict[int, str] = {}
+    use_soffice = _uses_soffice(config)
+    for k, (inp, out, pages) in enumerate(jobs):
+        if journal is not None and journal.completed(inp, out, pages):
+            _finish(k, JobResult(inp, out, skipped=True))
+            continue
+        key = (guess_ext(inp), guess_ext(out))
+        flt = SOFFICE_FILTERS.get(key) if use_soffice else None
+        if flt:
+            flt = with_page_range(flt, key[0], pages)
+        if not flt:
+            # single jobs go through get_converter, which does its own caching
+            singles.append(k)
+            continue
+        if cache is not None:
+            try:
+                cache_keys[k] = cache.key_for(inp, *key, config, pages)
+                if cache.fetch(cache_keys[k], out):
+                    cache.count(hit=True)
+                    _finish(k, JobResult(inp, out))
+                    continue
+                cache.count(hit=False)
+            except OSError:
+                pass  # unreadable input: let soffice report it
+        groups.setdefault(key + (flt,), []).append(k)
+
+    tasks = []
+    for (_, _, flt), idx in groups.items():
+        for run in _split_unique_stems(idx, jobs):
+            for part in _chunk(run, n):
+                tasks.append((flt, part))
+
+    def _run_group(flt: str, idx: list[int]):
+        for k in idx:
+            _start(k)
+        t0 = time.perf_counter()
+        label = f"{jobs[idx[0]][0]} (+{len(idx) - 1} more)" if len(idx) > 1 else jobs[idx[0]][0]
+        with tagged(label, "soffice"), stage("batch", extra={"files": len(idx)}) as ev:
+            if instrumented():
+                ev.input_bytes = sum(file_size(jobs[k][0]) or 0 for k in idx)
+            try:
+                errors = convert_batch_with_soffice([jobs[k][:2] for k in idx], flt, config)
+            except Exception as e:
+                errors = [e] * len(idx)
+            ev.extra["failed"] = sum(1 for err in errors if err is not None)
+            if pdf_optimize.enabled(config):
+                errors = [err if err is not None else _optimize(jobs[k][1]) for k, err in zip(idx, errors)]
+            if instrumented():
+                ev.output_bytes = sum(file_size(jobs[k][1]) or 0 for k, err in zip(idx, errors) if err is None)
+        each = (time.perf_counter() - t0) / len(idx)
+        for k, err in zip(idx, errors):
+            if getattr(err, "retryable", False) and len(idx) > 1:
+                # the run hung or crashed: convert the files it left behind one
+                # by one, so one bad document cannot take the group down with it
+                # (a file alone in its run was retried inside the run already)
+                res = run_job(*jobs[k], config=config)
+                res.seconds += each
+                _finish(k, res)
+                continue
+            if err is None and k in cache_keys:
+                try:
+                    cache.put(cache_keys[k], jobs[k][1])
+                except OSError:
+                    pass
+            _finish(k, JobResult(jobs[k][0], jobs[k][1], err, each))
+
+    def _optimize(output_path: str) -> Exception | None:
+        try:
+            pdf_optimize.maybe_optimize(output_path, config)
+        except Exception as e:
+            return e
+        return None
+
+    def _run_single(k: int):
+        _start(k)
+        _finish(k, run_job(*jobs[k], config=config))
+
+    def _group_cost(idx: list[int]) -> JobCost:
+        # one soffice run opens its files one after the other
+        costs = [estimate(jobs[k][0], guess_ext(jobs[k][1]), config) for k in idx]
+        return JobCost(sum(c.seconds for c in costs), max(c.memory_mb for c in costs))
+
+    with Scheduler(n, config, name="batch") as sched:
+        futures = [sched.submit(_group_cost(idx), _run_group, flt, idx) for flt, idx in tasks]
+        futures += [sched.submit(estimate(jobs[k][0], guess_ext(jobs[k][1]), config), _run_single, k)
+                    for k in singles]
+        for f in futures:
+            f.result()
+    return results
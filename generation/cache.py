@@ -0,0 +1,298 @@
+"""
+Content-addressed cache of conversion outputs.
+
+An entry is keyed by the SHA-256 of the input bytes, the (src, dst) pair, the
+backend that does the conversion and that backend's version, so upgrading
+LibreOffice or pdf2docx never serves stale output. PDF outputs are cached
+after pdf_optimize has run, and its settings are part of the key. On a hit the cached file
+is hardlinked (or copied) to the requested path. The cache is bounded in
+size and evicts least recently used entries. Identical requests that arrive
+while the first one is still converting wait for it instead of converting
+again.
+
+Enabled by setting "cache_dir" in the config or PDF_CREATOR_CACHE_DIR (size
+limit: "cache_max_mb", default 2048). Inspect or purge with
+`python -m generation --cache-stats` / `--cache-purge`.
+"""
+import hashlib, os, stat, tempfile, threading
+from pathlib import Path
+from . import pdf_optimize
+from .api_runner import get_api_path
+from .config import Config, load_config
+from .instrument import conversion, enabled as instrumented, stage
+from .utils import copy_file, ensure_parent_dir, remove_if_exists, normalize_pages
+
+_CHUNK = 1 << 20
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            b = f.read(_CHUNK)
+            if not b:
+                break
+            h.update(b)
+    return h.hexdigest()
+
+
+def backend_for(src_ext: str, dst_ext: str, config: Config | None = None) -> str:
+    from . import _CONVERTERS
+    from .backends import available_backends
+    if (src_ext, dst_ext) not in _CONVERTERS:
+        # multi-hop route: the path may change as timings are learned
+        return "route"
+    # any available backend may serve the job, so the key covers all of them
+    return "|".join(available_backends(src_ext, dst_ext, config)) or "unknown"
+
+
+def backend_version(backend: str, config: Config | None = None) -> str:
+    if backend == "route":
+        return backend_version("soffice", config) + "+" + backend_version("pdf2docx", config)
+    if "|" in backend:
+        return "|".join(backend_version(b, config) for b in backend.split("|"))
+    if backend == "pdf2docx":
+        try:
+            from importlib.metadata import version
+            return version("pdf2docx")
+        except Exception:
+            return "unknown"
+    if backend in ("word", "powerpoint"):
+        return "office"
+    # Asking soffice for --version costs a full start-up; the binary's size and
+    # mtime change with every install or upgrade, which is what matters here.
+    try:
+        st = os.stat(get_api_path(config))
+        return f"{st.st_size}-{int(st.st_mtime)}"
+    except OSError:
+        return "unknown"
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Exception | None = None
+
+
+class ConversionCache:
+    def __init__(self, root: str, max_bytes: int = 2 << 30, use_hardlinks: bool | None = None):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # Windows cannot delete a read-only hardlinked output before overwriting it
+        self.use_hardlinks = (os.name != "nt") if use_hardlinks is None else use_hardlinks
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._inflight: dict[str, _InFlight] = {}
+        self._size: int | None = None
+
+    # ---- keys / paths ----
+    def key_for(self, input_path: str, src_ext: str, dst_ext: str, config: Config | None = None,
+                pages: str | None = None) -> str:
+        config = config or load_config()
+        backend = backend_for(src_ext, dst_ext, config)
+        parts = [file_sha256(input_path), src_ext, dst_ext, backend, backend_version(backend, config)]
+        if pages:
+            parts.append(pages)
+        if dst_ext == "pdf" and pdf_optimize.enabled(config):
+            parts.append(pdf_optimize.signature(config))
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.objects / key[:2] / key
+
+    # ---- entries ----
+    def fetch(self, key: str, output_path: str) -> bool:
+        obj = self._path(key)
+        if not obj.exists():
+            return False
+        ensure_parent_dir(output_path)
+        remove_if_exists(output_path)
+        linked = False
+        if self.use_hardlinks:
+            try:
+                os.link(obj, output_path)
+                linked = True
+            except OSError:
+                pass
+        if not linked:
+            copy_file(str(obj), output_path)  # a reflink where the filesystem allows
+        try:
+            os.utime(obj)  # mtime doubles as the LRU clock
+        except OSError:
+            pass
+        return True
+
+    def put(self, key: str, output_path: str):
+        obj = self._path(key)
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=obj.parent, prefix=".tmp_")
+        os.close(fd)
+        try:
+            copy_file(output_path, tmp)
+            # read-only, so a hardlinked output cannot be edited into the cache
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            size = os.path.getsize(tmp)
+            with self._lock:
+                try:
+                    replaced = obj.stat().st_size
+                except OSError:
+                    replaced = 0
+                os.replace(tmp, obj)
+                if self._size is not None:
+                    self._size += size - replaced
+        except Exception:
+            remove_if_exists(tmp)
+            raise
+        self.evict()
+
+    def count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def entries(self) -> list[tuple[Path, int, float]]:
+        out = []
+        for p in self.objects.glob("*/*"):
+            if p.name.startswith(".tmp_"):
+                continue
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            out.append((p, st.st_size, st.st_mtime))
+        return out
+
+    def _unlink(self, p: Path) -> bool:
+        try:
+            os.chmod(p, stat.S_IWUSR | stat.S_IRUSR)
+            p.unlink()
+            return True
+        except OSError:
+            return False
+
+    def evict(self):
+        with self._lock:
+            if self._size is not None and self._size <= self.max_bytes:
+                return
+        # scan without the lock: fetch and put go on meanwhile
+        ents = self.entries()
+        total = sum(e[1] for e in ents)
+        with self._lock:
+            if self._size is None:
+                self._size = total
+            for p, size, mtime in sorted(ents, key=lambda e: e[2]):
+                if self._size <= self.max_bytes:
+                    break
+                try:
+                    if p.stat().st_mtime != mtime:
+                        continue  # fetched or rewritten since the scan
+                except OSError:
+                    continue
+                if self._unlink(p):
+                    self._size -= size
+
+    def purge(self) -> int:
+        ents = self.entries()
+        with self._lock:
+            removed = sum(1 for p, _, _ in ents if self._unlink(p))
+            self._size = None  # recounted on the next eviction
+        return removed
+
+    def stats(self) -> dict:
+        ents = self.entries()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "root": str(self.root),
+            "entries": len(ents),
+            "bytes": sum(e[1] for e in ents),
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+        }
+
+    # ---- conversion ----
+    def run(self, converter, input_path: str, output_path: str, src_ext: str, dst_ext: str,
+            config: Config | None = None, pages: str | None = None):
+        """Serve from cache or run converter(input_path, output_path, ...) once per key."""
+        config = config or load_config()
+        key = self.key_for(input_path, src_ext, dst_ext, config, pages)
+        while True:
+            if self.fetch(key, output_path):
+                self.count(hit=True)
+                return
+            with self._lock:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = _InFlight()
+            if leader:
+                break
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            # loop: the leader's output is in the cache now (unless evicted)
+
+        try:
+            # another leader may have finished between our fetch and taking the lock
+            if self.fetch(key, output_path):
+                self.count(hit=True)
+                return
+            self.count(hit=False)
+            converter(input_path, output_path, config=config, pages=pages)
+            self.put(key, output_path)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache(config: Config | None = None) -> ConversionCache | None:
+    global _cache
+    config = config or load_config()
+    root = str(config.get("cache_dir", "")).strip()
+    if not root:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.root != Path(root):
+            max_mb = config.get_int("cache_max_mb", 2048)
+            _cache = ConversionCache(root, max_bytes=max_mb << 20)
+        return _cache
+
+
+def optimized(converter):
+    """converter, followed by pdf_optimize.maybe_optimize on its output."""
+    def _convert(input_path: str, output_path: str, config: Config | None = None, pages=None):
+        converter(input_path, output_path, config=config, pages=pages)
+        pdf_optimize.maybe_optimize(output_path, config)
+    return _convert
+
+
+def cached_converter(src_ext: str, dst_ext: str, converter):
+    if dst_ext == "pdf":
+        converter = optimized(converter)
+
+    def _convert(input_path: str, output_path: str, config: Config | None = None, pages=None):
+        with stage("config"):
+            config = config or load_config()
+        pages = normalize_pages(pages)
+        backend = backend_for(src_ext, dst_ext, config) if instrumented() else None
+        with conversion(input_path, output_path, backend):
+            cache = get_cache(config)
+            if cache is None:
+                return converter(input_path, output_path, config=config, pages=pages)
+            cache.run(converter, input_path, output_path, src_ext, dst_ext, config, pages)
+    return _convert
+
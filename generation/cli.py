@@ -0,0 +1,159 @@
+"""
+Headless command line interface: python -m generation FILES... --to pdf
+
+Inputs may be files, directories (converted recursively) or glob patterns.
+Prints one line per file with its timing and a throughput summary at the end.
+Only imports the conversion code, never PyQt6, so it starts fast on servers.
+"""
+import argparse, glob, json, os, sys, time
+from pathlib import Path
+
+
+def _expand(inputs: list[str], sources: set[str]):
+    """Yield (input_path, base_dir) for every convertible file named by inputs."""
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            base = Path(item)
+            for root, _, files in os.walk(item):
+                for name in sorted(files):
+                    p = Path(root) / name
+                    if p.suffix.lower().lstrip(".") in sources and p not in seen:
+                        seen.add(p)
+                        yield str(p), base
+            continue
+        matches = sorted(glob.glob(item, recursive=True)) if glob.has_magic(item) else [item]
+        for m in matches:
+            p = Path(m)
+            if p.is_file() and p not in seen:
+                seen.add(p)
+                yield str(p), None
+
+
+def _output_for(input_path: str, base: Path | None, out_dir: str | None, dst_ext: str) -> str:
+    src = Path(input_path)
+    name = src.stem + "." + dst_ext
+    if not out_dir:
+        return str(src.with_name(name))
+    rel = src.parent.relative_to(base) if base is not None else Path()
+    return str(Path(out_dir) / rel / name)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m generation", description="Convert DOCX / PPT(X) / PDF files.")
+    ap.add_argument("inputs", nargs="*", help="files, directories or glob patterns")
+    ap.add_argument("-t", "--to", default="pdf", help="target format: pdf, docx (default: pdf)")
+    ap.add_argument("-o", "--out-dir", help="write outputs here (default: next to each input)")
+    ap.add_argument("-p", "--pages", help="only convert these pages, 1-based, e.g. 1-3,7")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="parallel conversions (default: CPU count)")
+    ap.add_argument("--config", help="path to config.json")
+    ap.add_argument("--json", action="store_true", help="print results as JSON lines")
+    ap.add_argument("--cache-stats", action="store_true", help="show conversion cache statistics and exit")
+    ap.add_argument("--cache-purge", action="store_true", help="empty the conversion cache and exit")
+    ap.add_argument("--journal", help="record progress here; rerunning with the same journal skips finished files")
+    ap.add_argument("--optimize", action="store_true",
+                    help="shrink output PDFs: downsample images, merge duplicate streams (needs PyMuPDF)")
+    ap.add_argument("--metrics-jsonl", help="append per-stage timing events to this JSON lines file")
+    ap.add_argument("--metrics-prom", help="write per-stage metrics to this Prometheus textfile")
+    return ap
+
+
+def main(argv=None) -> int:
+    from . import EXT_MAP, available_sources_for, available_targets_for, convert_many
+    from .cache import get_cache
+    from .config import load_config
+    from .errors import error_kind
+    from .instrument import JsonLinesSink, PrometheusSink, add_hook, install_from_config
+    from .utils import normalize_pages
+
+    args = build_parser().parse_args(argv)
+    config = load_config(args.config)
+    install_from_config(config)
+    if args.metrics_jsonl:
+        add_hook(JsonLinesSink(args.metrics_jsonl))
+    prom = add_hook(PrometheusSink(args.metrics_prom)) if args.metrics_prom else None
+    optimized = []
+    if args.optimize:
+        config.data["pdf_optimize"] = True
+        add_hook(lambda ev: optimized.append(ev) if ev.stage == "pdf_optimize" and ev.ok else None)
+    try:
+        args.pages = normalize_pages(args.pages)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.cache_stats or args.cache_purge:
+        cache = get_cache(config)
+        if cache is None:
+            print("Cache disabled: set cache_dir in config.json or PDF_CREATOR_CACHE_DIR", file=sys.stderr)
+            return 1
+        if args.cache_purge:
+            print(f"Removed {cache.purge()} entries")
+        else:
+            print(json.dumps(cache.stats(), indent=2))
+        return 0
+
+    if not args.inputs:
+        build_parser().print_usage(sys.stderr)
+        return 2
+
+    dst_ext = EXT_MAP.get(args.to.upper(), args.to.lower().lstrip("."))
+    sources = set(available_sources_for(dst_ext))
+    if not sources:
+        print(f"Unsupported target format: {args.to}", file=sys.stderr)
+        return 2
+
+    pairs, skipped = [], 0
+    for inp, base in _expand(args.inputs, sources):
+        src_ext = Path(inp).suffix.lower().lstrip(".")
+        if dst_ext not in available_targets_for(src_ext):
+            print(f"SKIP  {inp}: no {src_ext} -> {dst_ext} converter", file=sys.stderr)
+            skipped += 1
+            continue
+        pairs.append((inp, _output_for(inp, base, args.out_dir, dst_ext), args.pages))
+    if not pairs:
+        print("No files to convert.", file=sys.stderr)
+        return 1
+    writers: dict[str, str] = {}
+    for inp, out, _ in pairs:
+        key = os.path.normcase(os.path.abspath(out))
+        if key in writers:
+            print(f"Both {writers[key]} and {inp} would be written to {out}; convert them separately",
+                  file=sys.stderr)
+            return 2
+        writers[key] = inp
+
+    def _report(res):
+        if args.json:
+            print(json.dumps({
+                "input": res.input_path, "output": res.output_path, "ok": res.ok, "skipped": res.skipped,
+                "seconds": round(res.seconds, 4),
+                "error": None if res.ok else f"{type(res.error).__name__}: {res.error}",
+                "kind": error_kind(res.error),
+            }), flush=True)
+        elif res.skipped:
+            print(f"DONE  {'':>9}  {res.input_path} -> {res.output_path} (journal)", flush=True)
+        elif res.ok:
+            print(f"OK    {res.seconds:8.2f}s  {res.input_path} -> {res.output_path}", flush=True)
+        else:
+            print(f"FAIL  {res.seconds:8.2f}s  {res.input_path}: [{error_kind(res.error)}] {res.error}", flush=True)
+
+    t0 = time.perf_counter()
+    results = convert_many(pairs, max_workers=args.jobs, on_done=_report, config=config, journal=args.journal)
+    wall = time.perf_counter() - t0
+    if prom is not None:
+        prom.write()
+
+    done = sum(1 for r in results if r.skipped)
+    ok = sum(1 for r in results if r.ok) - done
+    failed = len(results) - ok - done
+    rate = ok / wall if wall > 0 else 0.0
+    resumed = f", {done} already done" if done else ""
+    print(f"\n{ok} converted, {failed} failed, {skipped} skipped{resumed} in {wall:.2f}s ({rate:.2f} files/s)",
+          file=sys.stderr)
+    if optimized:
+        before = sum(ev.input_bytes or 0 for ev in optimized)
+        after = sum(ev.output_bytes or 0 for ev in optimized)
+        print(f"PDF optimization: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+              f"in {sum(ev.seconds for ev in optimized):.2f}s", file=sys.stderr)
+    return 0 if failed == 0 else 1
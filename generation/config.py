@@ -0,0 +1,100 @@
+"""
+Application config (config.json), loaded once and reused.
+
+The file is re-read only when its mtime or size changes, so batch runs pay
+one stat() per lookup instead of an open + JSON parse. Location:
+
+  - PDF_CREATOR_CONFIG, if set
+  - Windows: C:/PDF_Creator/config.json
+  - elsewhere: $XDG_CONFIG_HOME/pdf_creator/config.json (~/.config by default)
+
+Any key can be overridden with an environment variable named
+PDF_CREATOR_<KEY>, e.g. PDF_CREATOR_API_PATH=/usr/bin/soffice.
+"""
+import json, os, sys, threading
+from pathlib import Path
+
+ENV_PREFIX = "PDF_CREATOR_"
+
+
+def default_config_path() -> Path:
+    env = os.environ.get(ENV_PREFIX + "CONFIG", "").strip()
+    if env:
+        return Path(env)
+    if sys.platform == "win32":
+        return Path("C:/PDF_Creator/config.json")
+    base = os.environ.get("XDG_CONFIG_HOME", "").strip() or str(Path.home() / ".config")
+    return Path(base) / "pdf_creator" / "config.json"
+
+
+class Config:
+    def __init__(self, path: Path, data: dict, exists: bool):
+        self.path = path
+        self.data = data
+        self.exists = exists
+
+    def get(self, key: str, default=None):
+        env = os.environ.get(ENV_PREFIX + key.upper())
+        if env is not None and env.strip() != "":
+            return env.strip()
+        val = self.data.get(key)
+        return default if val is None else val
+
+    def get_int(self, key: str, default: int) -> int:
+        try:
+            return int(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_bool(self, key: str, default: bool) -> bool:
+        val = self.get(key, default)
+        if isinstance(val, str):
+            return val.strip().lower() not in ("0", "false", "no", "off", "")
+        return bool(val)
+
+    @property
+    def api_path(self) -> str:
+        api = self.get("api_path")
+        if not api:
+            if not self.exists:
+                raise FileNotFoundError(f"Config not found: {self.path}")
+            raise RuntimeError("api_path missing in config.json")
+        return str(api)
+
+
+_cache: dict[Path, tuple[tuple, Config]] = {}
+_lock = threading.Lock()
+
+
+def load_config(path: str | Path | None = None) -> Config:
+    p = Path(path) if path else default_config_path()
+    try:
+        st = p.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    with _lock:
+        hit = _cache.get(p)
+        if hit and hit[0] == stamp:
+            return hit[1]
+    if stamp is None:
+        cfg = Config(p, {}, exists=False)
+    else:
+        with open(p, "r", encoding="utf-8") as f:
+            cfg = Config(p, json.load(f), exists=True)
+    with _lock:
+        _cache[p] = (stamp, cfg)
+    return cfg
+
+
+def save_config(values: dict, path: str | Path | None = None) -> Path:
+    """Merge values into the config file (atomically) and return its path."""
+    p = Path(path) if path else default_config_path()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    data = dict(load_config(p).data)
+    data.update(values)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, p)
+    return p
@@ -1,15 +1,21 @@
-from .api_runner import get_api_path
-from .utils import ensure_parent_dir, remove_if_exists
+from .backends import Backend, com_available, register, run_backends, soffice_available
+from .config import Config, load_config
+from .instrument import stage
+from .utils import ensure_parent_dir, remove_if_exists, normalize_pages
 from .soffice_helper import convert_with_soffice
 from .win_com import word_docx_to_pdf
 
-def convert(input_path: str, output_path: str):
-    api = get_api_path().lower()
-    ensure_parent_dir(output_path)
-    remove_if_exists(output_path)
-    if "soffice" in api:
-        convert_with_soffice(input_path, output_path, "pdf")
-    elif "winword" in api:
-        word_docx_to_pdf(input_path, output_path)
-    else:
-        raise RuntimeError(f"Unsupported API path in config: {api}")
+register("docx", "pdf", Backend(
+    "soffice", lambda i, o, config, pages: convert_with_soffice(i, o, "pdf", config=config, pages=pages),
+    soffice_available, family="soffice"))
+register("docx", "pdf", Backend(
+    "word", lambda i, o, config, pages: word_docx_to_pdf(i, o, pages=pages),
+    com_available, prior=(5.0, 1.0), family="com"))
+
+def convert(input_path: str, output_path: str, config: Config | None = None, pages=None):
+    config = config or load_config()
+    pages = normalize_pages(pages)
+    with stage("prepare"):
+        ensure_parent_dir(output_path)
+        remove_if_exists(output_path)
+    run_backends("docx", "pdf", input_path, output_path, config, pages)
@@ -0,0 +1,41 @@
+"""
+Why a conversion failed.
+
+Office backends fail in three ways that call for different handling:
+the process hung (ConversionTimeout, worth a retry on a fresh profile), the
+process died (BackendCrash, also worth a retry) or the document itself was
+rejected (BadInput, retrying will not help). `kind` is a short label for
+logs and metrics.
+"""
+
+
+class ConversionError(RuntimeError):
+    kind = "error"
+    retryable = False
+
+    def __init__(self, message: str, input_path: str | None = None, returncode: int | None = None,
+                 output: str = ""):
+        super().__init__(message)
+        self.input_path = input_path
+        self.returncode = returncode
+        self.output = output  # tail of the backend's stdout/stderr
+
+
+class ConversionTimeout(ConversionError, TimeoutError):
+    kind = "timeout"
+    retryable = True
+
+
+class BackendCrash(ConversionError):
+    kind = "crash"
+    retryable = True
+
+
+class BadInput(ConversionError):
+    kind = "bad_input"
+
+
+def error_kind(err: BaseException | None) -> str | None:
+    if err is None:
+        return None
+    return getattr(err, "kind", "error")
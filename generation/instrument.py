@@ -0,0 +1,276 @@
+"""
+Per-stage timing hooks for conversions.
+
+Every conversion emits a StageEvent for each step it goes through:
+
+  config       config lookup
+  prepare      ensure_parent_dir / remove_if_exists on the output
+  soffice      one LibreOffice process (child CPU time and peak RSS on POSIX)
+  pool         one conversion on a warm UNO worker
+  find_output  locating the produced file in the temp outdir
+  move         atomic_move_with_retries (with the number of retries)
+  pdf2docx     pdf2docx parsing and DOCX writing
+  batch        one grouped soffice run from convert_many
+  convert      the whole conversion, with input and output sizes
+
+Register any callable with add_hook(fn); it is called with each event from
+the converting thread. JsonLinesSink and PrometheusSink export events to a
+file. With no hooks registered the stages cost next to nothing.
+"""
+import atexit, contextvars, json, os, sys, threading, time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+
+_hooks: list = []
+_hooks_lock = threading.Lock()
+_conversion = contextvars.ContextVar("pdf_creator_conversion", default=None)
+
+
+@dataclass
+class StageEvent:
+    stage: str
+    seconds: float = 0.0
+    conversion: str | None = None   # input path of the conversion this stage belongs to
+    backend: str | None = None
+    ok: bool = True
+    error: str | None = None
+    input_bytes: int | None = None
+    output_bytes: int | None = None
+    retries: int | None = None
+    child_cpu_seconds: float | None = None
+    child_max_rss_kb: int | None = None
+    timestamp: float = field(default_factory=time.time)
+    extra: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        d = {k: v for k, v in asdict(self).items() if v is not None and k != "extra"}
+        d.update(self.extra)
+        return d
+
+
+def add_hook(fn):
+    with _hooks_lock:
+        if fn not in _hooks:
+            _hooks.append(fn)
+    return fn
+
+
+def remove_hook(fn):
+    with _hooks_lock:
+        if fn in _hooks:
+            _hooks.remove(fn)
+
+
+def enabled() -> bool:
+    return bool(_hooks)
+
+
+def emit(event: StageEvent):
+    if event.conversion is None:
+        current = _conversion.get()
+        if current is not None:
+            event.conversion = current[0]
+            event.backend = event.backend or current[1]
+    for fn in list(_hooks):
+        try:
+            fn(event)
+        except Exception as e:
+            # a broken exporter must never fail a conversion
+            print(f"instrumentation hook {fn!r} failed: {e}", file=sys.stderr)
+
+
+def file_size(path) -> int | None:
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+class _NullEvent:
+    """Stands in for a StageEvent while no hook is registered; ignores writes."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+    @property
+    def extra(self) -> dict:
+        return {}
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return _NULL_EVENT
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_EVENT = _NullEvent()
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("ev", "t0")
+
+    def __init__(self, name: str, fields: dict):
+        self.ev = StageEvent(name, **fields)
+
+    def __enter__(self) -> StageEvent:
+        self.t0 = time.perf_counter()
+        return self.ev
+
+    def __exit__(self, exc_type, exc, tb):
+        ev = self.ev
+        ev.seconds = time.perf_counter() - self.t0
+        if exc_type is not None:
+            ev.ok, ev.error = False, f"{exc_type.__name__}: {exc}"
+        emit(ev)
+        return False
+
+
+def stage(name: str, **fields):
+    """
+    Time a block and emit a StageEvent for it. The event returned by the
+    with statement can be filled in (retries, sizes, ...) before the block
+    ends. A no-op while no hook is registered.
+    """
+    return _Stage(name, fields) if _hooks else _NULL_STAGE
+
+
+@contextmanager
+def tagged(label: str, backend: str | None = None):
+    """Attribute the stages emitted inside this block to `label` (usually the input path)."""
+    token = _conversion.set((str(label), backend))
+    try:
+        yield
+    finally:
+        _conversion.reset(token)
+
+
+@contextmanager
+def conversion(input_path: str, output_path: str, backend: str | None = None):
+    """Tag the stages inside this block with the conversion and emit a total 'convert' event."""
+    with tagged(input_path, backend), stage("convert", conversion=str(input_path), backend=backend,
+                                            input_bytes=file_size(input_path) if _hooks else None) as ev:
+        yield ev
+        if _hooks:
+            ev.output_bytes = file_size(output_path)
+
+
+def child_usage(rusage) -> dict:
+    """StageEvent fields from an os.wait4 rusage (ru_maxrss is bytes on macOS, KiB elsewhere)."""
+    rss = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+    return {"child_cpu_seconds": rusage.ru_utime + rusage.ru_stime, "child_max_rss_kb": rss}
+
+
+class JsonLinesSink:
+    """Append one JSON object per event to a file (or any text stream)."""
+
+    def __init__(self, target):
+        self._lock = threading.Lock()
+        if hasattr(target, "write"):
+            self._fh, self._owned = target, False
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            self._fh, self._owned = open(target, "a", encoding="utf-8", buffering=1), True
+
+    def __call__(self, event: StageEvent):
+        line = json.dumps(event.to_dict(), default=str)
+        with self._lock:
+            self._fh.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            if self._owned and not self._fh.closed:
+                self._fh.close()
+
+
+class PrometheusSink:
+    """
+    Aggregate events per (stage, backend) and write them in the Prometheus
+    text format, for node_exporter's textfile collector. The file is
+    rewritten atomically at most every `interval` seconds and on close().
+    """
+
+    def __init__(self, path: str, interval: float = 10.0, prefix: str = "pdf_creator"):
+        self.path, self.interval, self.prefix = path, interval, prefix
+        self._lock = threading.Lock()
+        self._stats: dict[tuple, dict] = {}
+        self._last_write = 0.0
+
+    def __call__(self, event: StageEvent):
+        key = (event.stage, event.backend or "")
+        with self._lock:
+            s = self._stats.setdefault(key, {"count": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                             "retries": 0, "child_cpu": 0.0, "child_rss": 0,
+                                             "in_bytes": 0, "out_bytes": 0})
+            s["count"] += 1
+            s["errors"] += 0 if event.ok else 1
+            s["seconds"] += event.seconds
+            s["max_seconds"] = max(s["max_seconds"], event.seconds)
+            s["retries"] += event.retries or 0
+            s["child_cpu"] += event.child_cpu_seconds or 0.0
+            s["child_rss"] = max(s["child_rss"], event.child_max_rss_kb or 0)
+            s["in_bytes"] += event.input_bytes or 0
+            s["out_bytes"] += event.output_bytes or 0
+            due = time.monotonic() - self._last_write >= self.interval
+        if due:
+            self.write()
+
+    def render(self) -> str:
+        p = self.prefix
+        metrics = [
+            ("stage_total", "counter", "Stages run", "count", 1),
+            ("stage_errors_total", "counter", "Stages that raised", "errors", 1),
+            ("stage_seconds_total", "counter", "Wall time spent in stage", "seconds", 1),
+            ("stage_seconds_max", "gauge", "Slowest single stage", "max_seconds", 1),
+            ("stage_retries_total", "counter", "Retries inside stage", "retries", 1),
+            ("child_cpu_seconds_total", "counter", "CPU time of child processes", "child_cpu", 1),
+            ("child_max_rss_bytes", "gauge", "Peak RSS of any child process", "child_rss", 1024),
+            ("input_bytes_total", "counter", "Input bytes converted", "in_bytes", 1),
+            ("output_bytes_total", "counter", "Output bytes written", "out_bytes", 1),
+        ]
+        with self._lock:
+            stats = {k: dict(v) for k, v in self._stats.items()}
+        lines = []
+        for name, kind, help_text, field_name, scale in metrics:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for (stage_name, backend), s in sorted(stats.items()):
+                lines.append(f'{p}_{name}{{stage="{stage_name}",backend="{backend}"}} {s[field_name] * scale}')
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        text = self.render()
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            self._last_write = time.monotonic()
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+
+    def close(self):
+        if self._stats:
+            self.write()
+
+
+_installed: dict[tuple, object] = {}
+
+
+def install_from_config(config=None):
+    """
+    Register exporters named in config.json (metrics_jsonl, metrics_prom);
+    calling it again with the same paths is a no-op.
+    """
+    from .config import load_config
+    config = config or load_config()
+    for key, cls in (("metrics_jsonl", JsonLinesSink), ("metrics_prom", PrometheusSink)):
+        path = str(config.get(key, "") or "").strip()
+        if path and (key, path) not in _installed:
+            sink = _installed[(key, path)] = cls(path)
+            add_hook(sink)
+            atexit.register(sink.close)
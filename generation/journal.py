@@ -0,0 +1,141 @@
+"""
+Progress journal for resumable batch runs.
+
+    results = convert_many(pairs, journal="run.journal")
+
+Every job appends JSON lines to the journal: "started" when it begins, then
+"done" or "failed". Each line carries the job's input fingerprint (size and
+mtime) and, for finished jobs, the output's size and mtime. A rerun with the
+same journal skips a job only if all of these hold:
+
+  - its last entry is "done";
+  - the input still has the recorded fingerprint;
+  - the output is still there with the recorded size and mtime.
+
+Failed jobs and jobs that were still running when the process died are
+converted again.
+
+Each line is written through to the OS at once, but fsynced at most once
+per `sync_interval` seconds, so thousands of entries a minute cost a handful
+of fsyncs. A killed process loses nothing; a power cut loses at most that
+window, and those jobs are simply redone. A torn last line from a
+crash is skipped on load. When superseded entries outnumber the live ones,
+the journal is rewritten on open, so it does not grow without bound over
+many resumes.
+"""
+import json, os, threading, time
+from pathlib import Path
+
+STARTED, DONE, FAILED = "started", "done", "failed"
+SYNC_INTERVAL = 1.0
+
+
+def fingerprint(path: str) -> str | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def job_key(input_path: str, output_path: str, pages: str | None = None) -> str:
+    return f"{os.path.abspath(input_path)}|{os.path.abspath(output_path)}|{pages or ''}"
+
+
+class Journal:
+    def __init__(self, path: str, sync_interval: float = SYNC_INTERVAL):
+        self.path = Path(path)
+        self.sync_interval = sync_interval
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+        lines = self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if lines - len(self.entries) > len(self.entries):
+            self._compact()  # superseded (or torn) lines outnumber the live entries
+        self._fh = open(self.path, "a", encoding="utf-8")
+        if self._fh.tell() and not self._ends_with_newline():
+            self._fh.write("\n")  # after a torn last line
+
+    def _load(self) -> int:
+        lines = 0
+        try:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        e = json.loads(line)
+                        self.entries[e["key"]] = e
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+        return lines
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _compact(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for e in self.entries.values():
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def completed(self, input_path: str, output_path: str, pages: str | None = None) -> bool:
+        """True if the job finished in an earlier run and neither its input nor its output changed since."""
+        e = self.entries.get(job_key(input_path, output_path, pages))
+        if e is None or e.get("status") != DONE:
+            return False
+        return e.get("input") == fingerprint(input_path) and e.get("output") == fingerprint(output_path)
+
+    def _append(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.entries[entry["key"]] = entry
+            self._fh.write(line)
+            # in the OS after every entry, so a killed process loses nothing;
+            # on disk once per interval, so a power cut loses only that window
+            self._fh.flush()
+            if time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+
+    def _sync(self):
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._last_sync = time.monotonic()
+
+    def start(self, input_path: str, output_path: str, pages: str | None = None) -> str | None:
+        """Record a job as running; returns the input fingerprint to pass to finish()."""
+        fp = fingerprint(input_path)
+        self._append({"key": job_key(input_path, output_path, pages), "status": STARTED,
+                      "input": fp, "t": round(time.time(), 3)})
+        return fp
+
+    def finish(self, input_path: str, output_path: str, pages: str | None = None,
+               error: Exception | None = None, input_fp: str | None = None):
+        """Record the outcome. input_fp is the fingerprint from start(), i.e. of the input that was converted."""
+        entry = {"key": job_key(input_path, output_path, pages), "status": DONE if error is None else FAILED,
+                 "input": input_fp or fingerprint(input_path), "t": round(time.time(), 3)}
+        if error is None:
+            entry["output"] = fingerprint(output_path)
+        else:
+            entry["error"] = f"{type(error).__name__}: {error}"[:500]
+        self._append(entry)
+
+    def close(self):
+        with self._lock:
+            if self._fh.closed:
+                return
+            self._sync()
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
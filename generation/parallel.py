@@ -0,0 +1,66 @@
+"""
+Run many conversions at once.
+
+Each job is an (input_path, output_path) pair, or (input_path, output_path,
+pages) to convert only a page range; the target format comes from the
+output suffix. Jobs are spread over worker threads, and every soffice run
+gets its own profile (see profiles.py), so N workers really means N
+LibreOffice processes rendering in parallel. The scheduler (scheduler.py)
+runs short jobs first and holds back jobs that would overrun the memory
+budget.
+"""
+import time
+from dataclasses import dataclass
+from . import profiles
+from .config import Config, load_config
+from .scheduler import Scheduler, estimate
+from .utils import guess_ext
+
+
+@dataclass
+class JobResult:
+    input_path: str
+    output_path: str
+    error: Exception | None = None
+    seconds: float = 0.0
+    skipped: bool = False  # already done according to the journal
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_job(input_path: str, output_path: str, pages=None, config: Config | None = None) -> JobResult:
+    from . import get_converter
+    t0 = time.perf_counter()
+    try:
+        converter = get_converter(guess_ext(input_path), guess_ext(output_path))
+        converter(input_path, output_path, config=config, pages=pages)
+        err = None
+    except Exception as e:
+        err = e
+    return JobResult(input_path, output_path, err, time.perf_counter() - t0)
+
+
+def convert_parallel(jobs, max_workers: int | None = None, on_done=None,
+                     config: Config | None = None) -> list[JobResult]:
+    """
+    Convert (input_path, output_path) pairs concurrently, shortest first;
+    results keep job order.
+    max_workers defaults to the CPU count (or PDF_CREATOR_WORKERS).
+    on_done(result) is called from the worker thread as each job finishes.
+    """
+    jobs = list(jobs)
+    config = config or load_config()
+    n = max(1, max_workers or profiles.default_workers(config))
+    profiles.set_concurrency(n, config)
+
+    def _one(pair):
+        res = run_job(*pair, config=config)
+        if on_done:
+            on_done(res)
+        return res
+
+    with Scheduler(n, config, name="convert") as sched:
+        futures = [sched.submit(estimate(str(job[0]), guess_ext(str(job[1])), config), _one, job) for job in jobs]
+        return [f.result() for f in futures]
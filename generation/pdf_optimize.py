@@ -0,0 +1,289 @@
+"""
+Optional post-conversion PDF optimization: python -m generation.pdf_optimize IN.pdf [OUT.pdf]
+
+    report = optimize_pdf("deck.pdf")   # in place
+    print(report)   # deck.pdf: 41.2 MB -> 6.3 MB (-85%) in 3.10s, 37 of 40 images recompressed
+
+With "pdf_optimize": true every PDF the converters write goes through it
+before it is cached or returned. Three things make the file smaller:
+
+  - images drawn at more than "pdf_image_dpi" (default 150) are downsampled
+    to it, and images are re-encoded as JPEG at "pdf_jpeg_quality" (default
+    80). An image is only replaced if that saves at least 10%. Images with a
+    transparency mask, 1-bit images (scans, stencils) and small images are
+    left alone;
+  - identical streams are merged, so an image or font that the office suite
+    embedded once per slide is stored once;
+  - the file is written with Flate-compressed streams and compressed object
+    streams.
+
+Pages are split into chunks that the process pool shared with pdf2docx
+("pdf_optimize_workers", default: `workers`) works on, so optimizations
+running side by side do not multiply the processes. An image used on
+several pages is handled by the chunk that holds its first page. The result is staged beside
+the output and only replaces it when it is smaller.
+
+Uses PyMuPDF (pip install pymupdf), which pdf2docx depends on as well.
+"""
+import argparse, math, os, sys, time
+from dataclasses import dataclass
+from pathlib import Path
+from .api_runner import child_memory_limit, map_in_processes
+from .config import Config, load_config
+from .instrument import stage
+from .profiles import default_workers
+from .utils import atomic_move_with_retries, copy_file, staging_dir
+
+DEFAULT_DPI = 150
+DEFAULT_QUALITY = 80
+DPI_SLACK = 1.1           # no resampling for images just above the target
+MIN_SAVING = 0.9          # a re-encoded image must be at most 90% of the original
+MIN_PIXELS = 128 * 128
+MIN_BYTES = 16 << 10
+PARALLEL_MIN_PAGES = 8    # shorter documents are done in-process
+SKIP_FILTERS = ("/JBIG2Decode", "/CCITTFaxDecode", "/JPXDecode")
+
+
+def _require_pymupdf():
+    try:
+        import pymupdf
+    except ImportError:
+        try:
+            import fitz as pymupdf
+        except Exception as e:
+            raise RuntimeError("PyMuPDF is required for PDF optimization. Install with: pip install pymupdf") from e
+    return pymupdf
+
+
+def enabled(config: Config | None = None) -> bool:
+    return (config or load_config()).get_bool("pdf_optimize", False)
+
+
+def settings(config: Config | None = None) -> tuple[int, int]:
+    """(target dpi, JPEG quality) from config."""
+    config = config or load_config()
+    dpi = max(1, config.get_int("pdf_image_dpi", DEFAULT_DPI))
+    quality = min(100, max(1, config.get_int("pdf_jpeg_quality", DEFAULT_QUALITY)))
+    return dpi, quality
+
+
+def signature(config: Config | None = None) -> str:
+    """Part of the cache key: optimized and plain outputs must not be mixed up."""
+    return "opt-%d-%d" % settings(config) if enabled(config) else ""
+
+
+def _size(n: int) -> str:
+    return f"{n / 1e6:.1f} MB" if n >= 100_000 else f"{n / 1e3:.1f} kB"
+
+
+@dataclass
+class OptimizeReport:
+    path: str
+    input_bytes: int
+    output_bytes: int
+    seconds: float
+    pages: int = 0
+    images: int = 0
+    recompressed: int = 0
+
+    @property
+    def saved(self) -> float:
+        """Share of the input size saved, 0..1."""
+        return 1 - self.output_bytes / self.input_bytes if self.input_bytes else 0.0
+
+    def __str__(self):
+        return (f"{self.path}: {_size(self.input_bytes)} -> {_size(self.output_bytes)} "
+                f"(-{self.saved:.0%}) in {self.seconds:.2f}s, "
+                f"{self.recompressed} of {self.images} images recompressed")
+
+
+def _key(doc, xref: int, key: str) -> str:
+    kind, value = doc.xref_get_key(xref, key)
+    return value if kind != "null" else ""
+
+
+def _int_key(doc, xref: int, key: str) -> int | None:
+    """A number entry, following an indirect reference ("12 0 R"); None if it is not a number."""
+    kind, value = doc.xref_get_key(xref, key)
+    try:
+        if kind == "xref":
+            value = doc.xref_object(int(value.split()[0]), compressed=True)
+        return int(value.strip())
+    except (ValueError, RuntimeError):
+        return None
+
+
+def _eligible(doc, xref: int) -> bool:
+    if _key(doc, xref, "SMask") or _key(doc, xref, "Mask") or _key(doc, xref, "ImageMask") == "true":
+        return False
+    if _key(doc, xref, "BitsPerComponent") == "1" or any(f in _key(doc, xref, "Filter") for f in SKIP_FILTERS):
+        return False
+    w, h = _int_key(doc, xref, "Width"), _int_key(doc, xref, "Height")
+    return w is not None and h is not None and w * h >= MIN_PIXELS and _raw_size(doc, xref) >= MIN_BYTES
+
+
+def _raw_size(doc, xref: int) -> int:
+    length = _key(doc, xref, "Length")
+    return int(length) if length.isdigit() else len(doc.xref_stream_raw(xref) or b"")
+
+
+def _scan_pages(doc, pages) -> list[tuple[int, int, float]]:
+    """(page, xref, dpi) for every image drawn on these pages, at the resolution it is drawn with."""
+    out = []
+    for pno in pages:
+        for info in doc[pno].get_image_info(xrefs=True):
+            xref = info.get("xref", 0)
+            if xref <= 0:
+                continue  # inline image
+            a, b, c, d = info["transform"][:4]
+            # pixels per inch along each image axis, whatever the rotation
+            dpi = min(info["width"] / max(math.hypot(a, b) / 72, 1e-6),
+                      info["height"] / max(math.hypot(c, d) / 72, 1e-6))
+            out.append((pno, xref, dpi))
+    return out
+
+
+def _scan_chunk(args):
+    """Worker: _scan_pages on one chunk of pages."""
+    pdf_path, pages = args
+    with _require_pymupdf().open(pdf_path) as doc:
+        return _scan_pages(doc, pages)
+
+
+def _merge(found) -> list[tuple[int, int, float]]:
+    """One (first page, xref, dpi) per image, with the lowest resolution it is drawn at."""
+    images: dict[int, tuple[int, float]] = {}
+    for pno, xref, dpi in found:
+        first, lowest = images.get(xref, (pno, dpi))
+        images[xref] = (min(first, pno), min(lowest, dpi))
+    return sorted((pno, xref, dpi) for xref, (pno, dpi) in images.items())
+
+
+def _scale(drawn: float, dpi: int) -> float:
+    return dpi / drawn if drawn > dpi * DPI_SLACK else 1.0
+
+
+def _recompress(args):
+    """Worker: re-encode one chunk of images; returns (xref, jpeg, width, height, gray) for the ones that shrank."""
+    pdf_path, jobs, quality = args
+    pymupdf = _require_pymupdf()
+    out = []
+    with pymupdf.open(pdf_path) as doc:
+        for xref, scale in jobs:
+            try:
+                pix = pymupdf.Pixmap(doc, xref)
+                if pix.colorspace is None:
+                    continue
+                if pix.alpha:
+                    pix = pymupdf.Pixmap(pix, 0)
+                if pix.colorspace.n not in (1, 3):
+                    pix = pymupdf.Pixmap(pymupdf.csRGB, pix)
+                if scale < 1:
+                    pix = pymupdf.Pixmap(pix, max(1, round(pix.width * scale)), max(1, round(pix.height * scale)))
+                data = pix.tobytes("jpg", jpg_quality=quality)
+            except Exception:
+                continue  # an image PyMuPDF cannot decode stays as it is
+            if len(data) <= MIN_SAVING * _raw_size(doc, xref):
+                out.append((xref, data, pix.width, pix.height, pix.colorspace.n == 1))
+    return out
+
+
+def _replace(doc, xref: int, data: bytes, width: int, height: int, gray: bool):
+    doc.update_stream(xref, data, compress=False)
+    for key in ("DecodeParms", "Decode", "Intent"):
+        doc.xref_set_key(xref, key, "null")
+    doc.xref_set_key(xref, "Filter", "/DCTDecode")
+    doc.xref_set_key(xref, "Width", str(width))
+    doc.xref_set_key(xref, "Height", str(height))
+    doc.xref_set_key(xref, "BitsPerComponent", "8")
+    doc.xref_set_key(xref, "ColorSpace", "/DeviceGray" if gray else "/DeviceRGB")
+
+
+def _split(items: list, n: int) -> list[list]:
+    """n runs of consecutive items of about equal length."""
+    size = max(1, math.ceil(len(items) / n))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def optimize_pdf(input_path: str, output_path: str | None = None, config: Config | None = None,
+                 dpi: int | None = None, quality: int | None = None, workers: int | None = None) -> OptimizeReport:
+    """
+    Write a smaller copy of input_path to output_path (default: in place).
+    If nothing could be saved, output_path gets an unchanged copy.
+    """
+    pymupdf = _require_pymupdf()
+    config = config or load_config()
+    cfg_dpi, cfg_quality = settings(config)
+    dpi, quality = dpi or cfg_dpi, quality or cfg_quality
+    workers = workers or config.get_int("pdf_optimize_workers", default_workers(config))
+    output_path = output_path or input_path
+    t0 = time.perf_counter()
+    before = os.path.getsize(input_path)
+    with stage("pdf_optimize", input_bytes=before) as ev, staging_dir(output_path, "pdfopt_") as td:
+        pdf_path = str(Path(input_path).resolve())
+        with pymupdf.open(pdf_path) as doc:
+            if doc.needs_pass:
+                raise RuntimeError(f"Cannot optimize an encrypted PDF: {input_path}")
+            pages = doc.page_count
+            if workers > 1 and pages >= PARALLEL_MIN_PAGES:
+                limit = child_memory_limit(config)
+                chunks = _split(list(range(pages)), 2 * workers)
+                found = map_in_processes(_scan_chunk, [(pdf_path, c) for c in chunks], workers, limit)
+                images = _merge(f for part in found for f in part)
+                # images stay in order of their first page, so each task covers a run of pages
+                jobs = [(xref, _scale(drawn, dpi)) for _, xref, drawn in images if _eligible(doc, xref)]
+                tasks = [(pdf_path, part, quality) for part in _split(jobs, 2 * workers)]
+                results = [r for part in map_in_processes(_recompress, tasks, workers, limit) for r in part]
+            else:
+                images = _merge(_scan_pages(doc, range(pages)))
+                jobs = [(xref, _scale(drawn, dpi)) for _, xref, drawn in images if _eligible(doc, xref)]
+                results = _recompress((pdf_path, jobs, quality))
+            for r in results:
+                _replace(doc, *r)
+            tmp = os.path.join(td, Path(output_path).name)
+            # garbage=4 merges identical streams; JPEGs are not deflated again
+            doc.save(tmp, garbage=4, deflate=True, deflate_fonts=True, use_objstms=1)
+        after = os.path.getsize(tmp)
+        if after >= before:
+            after = before
+            if os.path.abspath(output_path) == os.path.abspath(input_path):
+                tmp = None
+            else:
+                tmp = os.path.join(td, "copy.pdf")
+                copy_file(input_path, tmp)
+        if tmp is not None:
+            atomic_move_with_retries(tmp, output_path)
+        ev.output_bytes = after
+        ev.extra.update(pages=pages, images=len(images), recompressed=len(results))
+    return OptimizeReport(str(output_path), before, after, time.perf_counter() - t0, pages, len(images),
+                          len(results))
+
+
+def maybe_optimize(path: str, config: Config | None = None) -> OptimizeReport | None:
+    """Optimize a freshly converted PDF in place when "pdf_optimize" is on."""
+    config = config or load_config()
+    if not enabled(config) or not str(path).lower().endswith(".pdf"):
+        return None
+    return optimize_pdf(path, config=config)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m generation.pdf_optimize",
+                                 description="Downsample and recompress images, merge duplicate streams.")
+    ap.add_argument("input")
+    ap.add_argument("output", nargs="?", help="default: replace the input")
+    ap.add_argument("--dpi", type=int, help=f"target image resolution (default {DEFAULT_DPI})")
+    ap.add_argument("--quality", type=int, help=f"JPEG quality 1-100 (default {DEFAULT_QUALITY})")
+    ap.add_argument("-j", "--jobs", type=int, help="worker processes (default: CPU count)")
+    ap.add_argument("--config", help="path to config.json")
+    args = ap.parse_args(argv)
+    try:
+        print(optimize_pdf(args.input, args.output, load_config(args.config), args.dpi, args.quality, args.jobs))
+    except (OSError, RuntimeError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,112 @@
 from pathlib import Path
-import tempfile
-from .api_runner import get_api_path
-from .utils import ensure_parent_dir, remove_if_exists, atomic_move_with_retries
+import os, zipfile
+from .api_runner import child_memory_limit, map_in_processes
+from .backends import Backend, com_available, module_available, register, run_backends, soffice_available
+from .config import Config, load_config
+from .instrument import file_size, stage
+from .profiles import default_workers
+from .soffice_helper import convert_with_soffice
+from .utils import (ensure_parent_dir, remove_if_exists, atomic_move_with_retries, normalize_pages, page_indexes,
+                    staging_dir)
 from .win_com import word_pdf_to_docx
 
-def _convert_with_pdf2docx(input_path: str, output_path: str):
+DEFAULT_CHUNK_PAGES = 16
+
+def _require_pdf2docx():
     try:
         from pdf2docx import Converter
     except Exception as e:
         raise RuntimeError("pdf2docx is required. Install with: pip install pdf2docx") from e
+    return Converter
+
+def _parse_chunk(args):
+    """Worker process: parse one page chunk and store the layout as JSON."""
+    pdf_path, pages, json_path = args
+    Converter = _require_pdf2docx()
+    cv = Converter(pdf_path)
+    try:
+        settings = cv.default_settings
+        # only this chunk's pages are loaded and parsed. Margins and sections are
+        # worked out per page, so that matches a single-process run; the
+        # cross-page pass (header/footer) sees just the chunk, but pdf2docx
+        # leaves it empty for now. test_pdf_to_docx checks the results match.
+        cv.load_pages(pages=pages).parse_document(**settings).parse_pages(**settings)
+        cv.serialize(json_path)
+    finally:
+        cv.close()
+
+def _convert_with_pdf2docx(input_path: str, output_path: str, config: Config | None = None,
+                           pages: str | None = None):
+    Converter = _require_pdf2docx()
+    config = config or load_config()
+    workers = config.get_int("pdf2docx_workers", default_workers(config))
+    chunk = max(1, config.get_int("pdf2docx_chunk_pages", DEFAULT_CHUNK_PAGES))
 
-    ensure_parent_dir(output_path)
-    remove_if_exists(output_path)
+    with stage("prepare"):
+        ensure_parent_dir(output_path)
+        remove_if_exists(output_path)
 
-    with tempfile.TemporaryDirectory(prefix="pdf2docx_") as td:
+    with staging_dir(output_path, "pdf2docx_") as td:
         tmp_out = str((Path(td) / (Path(output_path).stem + ".docx")).resolve())
-        cv = Converter(str(Path(input_path).resolve()))
-        try:
-            # pdf2docx already quiet; no prints unless debug=True
-            cv.convert(tmp_out, start=0, end=None)
-        finally:
-            cv.close()
+        with stage("pdf2docx", input_bytes=file_size(input_path)) as ev:
+            cv = Converter(str(Path(input_path).resolve()))
+            try:
+                selected = page_indexes(pages, len(cv.fitz_doc))
+                if not selected:
+                    raise ValueError(f"Page range {pages} is outside this {len(cv.fitz_doc)}-page PDF")
+                if workers > 1 and len(selected) >= 2 * chunk:
+                    _convert_pages_parallel(cv, selected, tmp_out, td, workers, chunk, child_memory_limit(config))
+                elif pages is None:
+                    # pdf2docx already quiet; no prints unless debug=True
+                    cv.convert(tmp_out, start=0, end=None)
+                elif selected == list(range(selected[0], selected[-1] + 1)):
+                    cv.convert(tmp_out, start=selected[0], end=selected[-1] + 1)
+                else:
+                    cv.convert(tmp_out, pages=selected)
+            finally:
+                cv.close()
+            ev.output_bytes = file_size(tmp_out)
+            ev.extra["pages"] = len(selected)
+            ev.extra["parallel"] = workers > 1 and len(selected) >= 2 * chunk
         atomic_move_with_retries(tmp_out, output_path)
 
-def convert(input_path: str, output_path: str):
-    api = get_api_path().lower()
-    if "winword" in api:
-        word_pdf_to_docx(input_path, output_path)
-    else:
-        _convert_with_pdf2docx(input_path, output_path)
+def _convert_pages_parallel(cv, selected: list[int], docx_path: str, workdir: str, workers: int, chunk: int,
+                            memory_limit: int | None = None):
+    """
+    Parse page chunks in the shared process pool, then restore the parsed pages
+    in page order and build a single DOCX in this process. The DOCX writer sees exactly
+    the pages a single-process run would have parsed, so the result matches it.
+    """
+    pdf_path = str(Path(cv.filename_pdf).resolve())
+    tasks = []
+    for k, start in enumerate(range(0, len(selected), chunk)):
+        tasks.append((pdf_path, selected[start:start + chunk], os.path.join(workdir, f"pages-{k:05d}.json")))
+    map_in_processes(_parse_chunk, tasks, workers, memory_limit)
+    for _, _, json_path in tasks:
+        cv.deserialize(json_path)
+    cv.make_docx(docx_path, **cv.default_settings)
+
+def docx_equivalent(a: str, b: str) -> bool:
+    """True if two DOCX files have identical parts, ignoring docProps timestamps."""
+    with zipfile.ZipFile(a) as za, zipfile.ZipFile(b) as zb:
+        names = sorted(n for n in za.namelist() if not n.startswith("docProps/"))
+        if names != sorted(n for n in zb.namelist() if not n.startswith("docProps/")):
+            return False
+        return all(za.read(n) == zb.read(n) for n in names)
+
+register("pdf", "docx", Backend(
+    "pdf2docx", _convert_with_pdf2docx, module_available("pdf2docx"), prior=(1.0, 4.0)))
+register("pdf", "docx", Backend(
+    "word", lambda i, o, config, pages: word_pdf_to_docx(i, o, pages=pages),
+    com_available, prior=(6.0, 2.0), family="com", pages=False))
+# Writer's PDF import keeps text and images but lays most of it out in frames;
+# ranked last until it has been measured
+register("pdf", "docx", Backend(
+    "soffice", lambda i, o, config, pages: convert_with_soffice(
+        i, o, 'docx:"MS Word 2007 XML"', config=config, infilter="writer_pdf_import"),
+    soffice_available, prior=(8.0, 8.0), family="soffice", pages=False))
+
+def convert(input_path: str, output_path: str, config: Config | None = None, pages=None):
+    config = config or load_config()
+    pages = normalize_pages(pages)
+    run_backends("pdf", "docx", input_path, output_path, config, pages)
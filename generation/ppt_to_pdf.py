@@ -1,16 +1,24 @@
-from .api_runner import get_api_path
-from .utils import ensure_parent_dir, remove_if_exists
+from .backends import Backend, com_available, register, run_backends, soffice_available
+from .config import Config, load_config
+from .instrument import stage
+from .utils import ensure_parent_dir, guess_ext, remove_if_exists, normalize_pages
 from .soffice_helper import convert_with_soffice
 from .win_com import ppt_to_pdf as ppt_to_pdf_com
 
-def convert(input_path: str, output_path: str):
-    api = get_api_path().lower()
-    ensure_parent_dir(output_path)
-    remove_if_exists(output_path)
-    if "soffice" in api:
-        convert_with_soffice(input_path, output_path, "pdf")
-    elif "winword" in api:
-        # Using PowerPoint COM even if config points to winword.exe
-        ppt_to_pdf_com(input_path, output_path)
-    else:
-        raise RuntimeError(f"Unsupported API path in config: {api}")
+for _src in ("ppt", "pptx"):
+    register(_src, "pdf", Backend(
+        "soffice", lambda i, o, config, pages: convert_with_soffice(i, o, "pdf", config=config, pages=pages),
+        soffice_available, family="soffice"))
+    # PowerPoint COM, enabled by a winword api_path or "com_backends"
+    register(_src, "pdf", Backend(
+        "powerpoint", lambda i, o, config, pages: ppt_to_pdf_com(i, o, pages=pages),
+        com_available, prior=(5.0, 1.0), family="com"))
+
+def convert(input_path: str, output_path: str, config: Config | None = None, pages=None):
+    config = config or load_config()
+    pages = normalize_pages(pages)
+    with stage("prepare"):
+        ensure_parent_dir(output_path)
+        remove_if_exists(output_path)
+    src = "ppt" if guess_ext(input_path) == "ppt" else "pptx"
+    run_backends(src, "pdf", input_path, output_path, config, pages)
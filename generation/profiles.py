@@ -0,0 +1,238 @@
+"""
+Isolated LibreOffice user profiles.
+
+soffice refuses to run two instances on one -env:UserInstallation: the second
+one hands its job to the first and waits. Every concurrent soffice process
+therefore leases its own profile directory from a fixed set of slots; the
+number of slots is the concurrency limit for one-shot soffice runs.
+
+A fresh profile costs soffice seconds of first-run setup (registry,
+extensions, font caches). So one warmed-up profile is built per soffice
+binary with --terminate_after_init and kept in lo_profile_templates/ next to
+config.json ("profile_template_dir"). Every new or wiped profile starts as a
+copy of it. The copy is a reflink where the filesystem supports it. It is
+never a hardlink, because soffice rewrites its profile files in place. The
+template is keyed on the binary's path, size and mtime, so an upgrade
+triggers a rebuild. "profile_template": false turns this off.
+"""
+import atexit, hashlib, os, queue, shutil, tempfile, threading
+from contextlib import contextmanager
+from pathlib import Path
+from .config import Config, load_config
+from .instrument import stage
+from .utils import copy_file
+
+TEMPLATE_TIMEOUT = 180.0  # seconds for the one-off first-run setup
+
+
+def default_workers(config: Config | None = None) -> int:
+    # "workers" in config.json, or PDF_CREATOR_WORKERS
+    cpus = os.cpu_count() or 1
+    return max(1, (config or load_config()).get_int("workers", cpus))
+
+
+class ProfileSlots:
+    def __init__(self, size: int, root: str | None = None, config: Config | None = None):
+        self.size = max(1, int(size))
+        self.config = config
+        self._own_root = root is None
+        self.root = Path(root or tempfile.mkdtemp(prefix="lo_profiles_"))
+        self._free: queue.Queue = queue.Queue()
+        self.retired = False
+        self._waiters: list = []
+        self._waiters_lock = threading.Lock()
+        for i in range(self.size):
+            self._free.put(self.root / f"profile_{i}")
+
+    @contextmanager
+    def lease(self):
+        p = self.acquire()
+        try:
+            yield p
+        finally:
+            self.release(p)
+
+    def acquire(self, block: bool = True) -> Path | None:
+        """Take a free profile dir, seeded; None if block is False and all are in use."""
+        p = self.take(block)
+        if p is not None:
+            try:
+                self.prepare(p)
+            except OSError:
+                self.release(p)
+                raise
+        return p
+
+    def take(self, block: bool = True) -> Path | None:
+        """acquire() without prepare(): cheap, never runs soffice."""
+        try:
+            return self._free.get(block)
+        except queue.Empty:
+            return None
+
+    def prepare(self, p: Path):
+        """Create a taken profile dir and seed it if it is empty (may build the template)."""
+        p.mkdir(parents=True, exist_ok=True)
+        if not any(p.iterdir()):
+            seed_profile(p, self.config)
+
+    def release(self, p: Path):
+        self._free.put(p)
+        with self._waiters_lock:
+            waiters = list(self._waiters)
+        for wake in waiters:
+            wake()
+        if self.retired and self._free.qsize() == self.size:
+            self.close()  # the last lease of a replaced set came back
+
+    def add_waiter(self, wake):
+        """Call wake() (from any thread) whenever a profile is released."""
+        with self._waiters_lock:
+            self._waiters.append(wake)
+
+    def remove_waiter(self, wake):
+        with self._waiters_lock:
+            self._waiters.remove(wake)
+
+    def retire(self):
+        """Replaced by a new set: delete the profiles once every lease is back."""
+        self.retired = True
+        if self._free.qsize() == self.size:
+            self.close()
+
+    def close(self):
+        if self._own_root:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+def reset_profile(profile_dir, config: Config | None = None):
+    """Throw away a profile that a killed soffice may have left locked or half written."""
+    shutil.rmtree(profile_dir, ignore_errors=True)
+    Path(profile_dir).mkdir(parents=True, exist_ok=True)
+    seed_profile(profile_dir, config)
+
+
+# ---------- warmed-up template ----------
+_templates: dict[str, Path | None] = {}
+_template_lock = threading.Lock()
+
+
+def template_key(config: Config) -> str:
+    api = os.path.abspath(config.api_path)
+    try:
+        st = os.stat(api)
+        stamp = f"{st.st_size}-{st.st_mtime_ns}"
+    except OSError:
+        stamp = "missing"
+    return hashlib.sha1(f"{api}|{stamp}".encode("utf-8")).hexdigest()[:16]
+
+
+def _template_root(config: Config) -> Path:
+    root = str(config.get("profile_template_dir", "") or "").strip()
+    return Path(root) if root else Path(config.path).parent / "lo_profile_templates"
+
+
+def _build_template(config: Config, target: Path) -> Path | None:
+    from .api_runner import run_office_api
+    from .errors import ConversionError
+    target.parent.mkdir(parents=True, exist_ok=True)
+    build = Path(tempfile.mkdtemp(prefix=".build_", dir=target.parent))
+    try:
+        with stage("profile_template"):
+            run_office_api([profile_arg(build), "--headless", "--norestore", "--nologo", "--nodefault",
+                            "--terminate_after_init"], config=config, timeout=TEMPLATE_TIMEOUT)
+        if not (build / "user").is_dir():
+            return None
+        (build / "user" / ".lock").unlink(missing_ok=True)
+        try:
+            os.rename(build, target)
+        except OSError:
+            pass  # another process finished first; use its copy
+        # templates of soffice binaries that were upgraded or removed
+        for old in target.parent.iterdir():
+            if old != target and not old.name.startswith("."):
+                shutil.rmtree(old, ignore_errors=True)
+        return target if (target / "user").is_dir() else None
+    except (ConversionError, OSError):
+        return None
+    finally:
+        shutil.rmtree(build, ignore_errors=True)
+
+
+def get_template(config: Config | None = None) -> Path | None:
+    """The warmed-up profile for the configured soffice, built on first use; None if off or unavailable."""
+    config = config or load_config()
+    try:
+        api = config.api_path
+    except Exception:
+        return None
+    if "soffice" not in api.lower() or not config.get_bool("profile_template", True):
+        return None
+    key = template_key(config)
+    with _template_lock:
+        if key not in _templates:
+            path = _template_root(config) / key
+            # a half-built template never has this name: builds are renamed into place
+            _templates[key] = path if (path / "user").is_dir() else _build_template(config, path)
+        return _templates[key]
+
+
+def seed_profile(profile_dir, config: Config | None = None) -> bool:
+    """Fill an empty profile dir from the template; False when there is none."""
+    template = get_template(config)
+    if template is None:
+        return False
+    try:
+        with stage("seed_profile"):
+            shutil.copytree(template, profile_dir, copy_function=copy_file, dirs_exist_ok=True)
+    except (OSError, shutil.Error):
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        Path(profile_dir).mkdir(parents=True, exist_ok=True)
+        return False
+    return True
+
+
+def profile_arg(profile_dir) -> str:
+    return f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}"
+
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def get_slots(config: Config | None = None) -> ProfileSlots:
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = ProfileSlots(default_workers(config), config=config)
+        elif config is not None:
+            _slots.config = config  # profiles are seeded from the caller's template settings
+        return _slots
+
+
+def set_concurrency(n: int, config: Config | None = None):
+    """Change how many one-shot soffice processes may run at once."""
+    global _slots
+    with _slots_lock:
+        if _slots is not None and _slots.size == n:
+            if config is not None:
+                _slots.config = config
+            return
+        if _slots is not None:
+            # jobs already holding a lease keep using it until they release it
+            _slots.retire()
+        _slots = ProfileSlots(n, config=config)
+
+
+@contextmanager
+def lease_profile(config: Config | None = None):
+    with get_slots(config).lease() as p:
+        yield p
+
+
+def _cleanup():
+    if _slots is not None:
+        _slots.close()
+
+
+atexit.register(_cleanup)
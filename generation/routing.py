@@ -0,0 +1,228 @@
+"""
+Conversion graph and route planner.
+
+Every registered converter is an edge between two formats. A request for
+(src, dst) runs along the cheapest path in that graph, so pptx -> docx
+works as pptx -> pdf -> docx even though no converter does it directly.
+
+An edge's cost for an input of S MB is `overhead + S * seconds_per_mb`.
+Both numbers are fitted from measured conversions (decayed least squares)
+and start from rough defaults until an edge has been measured a few times.
+Each edge also learns its output/input size ratio, which gives the size of
+the next hop's input. Measurements are saved in conversion_stats.json next
+to config.json (or "stats_path").
+
+Intermediate files live in a temp directory. Only the last hop writes to
+the requested output path.
+"""
+import atexit, heapq, json, os, tempfile, threading, time
+from pathlib import Path
+from .config import Config, load_config
+from .instrument import stage
+
+# (overhead seconds, seconds per MB) before an edge has been measured
+DEFAULT_COST = (3.0, 1.0)
+DEFAULT_COSTS = {
+    ("pdf", "docx"): (1.0, 4.0),
+}
+MIN_SAMPLES = 3   # measurements before the fit replaces the default
+DECAY = 0.95      # weight of older measurements per new one
+SAVE_EVERY = 5.0  # seconds between stats file writes
+
+
+def edge_key(src: str, dst: str) -> str:
+    return f"{src}>{dst}"
+
+
+class EdgeStats:
+    """Decayed sums for a seconds ~ overhead + per_mb * MB fit, plus size ratio and failures."""
+    __slots__ = ("n", "sx", "sy", "sxx", "sxy", "ratio", "ok", "failed")
+
+    def __init__(self, n=0.0, sx=0.0, sy=0.0, sxx=0.0, sxy=0.0, ratio=1.0, ok=0, failed=0):
+        self.n, self.sx, self.sy, self.sxx, self.sxy = n, sx, sy, sxx, sxy
+        self.ratio, self.ok, self.failed = ratio, ok, failed
+
+    def add(self, mb: float, seconds: float, out_ratio: float | None):
+        d = DECAY
+        self.n = self.n * d + 1
+        self.sx = self.sx * d + mb
+        self.sy = self.sy * d + seconds
+        self.sxx = self.sxx * d + mb * mb
+        self.sxy = self.sxy * d + mb * seconds
+        if out_ratio is not None:
+            self.ratio = out_ratio if self.ok == 0 else 0.8 * self.ratio + 0.2 * out_ratio
+        self.ok += 1
+
+    def model(self, default: tuple[float, float]) -> tuple[float, float]:
+        if self.ok < MIN_SAMPLES:
+            return default
+        mean_x, mean_y = self.sx / self.n, self.sy / self.n
+        var = self.sxx / self.n - mean_x * mean_x
+        if var <= 1e-9:
+            # every sample had the same size: keep the default slope, fit the overhead
+            slope = default[1]
+        else:
+            slope = max(0.0, (self.sxy / self.n - mean_x * mean_y) / var)
+        return max(0.0, mean_y - slope * mean_x), slope
+
+    def to_list(self) -> list:
+        return [self.n, self.sx, self.sy, self.sxx, self.sxy, self.ratio, self.ok, self.failed]
+
+
+class StatsStore:
+    def __init__(self, path: Path | None):
+        self.path = path
+        self.edges: dict[str, EdgeStats] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        if path is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for k, v in json.load(f).get("edges", {}).items():
+                        self.edges[k] = EdgeStats(*v)
+            except (OSError, ValueError, TypeError):
+                pass
+
+    def get(self, key: str) -> EdgeStats:
+        with self._lock:
+            return self.edges.setdefault(key, EdgeStats())
+
+    def record(self, key: str, in_bytes: int, seconds: float, out_bytes: int | None, ok: bool = True):
+        with self._lock:
+            st = self.edges.setdefault(key, EdgeStats())
+            if ok:
+                ratio = out_bytes / in_bytes if in_bytes and out_bytes else None
+                st.add(in_bytes / (1 << 20), seconds, ratio)
+            else:
+                st.failed += 1
+            self._dirty = True
+            due = time.monotonic() - self._last_save > SAVE_EVERY
+        if due:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            data = json.dumps({"version": 1, "edges": {k: v.to_list() for k, v in self.edges.items()}})
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # read-only config dir: keep learning in memory
+
+
+_stores: dict[str, StatsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_stats(config: Config | None = None) -> StatsStore:
+    config = config or load_config()
+    path = str(config.get("stats_path", "") or "").strip() or str(Path(config.path).parent / "conversion_stats.json")
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = StatsStore(Path(path))
+            atexit.register(store.save)
+        return store
+
+
+def _graph() -> dict[str, list[str]]:
+    from . import _CONVERTERS
+    g: dict[str, list[str]] = {}
+    for src, dst in _CONVERTERS:
+        g.setdefault(src, []).append(dst)
+    return g
+
+
+def reachable(src: str) -> list[str]:
+    """Formats src can be converted to, directly or in several hops."""
+    g, seen, todo = _graph(), {src}, [src]
+    while todo:
+        for nxt in g.get(todo.pop(), []):
+            if nxt not in seen:
+                seen.add(nxt)
+                todo.append(nxt)
+    seen.discard(src)
+    return sorted(seen)
+
+
+def has_route(src: str, dst: str) -> bool:
+    """Whether at least one hop leads from src to dst; src == dst needs a round trip such as docx -> pdf -> docx."""
+    return any(nxt == dst or dst in reachable(nxt) for nxt in _graph().get(src, []))
+
+
+def edge_cost(src: str, dst: str, mb: float, stats: StatsStore) -> tuple[float, float]:
+    """(estimated seconds, output/input size ratio) for one hop."""
+    st = stats.get(edge_key(src, dst))
+    overhead, per_mb = st.model(DEFAULT_COSTS.get((src, dst), DEFAULT_COST))
+    return overhead + per_mb * mb, st.ratio
+
+
+def plan(src: str, dst: str, input_bytes: int = 0, config: Config | None = None) -> list[tuple[str, str]]:
+    """Cheapest non-empty list of (src, dst) hops from src to dst (Dijkstra); RuntimeError if there is none."""
+    stats = get_stats(config)
+    g = _graph()
+    start_mb = input_bytes / (1 << 20)
+    # for src == dst the start is not the goal: leave it open so a round trip can reach it
+    best = {} if src == dst else {src: 0.0}
+    heap = [(0.0, src, start_mb, [])]
+    while heap:
+        cost, fmt, mb, path = heapq.heappop(heap)
+        if fmt == dst and path:
+            return path
+        if cost > best.get(fmt, float("inf")):
+            continue
+        for nxt in g.get(fmt, []):
+            secs, ratio = edge_cost(fmt, nxt, mb, stats)
+            c = cost + secs
+            if c < best.get(nxt, float("inf")):
+                best[nxt] = c
+                heapq.heappush(heap, (c, nxt, mb * ratio, path + [(fmt, nxt)]))
+    raise RuntimeError(f"Unsupported conversion {src} → {dst}")
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def run_hop(src: str, dst: str, input_path: str, output_path: str, config: Config, pages, stats: StatsStore):
+    """Run one registered converter and feed its timing into the stats."""
+    from . import _CONVERTERS
+    in_bytes = _file_size(input_path)
+    t0 = time.perf_counter()
+    try:
+        _CONVERTERS[(src, dst)](input_path, output_path, config=config, pages=pages)
+    except Exception:
+        stats.record(edge_key(src, dst), in_bytes, time.perf_counter() - t0, None, ok=False)
+        raise
+    stats.record(edge_key(src, dst), in_bytes, time.perf_counter() - t0, _file_size(output_path))
+
+
+def routed_converter(src_ext: str, dst_ext: str):
+    """A converter for (src, dst) that plans its path per input at call time."""
+    def _convert(input_path: str, output_path: str, config: Config | None = None, pages=None):
+        config = config or load_config()
+        stats = get_stats(config)
+        hops = plan(src_ext, dst_ext, _file_size(input_path), config)
+        if len(hops) == 1:
+            return run_hop(*hops[0], input_path, output_path, config, pages, stats)
+        with stage("route", extra={"hops": "->".join([hops[0][0]] + [d for _, d in hops])}), \
+                tempfile.TemporaryDirectory(prefix="route_") as td:
+            current = input_path
+            stem = Path(output_path).stem
+            for i, (a, b) in enumerate(hops):
+                last = i == len(hops) - 1
+                target = output_path if last else os.path.join(td, f"{i}_{stem}.{b}")
+                # the page range applies to the original document, i.e. the first hop
+                run_hop(a, b, current, target, config, pages if i == 0 else None, stats)
+                current = target
+    return _convert
@@ -0,0 +1,231 @@
+"""
+Ordering and memory admission for queued conversions.
+
+Every job gets a cost estimate from its input size and formats: seconds from
+the measured conversion stats (see routing.py) and memory from a per-format
+rule of thumb. Waiting jobs run shortest-first, but a job's priority improves
+by `aging` seconds for every second it waits, so a large deck is delayed by
+small jobs for at most about its own run time.
+
+A job is admitted only while the estimated memory of everything running,
+plus its own, fits in the budget ("memory_budget_mb", default 75% of RAM).
+A job larger than the whole budget runs when nothing else does. A job that
+does not fit can be overtaken by smaller ones that do, until it has waited
+MAX_BYPASS seconds; from then on it holds the queue until memory frees up.
+
+JobQueue is the queue on its own (the HTTP service pulls from it);
+Scheduler adds worker threads and futures, like a ThreadPoolExecutor.
+"""
+import os, queue, threading, time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from .config import Config, load_config
+from .utils import guess_ext
+
+# resident memory rule of thumb: (base MB, MB per MB of input) per conversion
+MEMORY_MODEL = {
+    ("docx", "pdf"): (250, 4),
+    ("ppt", "pdf"): (300, 6),     # slides hold decoded images
+    ("pptx", "pdf"): (300, 6),
+    ("pdf", "docx"): (150, 12),   # PyMuPDF page objects plus pdf2docx layout
+}
+DEFAULT_MEMORY = (250, 6)
+AGING = 1.0        # priority gained per second of waiting
+MAX_BYPASS = 30.0  # seconds a job that does not fit may be overtaken
+
+
+@dataclass
+class JobCost:
+    seconds: float = 1.0
+    memory_mb: float = float(DEFAULT_MEMORY[0])
+
+
+def _file_mb(path: str) -> float:
+    try:
+        return os.path.getsize(path) / (1 << 20)
+    except OSError:
+        return 0.0
+
+
+def estimate(input_path: str, dst_ext: str, config: Config | None = None) -> JobCost:
+    """Expected seconds and peak memory for converting input_path to dst_ext."""
+    from .routing import edge_cost, get_stats, plan
+    config = config or load_config()
+    src = guess_ext(input_path)
+    mb = _file_mb(input_path)
+    try:
+        hops = plan(src, dst_ext, int(mb * (1 << 20)), config)
+    except RuntimeError:
+        hops = []
+    if not hops:
+        return JobCost()
+    stats = get_stats(config)
+    seconds = memory = 0.0
+    for hop in hops:
+        base, per_mb = MEMORY_MODEL.get(hop, DEFAULT_MEMORY)
+        memory = max(memory, base + per_mb * mb)
+        secs, ratio = edge_cost(*hop, mb, stats)
+        seconds += secs
+        mb *= ratio
+    return JobCost(seconds, memory)
+
+
+def default_budget_mb(config: Config | None = None) -> float:
+    """"memory_budget_mb" from config, else 75% of physical memory (unlimited if unknown)."""
+    mb = (config or load_config()).get_int("memory_budget_mb", 0)
+    if mb > 0:
+        return float(mb)
+    try:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return float("inf")
+    return total * 0.75 / (1 << 20)
+
+
+@dataclass
+class _Entry:
+    item: object
+    cost: JobCost
+    queued: float = field(default_factory=time.monotonic)
+
+    def priority(self, now: float, aging: float) -> float:
+        return self.cost.seconds - aging * (now - self.queued)
+
+
+class JobQueue:
+    """Shortest-job-first queue with aging and a memory budget for admission."""
+
+    def __init__(self, maxsize: int = 0, memory_mb: float | None = None, aging: float = AGING,
+                 max_bypass: float = MAX_BYPASS):
+        self.maxsize = maxsize
+        self.memory_mb = float("inf") if memory_mb is None else memory_mb
+        self.aging = aging
+        self.max_bypass = max_bypass
+        self._pending: list[_Entry] = []
+        self._held: dict[object, list[float]] = {}
+        self._running = 0
+        self._in_use = 0.0
+        self._cond = threading.Condition()
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def full(self) -> bool:
+        with self._cond:
+            return 0 < self.maxsize <= len(self._pending)
+
+    def memory_in_use(self) -> float:
+        with self._cond:
+            return self._in_use
+
+    def put(self, item, cost: JobCost | None = None):
+        """Add a job; raises queue.Full when maxsize jobs are already waiting."""
+        with self._cond:
+            if 0 < self.maxsize <= len(self._pending):
+                raise queue.Full
+            self._pending.append(_Entry(item, cost or JobCost()))
+            self._cond.notify()
+
+    def _pick(self) -> _Entry | None:
+        now = time.monotonic()
+        for e in sorted(self._pending, key=lambda e: e.priority(now, self.aging)):
+            if self._running == 0 or self._in_use + e.cost.memory_mb <= self.memory_mb:
+                return e
+            if now - e.queued >= self.max_bypass:
+                return None  # hold the queue until this one fits
+        return None
+
+    def get(self, timeout: float | None = None):
+        """Next admitted job; raises queue.Empty after timeout. Call done(item) when it finishes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                e = self._pick()
+                if e is not None:
+                    self._pending.remove(e)
+                    self._running += 1
+                    self._in_use += e.cost.memory_mb
+                    self._held.setdefault(e.item, []).append(e.cost.memory_mb)
+                    return e.item
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    raise queue.Empty
+                # a held job becomes due without any notify once it passes
+                # MAX_BYPASS, so wake up now and then to re-rank
+                self._cond.wait(1.0 if left is None else min(left, 1.0))
+
+    def done(self, item):
+        with self._cond:
+            held = self._held.get(item)
+            if not held:
+                return
+            mb = held.pop()
+            if not held:
+                del self._held[item]
+            self._running -= 1
+            self._in_use = max(0.0, self._in_use - mb)
+            self._cond.notify_all()
+
+
+class _Task:
+    __slots__ = ("future", "fn", "args", "kwargs")
+
+    def __init__(self, fn, args, kwargs):
+        self.future, self.fn, self.args, self.kwargs = Future(), fn, args, kwargs
+
+    def run(self):
+        if not self.future.set_running_or_notify_cancel():
+            return
+        try:
+            self.future.set_result(self.fn(*self.args, **self.kwargs))
+        except BaseException as e:
+            self.future.set_exception(e)
+
+
+class Scheduler:
+    """
+    A ThreadPoolExecutor-like pool whose jobs go through a JobQueue:
+    submit(cost, fn, *args) returns a Future.
+    """
+
+    def __init__(self, max_workers: int, config: Config | None = None, memory_mb: float | None = None,
+                 name: str = "sched"):
+        config = config or load_config()
+        self.queue = JobQueue(memory_mb=memory_mb if memory_mb is not None else default_budget_mb(config))
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+                         for i in range(max(1, max_workers))]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, cost: JobCost | None, fn, *args, **kwargs) -> Future:
+        task = _Task(fn, args, kwargs)
+        self.queue.put(task, cost)
+        return task.future
+
+    def _work(self):
+        while True:
+            try:
+                task = self.queue.get(timeout=0.2)
+            except queue.Empty:
+                if self._stop.is_set() and self.queue.qsize() == 0:
+                    return
+                continue
+            try:
+                task.run()
+            finally:
+                self.queue.done(task)
+
+    def shutdown(self, wait: bool = True):
+        """Finish queued jobs, then stop the workers."""
+        self._stop.set()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
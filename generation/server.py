@@ -0,0 +1,446 @@
+"""
+Local HTTP conversion service: python -m generation.server [--port 8765]
+
+    POST   /jobs?to=pdf&filename=report.docx[&pages=1-3]   body = the file
+           -> 202 {"id": ..., "status": "queued", ...}    429 when the queue is full
+    GET    /jobs/<id>           status as JSON
+    GET    /jobs/<id>/result    the converted file (409 until it is done)
+    DELETE /jobs/<id>           cancel a queued job / drop a finished one
+    GET    /health              liveness plus queue depth
+    GET    /metrics             Prometheus text format
+
+Uploads and downloads are streamed in 1 MB blocks through a spool directory,
+so file size does not drive memory use. A fixed set of worker threads
+converts jobs from a bounded queue, small jobs first and within the memory
+budget (see scheduler.py). Finished jobs and their files are
+removed after server_result_ttl seconds. Stdlib only; binds to 127.0.0.1
+unless told otherwise.
+"""
+import argparse, json, os, queue, shutil, tempfile, threading, time, uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlparse
+from .config import Config, load_config
+from .errors import error_kind
+from .instrument import PrometheusSink, add_hook, remove_hook
+from .profiles import default_workers, set_concurrency
+from .scheduler import JobQueue, default_budget_mb, estimate
+from .utils import EXT_MAP, normalize_pages
+
+BLOCK = 1 << 20
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+_CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def _content_disposition(name: str) -> str:
+    """
+    Attachment header for a client-supplied name (RFC 6266): an ASCII
+    fallback without quotes, backslashes or control characters, and the
+    full name percent-encoded in filename*.
+    """
+    name = "".join(c for c in name if c.isprintable())
+    fallback = "".join(c if " " <= c < "\x7f" and c not in '"\\' else "_" for c in name) or "download"
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(name, safe='')}"
+
+
+@dataclass
+class ServerJob:
+    id: str
+    filename: str
+    src_ext: str
+    dst_ext: str
+    input_path: str
+    output_path: str
+    pages: str | None = None
+    status: str = QUEUED
+    error: str | None = None
+    kind: str | None = None
+    input_bytes: int = 0
+    output_bytes: int = 0
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+
+    def to_dict(self) -> dict:
+        d = {k: getattr(self, k) for k in ("id", "filename", "status", "error", "kind", "pages",
+                                            "input_bytes", "output_bytes", "created", "started", "finished")}
+        d["to"] = self.dst_ext
+        if self.started and self.finished:
+            d["seconds"] = round(self.finished - self.started, 4)
+        return d
+
+
+class ConversionService:
+    """Bounded job queue, worker threads and job bookkeeping; independent of HTTP."""
+
+    def __init__(self, config: Config | None = None, workers: int | None = None, queue_size: int | None = None,
+                 spool: str | None = None, result_ttl: float | None = None):
+        self.config = config or load_config()
+        self.workers = max(1, workers or self.config.get_int("server_workers", default_workers(self.config)))
+        self.queue_size = max(1, queue_size or self.config.get_int("server_queue", 64))
+        self.result_ttl = result_ttl if result_ttl is not None else float(self.config.get("server_result_ttl", 3600))
+        self.max_upload = self.config.get_int("server_max_upload_mb", 512) << 20
+        self._own_spool = spool is None and not self.config.get("server_spool")
+        self.spool = Path(spool or self.config.get("server_spool") or tempfile.mkdtemp(prefix="pdfgen_srv_"))
+        self.spool.mkdir(parents=True, exist_ok=True)
+
+        # shortest job first, admitted within the memory budget (scheduler.py)
+        self._queue = JobQueue(self.queue_size, default_budget_mb(self.config))
+        self._jobs: dict[str, ServerJob] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "cancelled": 0}
+        self.busy_seconds = 0.0
+        self.metrics = add_hook(PrometheusSink(str(self.spool / "stages.prom"), interval=float("inf")))
+
+        set_concurrency(self.workers, self.config)
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._work, name=f"convert-{i}", daemon=True)
+                         for i in range(self.workers)]
+        self._threads.append(threading.Thread(target=self._janitor, name="janitor", daemon=True))
+        for t in self._threads:
+            t.start()
+
+    # ---------- jobs ----------
+    def targets_for(self, src_ext: str) -> list[str]:
+        from . import available_targets_for
+        return available_targets_for(src_ext)
+
+    def has_room(self) -> bool:
+        return not self._queue.full()
+
+    def new_job(self, filename: str, to: str, pages=None) -> ServerJob:
+        name = Path(filename.replace("\\", "/")).name or "input"
+        src_ext = Path(name).suffix.lower().lstrip(".")
+        dst_ext = EXT_MAP.get(to.upper(), to.lower().lstrip("."))
+        if dst_ext not in self.targets_for(src_ext):
+            raise ValueError(f"Unsupported conversion {src_ext or '?'} -> {dst_ext}")
+        pages = normalize_pages(pages)
+        job_id = uuid.uuid4().hex
+        d = self.spool / job_id
+        d.mkdir()
+        stem = Path(name).stem or "input"
+        return ServerJob(job_id, name, src_ext, dst_ext, str(d / f"{stem}.{src_ext}"),
+                         str(d / f"{stem}.{dst_ext}"), pages)
+
+    def submit(self, job: ServerJob) -> bool:
+        """Queue a job whose input is in place; False (and cleaned up) if the queue is full."""
+        with self._lock:
+            # registered before it is queued, so a worker always finds it
+            self._jobs[job.id] = job
+            try:
+                self._queue.put(job.id, estimate(job.input_path, job.dst_ext, self.config))
+            except queue.Full:
+                del self._jobs[job.id]
+                self.counters["rejected"] += 1
+            else:
+                self.counters["submitted"] += 1
+                return True
+        self.discard(job)
+        return False
+
+    def reject(self):
+        with self._lock:
+            self.counters["rejected"] += 1
+
+    def discard(self, job: ServerJob):
+        shutil.rmtree(Path(job.input_path).parent, ignore_errors=True)
+
+    def get(self, job_id: str) -> ServerJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> ServerJob | None:
+        """Cancel a queued job or forget a finished one; running jobs are left alone."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status == RUNNING:
+                return job
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished = time.time()
+                self.counters["cancelled"] += 1
+            else:
+                del self._jobs[job_id]
+        self.discard(job)
+        return job
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._run(job_id)
+            finally:
+                self._queue.done(job_id)
+
+    def _run(self, job_id: str):
+        from . import get_converter
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return
+            job.status, job.started = RUNNING, time.time()
+        try:
+            get_converter(job.src_ext, job.dst_ext)(job.input_path, job.output_path,
+                                                     config=self.config, pages=job.pages)
+            status, error, kind = DONE, None, None
+            out_bytes = os.path.getsize(job.output_path)
+        except Exception as e:
+            status, error, kind, out_bytes = FAILED, f"{type(e).__name__}: {e}", error_kind(e), 0
+        with self._lock:
+            job.status, job.error, job.kind, job.output_bytes = status, error, kind, out_bytes
+            job.finished = time.time()
+            self.counters[status] += 1
+            self.busy_seconds += job.finished - job.started
+        try:
+            os.remove(job.input_path)
+        except OSError:
+            pass
+
+    def _janitor(self):
+        while not self._stop.wait(min(60.0, max(1.0, self.result_ttl / 4))):
+            cutoff = time.time() - self.result_ttl
+            with self._lock:
+                old = [j for j in self._jobs.values() if j.finished and j.finished < cutoff]
+                for j in old:
+                    del self._jobs[j.id]
+            for j in old:
+                self.discard(j)
+
+    # ---------- reporting ----------
+    def snapshot(self) -> dict:
+        with self._lock:
+            by_status = {s: 0 for s in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+            for j in self._jobs.values():
+                by_status[j.status] += 1
+            return {
+                "status": "ok",
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.queue_size,
+                "memory_in_use_mb": round(self._queue.memory_in_use(), 1),
+                "jobs": by_status,
+                "totals": dict(self.counters),
+                "busy_seconds": round(self.busy_seconds, 3),
+            }
+
+    def prometheus(self) -> str:
+        s = self.snapshot()
+        lines = [
+            "# TYPE pdf_creator_server_queue_depth gauge",
+            f"pdf_creator_server_queue_depth {s['queue_depth']}",
+            "# TYPE pdf_creator_server_queue_capacity gauge",
+            f"pdf_creator_server_queue_capacity {s['queue_capacity']}",
+            "# TYPE pdf_creator_server_workers gauge",
+            f"pdf_creator_server_workers {s['workers']}",
+            "# TYPE pdf_creator_server_jobs gauge",
+        ]
+        lines += [f'pdf_creator_server_jobs{{status="{k}"}} {v}' for k, v in s["jobs"].items()]
+        lines.append("# TYPE pdf_creator_server_jobs_total counter")
+        lines += [f'pdf_creator_server_jobs_total{{result="{k}"}} {v}' for k, v in s["totals"].items()]
+        lines += ["# TYPE pdf_creator_server_busy_seconds_total counter",
+                  f"pdf_creator_server_busy_seconds_total {s['busy_seconds']}"]
+        return "\n".join(lines) + "\n" + self.metrics.render()
+
+    def close(self):
+        self._stop.set()
+        remove_hook(self.metrics)
+        for t in self._threads:
+            t.join(timeout=5)
+        if self._own_spool:
+            shutil.rmtree(self.spool, ignore_errors=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "PDFCreator"
+    protocol_version = "HTTP/1.1"
+    service: ConversionService = None  # set by make_server
+
+    def log_message(self, fmt, *args):
+        if not self.server.quiet:
+            super().log_message(fmt, *args)
+
+    # ---------- helpers ----------
+    def _json(self, code: int, body: dict, headers: dict | None = None):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, code: int, message: str, headers: dict | None = None):
+        self._json(code, {"error": message}, headers)
+
+    def _refuse_body(self, code: int, message: str, headers: dict | None = None):
+        # the client may still be sending; answer and drop the connection
+        self.close_connection = True
+        self._error(code, message, dict(headers or {}, Connection="close"))
+
+    def _read_body_to(self, path: str) -> int:
+        """Stream the request body into path; supports Content-Length and chunked encoding."""
+        limit = self.service.max_upload
+        written = 0
+        with open(path, "wb") as f:
+            if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+                while True:
+                    size = int(self.rfile.readline().split(b";", 1)[0].strip() or b"0", 16)
+                    if size == 0:
+                        while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                            pass  # trailers
+                        break
+                    written += size
+                    if written > limit:
+                        raise OverflowError
+                    while size:
+                        block = self.rfile.read(min(BLOCK, size))
+                        if not block:
+                            raise ConnectionError("upload ended early")
+                        f.write(block)
+                        size -= len(block)
+                    self.rfile.readline()
+            else:
+                remaining = int(self.headers.get("Content-Length", "0"))
+                if remaining > limit:
+                    raise OverflowError
+                while remaining:
+                    block = self.rfile.read(min(BLOCK, remaining))
+                    if not block:
+                        raise ConnectionError("upload ended early")
+                    f.write(block)
+                    remaining -= len(block)
+                    written += len(block)
+        return written
+
+    def _route(self) -> tuple[list[str], dict]:
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        return parts, {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+    # ---------- verbs ----------
+    def do_GET(self):
+        parts, _ = self._route()
+        svc = self.service
+        if parts == ["health"]:
+            return self._json(200, svc.snapshot())
+        if parts == ["metrics"]:
+            data = svc.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = svc.get(parts[1])
+            if job is None:
+                return self._error(404, "no such job")
+            if len(parts) == 2:
+                return self._json(200, job.to_dict())
+            if parts[2] == "result":
+                return self._send_result(job)
+        self._error(404, "not found")
+
+    def _send_result(self, job: ServerJob):
+        if job.status != DONE:
+            return self._json(409, job.to_dict())
+        try:
+            f = open(job.output_path, "rb")
+        except OSError:
+            return self._error(410, "result expired")
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            self.send_response(200)
+            self.send_header("Content-Type", _CONTENT_TYPES.get(job.dst_ext, "application/octet-stream"))
+            self.send_header("Content-Length", str(size))
+            self.send_header("Content-Disposition", _content_disposition(f"{Path(job.filename).stem}.{job.dst_ext}"))
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, BLOCK)
+
+    def do_POST(self):
+        parts, q = self._route()
+        svc = self.service
+        if parts != ["jobs"]:
+            return self._refuse_body(404, "not found")
+        if not svc.has_room():
+            svc.reject()
+            return self._refuse_body(429, "queue full", {"Retry-After": "1"})
+        filename = q.get("filename") or self.headers.get("X-Filename", "")
+        try:
+            job = svc.new_job(filename, q.get("to", "pdf"), q.get("pages"))
+        except ValueError as e:
+            return self._refuse_body(400, str(e))
+        try:
+            job.input_bytes = self._read_body_to(job.input_path)
+        except OverflowError:
+            svc.discard(job)
+            return self._refuse_body(413, f"upload larger than {svc.max_upload >> 20} MB")
+        except (ConnectionError, ValueError) as e:
+            svc.discard(job)
+            return self._refuse_body(400, f"bad upload: {e}")
+        if not svc.submit(job):
+            return self._error(429, "queue full", {"Retry-After": "1"})
+        self._json(202, dict(job.to_dict(), status_url=f"/jobs/{job.id}", result_url=f"/jobs/{job.id}/result"),
+                   {"Location": f"/jobs/{job.id}"})
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._error(404, "not found")
+        job = self.service.cancel(parts[1])
+        if job is None:
+            return self._error(404, "no such job")
+        if job.status == RUNNING:
+            return self._json(409, job.to_dict())
+        self._json(200, job.to_dict())
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, service: ConversionService | None = None,
+                quiet: bool = False) -> ThreadingHTTPServer:
+    service = service or ConversionService()
+    handler = type("Handler", (_Handler,), {"service": service})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    httpd.quiet = quiet
+    httpd.service = service
+    return httpd
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m generation.server", description="Local HTTP conversion service.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("-j", "--workers", type=int, help="conversion threads (default: server_workers / workers)")
+    ap.add_argument("--queue", type=int, help="max queued jobs before 429 (default: server_queue or 64)")
+    ap.add_argument("--config", help="path to config.json")
+    ap.add_argument("--quiet", action="store_true", help="no access log")
+    args = ap.parse_args(argv)
+
+    service = ConversionService(load_config(args.config), workers=args.workers, queue_size=args.queue)
+    httpd = make_server(args.host, args.port, service, args.quiet)
+    print(f"Serving on http://{args.host}:{httpd.server_address[1]} "
+          f"({service.workers} workers, queue {service.queue_size})", flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
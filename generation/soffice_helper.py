@@ -1,14 +1,79 @@
 from pathlib import Path
-import tempfile
-from .api_runner import get_api_path, run_office_api
-from .utils import ensure_parent_dir, remove_if_exists, atomic_move_with_retries
+import json, os
+from .api_runner import get_api_path, job_timeout, run_office_api
+from .config import Config, load_config
+from .errors import BadInput, ConversionError
+from .instrument import stage, tagged
+from .utils import ensure_parent_dir, remove_if_exists, atomic_move_with_retries, guess_ext, staging_dir
+from . import soffice_pool
+from .profiles import lease_profile, profile_arg, reset_profile
 
-def convert_with_soffice(input_path: str, output_path: str, to_filter: str):
+_SOFFICE_FLAGS = ["--headless", "--norestore", "--nolockcheck", "--nodefault"]
+
+# extra attempts on a fresh profile after a timeout or crash ("soffice_retries")
+DEFAULT_RETRIES = 1
+
+# source suffix -> PDF export filter that understands the PageRange option
+_PDF_EXPORT_FILTERS = {
+    "doc": "writer_pdf_Export", "docx": "writer_pdf_Export", "odt": "writer_pdf_Export", "rtf": "writer_pdf_Export",
+    "ppt": "impress_pdf_Export", "pptx": "impress_pdf_Export", "odp": "impress_pdf_Export",
+}
+
+def with_page_range(to_filter: str, src_ext: str, pages: str | None) -> str:
+    """
+    Add a PageRange export option to a --convert-to filter (LibreOffice 7.4+
+    JSON filter options), e.g. 'pdf' -> 'pdf:writer_pdf_Export:{"PageRange":...}'.
+    """
+    if pages is None:
+        return to_filter
+    if to_filter.split(":", 1)[0].lower() != "pdf":
+        raise RuntimeError("LibreOffice only supports page ranges for PDF output.")
+    export = _PDF_EXPORT_FILTERS.get(src_ext.lower(), "writer_pdf_Export")
+    return f"pdf:{export}:" + json.dumps({"PageRange": {"type": "string", "value": pages}})
+
+def _find_produced(outdir: Path, stem: str, target_suffix: str) -> Path | None:
+    produced = outdir / (stem + target_suffix)
+    if produced.exists():
+        return produced
+    # Fallback: any file with same stem and right suffix
+    for c in outdir.glob(stem + ".*"):
+        if c.suffix.lower() == target_suffix:
+            return c
+    return None
+
+def _run_soffice(args: list[str], config: Config, timeout: float, input_path: str | None = None,
+                 retries: int | None = None):
+    """
+    One-shot soffice run on a leased profile. A run that times out or crashes
+    is retried on a wiped profile, since a killed soffice can leave its
+    profile locked or half written; a rejected document is not retried.
+    """
+    if retries is None:
+        retries = max(0, config.get_int("soffice_retries", DEFAULT_RETRIES))
+    for attempt in range(retries + 1):
+        with lease_profile(config) as profile:
+            try:
+                return run_office_api([profile_arg(profile), *args], config=config,
+                                      timeout=timeout, input_path=input_path)
+            except ConversionError as e:
+                if not e.retryable or attempt == retries:
+                    raise
+                reset_profile(profile, config)
+
+def convert_with_soffice(input_path: str, output_path: str, to_filter: str, config: Config | None = None,
+                         pages: str | None = None, infilter: str | None = None):
     """
-    Use LibreOffice to convert file, write to a temp dir, then atomically move.
+    Use LibreOffice to convert file, write to a hidden temp dir beside the output, then rename.
     to_filter examples: 'pdf', 'docx'
+    pages: optional 1-based range such as '1-3,7' (PDF output only)
+    infilter: import filter to force, e.g. 'writer_pdf_import' to edit a PDF in Writer
+    Goes through the persistent soffice pool when UNO is available,
+    otherwise launches a one-shot soffice process on a leased profile so
+    overlapping calls run side by side instead of queueing on one instance.
+    The time limit grows with the input size (see api_runner.job_timeout).
     """
-    api = get_api_path().lower()
+    config = config or load_config()
+    api = get_api_path(config).lower()
     if "soffice" not in api:
         raise RuntimeError("Configured API is not LibreOffice (soffice).")
 
@@ -16,23 +81,85 @@ def convert_with_soffice(input_path: str, output_path: str, to_filter: str):
     dst = Path(output_path)
     target_suffix = "." + dst.suffix.lstrip(".").lower()
 
-    ensure_parent_dir(output_path)
-    remove_if_exists(output_path)
+    with stage("prepare"):
+        ensure_parent_dir(output_path)
+        remove_if_exists(output_path)
+
+    if not src.is_file():
+        raise BadInput(f"Input file not found: {src}", input_path)
+    timeout = job_timeout(config, src.stat().st_size)
 
-    with tempfile.TemporaryDirectory(prefix="lo_convert_") as tmpdir:
-        run_office_api([
-            "--headless", "--norestore", "--nolockcheck", "--nodefault",
-            "--convert-to", to_filter,
+    with staging_dir(output_path, "lo_convert_") as tmpdir:
+        if soffice_pool.available(config):
+            produced = Path(tmpdir) / (src.stem + target_suffix)
+            with stage("pool", backend="soffice"):
+                soffice_pool.get_pool(config).convert(str(src), str(produced), to_filter, pages=pages,
+                                                      timeout=timeout, infilter=infilter)
+            atomic_move_with_retries(str(produced), str(dst))
+            return
+        run = _run_soffice([
+            *_SOFFICE_FLAGS,
+            *([f"--infilter={infilter}"] if infilter else []),
+            "--convert-to", with_page_range(to_filter, guess_ext(input_path), pages),
             "--outdir", tmpdir,
             str(src)
-        ])
-        produced = Path(tmpdir) / (src.stem + target_suffix)
-        if not produced.exists():
-            # Fallback: any file with same stem and right suffix
-            for c in Path(tmpdir).glob(src.stem + ".*"):
-                if c.suffix.lower() == target_suffix:
-                    produced = c
-                    break
-        if not produced.exists():
-            raise FileNotFoundError(f"LibreOffice did not produce expected file: {produced}")
+        ], config, timeout, input_path)
+        with stage("find_output"):
+            produced = _find_produced(Path(tmpdir), src.stem, target_suffix)
+        if produced is None:
+            # soffice exits 0 after "source file could not be loaded"
+            raise BadInput(f"LibreOffice did not produce {src.stem + target_suffix}: {run.stdout[-300:]}",
+                           input_path, run.returncode, run.stdout)
         atomic_move_with_retries(str(produced), str(dst))
+
+def convert_batch_with_soffice(jobs: list[tuple[str, str]], to_filter: str,
+                               config: Config | None = None) -> list[Exception | None]:
+    """
+    Convert several (input_path, output_path) pairs in a single soffice run
+    sharing one temp outdir, then move each produced file to its output path.
+    Input stems must be unique within the batch (soffice names outputs after them).
+    Returns one entry per job: None on success, otherwise the error for that file.
+    A run of several files is not retried: after a timeout or crash every file
+    without output carries that error, and the caller decides which files to
+    retry alone. A single file gets the usual "soffice_retries" retries.
+    """
+    config = config or load_config()
+    api = get_api_path(config).lower()
+    if "soffice" not in api:
+        raise RuntimeError("Configured API is not LibreOffice (soffice).")
+
+    with stage("prepare", extra={"files": len(jobs)}):
+        for _, out in jobs:
+            ensure_parent_dir(out)
+            remove_if_exists(out)
+
+    errors: list[Exception | None] = [None] * len(jobs)
+    # staged beside the first output; a batch normally shares one output folder
+    with staging_dir(jobs[0][1], "lo_batch_") as tmpdir:
+        run_err, output = None, ""
+        total = sum(os.path.getsize(inp) for inp, _ in jobs if os.path.isfile(inp))
+        try:
+            output = _run_soffice([
+                *_SOFFICE_FLAGS,
+                "--convert-to", to_filter,
+                "--outdir", tmpdir,
+                *[str(Path(inp)) for inp, _ in jobs]
+            ], config, job_timeout(config, total), jobs[0][0] if len(jobs) == 1 else None,
+                retries=None if len(jobs) == 1 else 0).stdout
+        except Exception as e:
+            # soffice may still have written some outputs before failing
+            run_err = e
+        for k, (inp, out) in enumerate(jobs):
+            target_suffix = "." + Path(out).suffix.lstrip(".").lower()
+            with tagged(inp, "soffice"):
+                with stage("find_output"):
+                    produced = _find_produced(Path(tmpdir), Path(inp).stem, target_suffix)
+                if produced is None:
+                    errors[k] = run_err or BadInput(
+                        f"LibreOffice did not produce output for: {inp}", inp, 0, output)
+                    continue
+                try:
+                    atomic_move_with_retries(str(produced), out)
+                except Exception as e:
+                    errors[k] = e
+    return errors
@@ -0,0 +1,254 @@
+"""
+Pool of long-lived headless LibreOffice instances driven over UNO.
+
+Each worker owns one soffice process listening on a private named pipe and
+its own user profile, so the multi-second cold start is paid once per worker
+instead of once per document. A worker whose process dies, or whose job runs
+past the timeout, is killed and started again on the next job.
+
+The pool needs the `uno` module that ships with LibreOffice's Python. When it
+is missing (or "soffice_pool" is false in the config), `available()` returns
+False and callers fall back to the one-shot `soffice --convert-to` path.
+Pool size is "soffice_workers", defaulting to "workers".
+"""
+import atexit, os, queue, shutil, subprocess, tempfile, threading, time, uuid
+from pathlib import Path
+from .api_runner import child_memory_limit, kill_tree, new_group_kwargs, no_window_kwargs, with_memory_limit
+from .config import Config, load_config
+from .errors import BackendCrash, BadInput, ConversionTimeout
+from .profiles import default_workers, seed_profile
+
+START_TIMEOUT = 60.0
+JOB_TIMEOUT = 300.0
+
+# (target suffix, document service) -> export filter name
+_EXPORT_FILTERS = {
+    ("pdf", "com.sun.star.text.TextDocument"): "writer_pdf_Export",
+    ("pdf", "com.sun.star.presentation.PresentationDocument"): "impress_pdf_Export",
+    ("pdf", "com.sun.star.sheet.SpreadsheetDocument"): "calc_pdf_Export",
+    ("pdf", "com.sun.star.drawing.DrawingDocument"): "draw_pdf_Export",
+    ("docx", "com.sun.star.text.TextDocument"): "MS Word 2007 XML",
+    ("pptx", "com.sun.star.presentation.PresentationDocument"): "Impress MS PowerPoint 2007 XML",
+}
+
+
+def available(config: Config | None = None) -> bool:
+    if not (config or load_config()).get_bool("soffice_pool", True):
+        return False
+    try:
+        import uno  # noqa
+    except Exception:
+        return False
+    return True
+
+
+def _props(**kw):
+    from com.sun.star.beans import PropertyValue
+    out = []
+    for k, v in kw.items():
+        p = PropertyValue()
+        p.Name, p.Value = k, v
+        out.append(p)
+    return tuple(out)
+
+
+def _export_filter(doc, target: str) -> str:
+    for (suffix, service), name in _EXPORT_FILTERS.items():
+        if suffix == target and doc.supportsService(service):
+            return name
+    raise RuntimeError(f"No LibreOffice export filter for .{target} from this document type")
+
+
+class SofficeWorker:
+    def __init__(self, api: str, profile_dir: Path, memory_limit: int | None = None, config: Config | None = None):
+        self.api = api
+        self.profile_dir = Path(profile_dir)
+        self.memory_limit = memory_limit
+        self.config = config
+        self.proc = None
+        self.desktop = None
+        self.pipe_name = ""
+        self.timed_out = False
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None and self.desktop is not None
+
+    def start(self):
+        import uno
+        self.pipe_name = f"pdfgen_{os.getpid()}_{uuid.uuid4().hex[:12]}"
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        if not any(self.profile_dir.iterdir()):
+            seed_profile(self.profile_dir, self.config)
+        self.proc = subprocess.Popen(
+            with_memory_limit(
+                [self.api,
+                 "--headless", "--invisible", "--nologo", "--norestore", "--nolockcheck", "--nodefault",
+                 f"-env:UserInstallation={self.profile_dir.resolve().as_uri()}",
+                 f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"],
+                self.memory_limit),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **no_window_kwargs(),
+            **new_group_kwargs()
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local)
+        url = f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+        deadline = time.monotonic() + START_TIMEOUT
+        while True:
+            if self.proc.poll() is not None:
+                raise BackendCrash(f"soffice exited during startup (code {self.proc.returncode})",
+                                   returncode=self.proc.returncode)
+            try:
+                ctx = resolver.resolve(url)
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    self.kill()
+                    raise ConversionTimeout("soffice did not accept UNO connections in time")
+                time.sleep(0.1)
+        self.desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+    def kill(self):
+        self.desktop = None
+        if self.proc is not None and self.proc.poll() is None:
+            try:
+                kill_tree(self.proc)
+                self.proc.wait(timeout=10)
+            except Exception:
+                pass
+        self.proc = None
+
+    def stop(self):
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+        if self.proc is not None:
+            try:
+                self.proc.wait(timeout=10)
+            except Exception:
+                pass
+        self.kill()
+
+    def convert(self, input_path: str, output_path: str, to_filter: str, timeout: float,
+                pages: str | None = None, infilter: str | None = None):
+        import uno
+        target = to_filter.split(":", 1)[0].lower()
+        self.timed_out = False
+
+        def _on_timeout():
+            self.timed_out = True
+            self.kill()
+
+        watchdog = threading.Timer(timeout, _on_timeout)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            load = {"Hidden": True, "ReadOnly": True}
+            if infilter:
+                load["FilterName"] = infilter
+            doc = self.desktop.loadComponentFromURL(
+                Path(input_path).resolve().as_uri(), "_blank", 0, _props(**load))
+            if doc is None:
+                raise BadInput(f"LibreOffice could not open: {input_path}", input_path)
+            try:
+                args = {"FilterName": _export_filter(doc, target), "Overwrite": True}
+                if pages:
+                    args["FilterData"] = uno.Any("[]com.sun.star.beans.PropertyValue", _props(PageRange=pages))
+                # uno.invoke is needed to pass the typed Any inside FilterData
+                uno.invoke(doc, "storeToURL", (Path(output_path).resolve().as_uri(), _props(**args)))
+            finally:
+                doc.close(True)
+        except Exception:
+            if self.timed_out:
+                raise ConversionTimeout(f"LibreOffice conversion exceeded {timeout:.1f}s: {input_path}",
+                                        input_path)
+            raise
+        finally:
+            watchdog.cancel()
+
+
+class SofficePool:
+    def __init__(self, api: str, size: int = 1, job_timeout: float = JOB_TIMEOUT, memory_limit: int | None = None,
+                 config: Config | None = None):
+        self.api = api
+        self.size = max(1, int(size))
+        self.job_timeout = job_timeout
+        self._root = Path(tempfile.mkdtemp(prefix="lo_pool_"))
+        # LIFO so a sequential workload keeps reusing the same warm worker
+        self._idle: queue.Queue = queue.LifoQueue()
+        self._workers = [SofficeWorker(api, self._root / f"worker_{i}", memory_limit, config) for i in range(self.size)]
+        for w in self._workers:
+            self._idle.put(w)
+        self._closed = False
+
+    def convert(self, input_path: str, output_path: str, to_filter: str, pages: str | None = None,
+                timeout: float | None = None, infilter: str | None = None):
+        if self._closed:
+            raise RuntimeError("soffice pool is closed")
+        w = self._idle.get()
+        try:
+            # One retry on a fresh process covers a worker that crashed between
+            # jobs or while loading; a timeout is not retried.
+            for attempt in (1, 2):
+                if not w.alive():
+                    w.kill()
+                    w.start()
+                try:
+                    w.convert(input_path, output_path, to_filter, timeout or self.job_timeout, pages, infilter)
+                    return
+                except TimeoutError:
+                    raise
+                except BadInput:
+                    raise
+                except Exception as e:
+                    if w.alive():
+                        # worker is healthy: the document itself failed
+                        raise BadInput(f"LibreOffice could not convert {input_path}: {e}", input_path) from e
+                    w.kill()
+                    if attempt == 2:
+                        raise BackendCrash(f"soffice worker died converting {input_path}", input_path) from e
+        finally:
+            self._idle.put(w)
+
+    def close(self):
+        self._closed = True
+        for w in self._workers:
+            w.stop()
+        shutil.rmtree(self._root, ignore_errors=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool_size(config: Config | None = None) -> int:
+    config = config or load_config()
+    return max(1, config.get_int("soffice_workers", default_workers(config)))
+
+
+def get_pool(config: Config | None = None) -> SofficePool:
+    global _pool
+    config = config or load_config()
+    api = config.api_path
+    with _pool_lock:
+        if _pool is None or _pool.api != api or _pool._closed:
+            if _pool is not None:
+                _pool.close()
+            _pool = SofficePool(api, size=pool_size(config), memory_limit=child_memory_limit(config),
+                                config=config)
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(shutdown_pool)
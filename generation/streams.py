@@ -0,0 +1,130 @@
+"""
+Conversions on bytes and file objects instead of paths.
+
+    pdf = convert_bytes(docx_data, "docx", "pdf")
+    convert_stream(request_body, response, "pptx", "pdf")
+
+The converters (and soffice) need real files, so the input is staged in a
+private directory under /dev/shm when that is available. The output and the
+converters' own staging then live in RAM as well, and a conversion touches
+no disk. Inputs larger than "shm_max_mb" (default 256), or larger than a
+quarter of the free tmpfs space, go to the regular temp dir instead. A
+stream of unknown length that grows past the limit while being read is
+moved there mid-copy. The staging directory is removed when the call
+returns.
+
+memfd is not used: LibreOffice picks its import filter from the file name,
+and a memfd is only reachable as /proc/self/fd/N.
+"""
+import os, shutil, sys, tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from .config import Config, load_config
+from .instrument import stage
+from .utils import normalize_pages
+
+SHM_DIR = "/dev/shm"
+DEFAULT_SHM_MAX_MB = 256
+BLOCK = 1 << 20
+
+
+def _shm_room(config: Config) -> int:
+    """Bytes an input may have to be staged in /dev/shm; 0 if it is not available."""
+    if not sys.platform.startswith("linux") or not os.access(SHM_DIR, os.W_OK):
+        return 0
+    try:
+        st = os.statvfs(SHM_DIR)
+    except OSError:
+        return 0
+    # input, output and the converter's own copy share the tmpfs
+    return min(config.get_int("shm_max_mb", DEFAULT_SHM_MAX_MB) << 20, st.f_bavail * st.f_frsize // 4)
+
+
+@contextmanager
+def _staging(in_memory: bool):
+    root = SHM_DIR if in_memory else None
+    with tempfile.TemporaryDirectory(prefix="pdfgen_mem_" if in_memory else "pdfgen_", dir=root,
+                                     ignore_cleanup_errors=True) as td:
+        yield Path(td)
+
+
+def _spill(src: Path) -> tuple[Path, "tempfile.TemporaryDirectory"]:
+    td = tempfile.TemporaryDirectory(prefix="pdfgen_", ignore_cleanup_errors=True)
+    dst = Path(td.name) / src.name
+    shutil.move(str(src), dst)
+    return dst, td
+
+
+def _write_input(src, path: Path, limit: int | None):
+    """
+    Copy a file object to path in blocks. Returns (path, spill_dir): once more
+    than `limit` bytes arrived, the file moves to a disk temp dir and the rest
+    follows it there. limit None: never spill.
+    """
+    spill = None
+    written = 0
+    f = open(path, "wb")
+    try:
+        while True:
+            block = src.read(BLOCK)
+            if not block:
+                break
+            if spill is None and limit is not None and written + len(block) > limit:
+                f.close()
+                with stage("spill", input_bytes=written):
+                    path, spill = _spill(path)
+                f = open(path, "ab")
+            f.write(block)
+            written += len(block)
+    finally:
+        f.close()
+    return path, spill
+
+
+def _convert_staged(stage_dir: Path, in_path: Path, src_ext: str, dst_ext: str, config: Config, pages):
+    from . import get_converter
+    out_path = stage_dir / f"output.{dst_ext}"
+    get_converter(src_ext, dst_ext)(str(in_path), str(out_path), config=config, pages=pages)
+    return out_path
+
+
+def convert_bytes(data: bytes, src_ext: str, dst_ext: str, config: Config | None = None, pages=None) -> bytes:
+    """Convert a document held in memory; returns the converted document."""
+    config = config or load_config()
+    pages = normalize_pages(pages)
+    src_ext, dst_ext = src_ext.lower().lstrip("."), dst_ext.lower().lstrip(".")
+    with _staging(len(data) <= _shm_room(config)) as td:
+        in_path = td / f"input.{src_ext}"
+        with stage("stage_input", input_bytes=len(data)):
+            in_path.write_bytes(data)
+        out_path = _convert_staged(td, in_path, src_ext, dst_ext, config, pages)
+        return out_path.read_bytes()
+
+
+def convert_stream(src, dst, src_ext: str, dst_ext: str, config: Config | None = None, pages=None) -> int:
+    """
+    Read a document from the binary file object src and write the converted
+    one to dst, in blocks. Returns the number of bytes written.
+    """
+    config = config or load_config()
+    pages = normalize_pages(pages)
+    src_ext, dst_ext = src_ext.lower().lstrip("."), dst_ext.lower().lstrip(".")
+    room = _shm_room(config)
+    with _staging(room > 0) as td:
+        with stage("stage_input") as ev:
+            in_path, spill = _write_input(src, td / f"input.{src_ext}", room or None)
+            ev.input_bytes = in_path.stat().st_size
+        try:
+            # a spilled input is converted on disk, next to where it ended up
+            out_path = _convert_staged(in_path.parent, in_path, src_ext, dst_ext, config, pages)
+            with open(out_path, "rb") as f:
+                total = 0
+                while True:
+                    block = f.read(BLOCK)
+                    if not block:
+                        return total
+                    dst.write(block)
+                    total += len(block)
+        finally:
+            if spill is not None:
+                spill.cleanup()
@@ -1,5 +1,9 @@
-import os, time, shutil, tempfile
+import errno, os, random, sys, time, shutil, tempfile
+from contextlib import contextmanager
 from pathlib import Path
+from .instrument import enabled, file_size, stage
+
+_FICLONE = 0x40049409  # linux/fs.h
 
 def guess_ext(path: str) -> str:
     return Path(path).suffix.lower().lstrip(".")
@@ -18,19 +22,148 @@ def remove_if_exists(path: str):
         except PermissionError:
             pass
 
-def atomic_move_with_retries(src: str, dst: str, retries: int = 12, delay: float = 0.25):
-    ensure_parent_dir(dst)
-    last_err = None
-    for _ in range(retries):
+@contextmanager
+def staging_dir(output_path: str, prefix: str = "stage_"):
+    """
+    Hidden temp directory next to output_path, so moving a result into place
+    is a rename on the same filesystem instead of a copy out of /tmp. Falls
+    back to the system temp dir when the destination folder is read-only.
+    """
+    parent = Path(output_path).resolve().parent
+    try:
+        parent.mkdir(parents=True, exist_ok=True)
+        td = tempfile.TemporaryDirectory(prefix="." + prefix, dir=parent, ignore_cleanup_errors=True)
+    except OSError:
+        td = tempfile.TemporaryDirectory(prefix=prefix, ignore_cleanup_errors=True)
+    with td as d:
+        yield d
+
+def _clone(fin, fout) -> bool:
+    """Copy an open file in the kernel: reflink (FICLONE) first, then copy_file_range."""
+    if sys.platform.startswith("linux"):
+        try:
+            import fcntl
+            fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+            return True
+        except OSError:
+            pass  # not btrfs/xfs, or across filesystems
+    if hasattr(os, "copy_file_range"):
+        try:
+            while os.copy_file_range(fin.fileno(), fout.fileno(), 1 << 30):
+                pass
+            return True
+        except OSError:
+            fin.seek(0)
+            fout.seek(0)
+            fout.truncate()
+    return False
+
+def copy_file(src: str, dst: str):
+    """shutil.copyfile that shares extents (reflink) or copies in the kernel where it can."""
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        if _clone(fin, fout):
+            return
+        shutil.copyfileobj(fin, fout, 1 << 20)
+
+def _cross_device(e: OSError) -> bool:
+    return e.errno == errno.EXDEV or getattr(e, "winerror", None) == 17  # ERROR_NOT_SAME_DEVICE
+
+def _move(src: str, dst: str):
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if not _cross_device(e):
+            raise
+        # copy beside the target, then rename, so dst is never seen half written
+        part = os.path.join(os.path.dirname(os.path.abspath(dst)), f".{Path(dst).name}.{os.getpid()}.part")
         try:
+            copy_file(src, part)
+            os.replace(part, dst)
+        except BaseException:
+            remove_if_exists(part)
+            raise
+        os.unlink(src)
+
+def atomic_move_with_retries(src: str, dst: str, timeout: float = 3.0, delay: float = 0.02) -> int:
+    """
+    Move src over dst, retrying while the target is locked (Windows viewers
+    and AV scanners). Waits back off from `delay` to at most 1s with jitter,
+    for up to `timeout` seconds in total. Returns the number of retries.
+    """
+    with stage("move") as ev:
+        ensure_parent_dir(dst)
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            ev.retries = attempt
             try:
-                os.replace(src, dst)
+                _move(src, dst)
+                if enabled():
+                    ev.output_bytes = file_size(dst)
+                return attempt
+            except FileNotFoundError:
+                raise
             except OSError:
-                shutil.move(src, dst)
-            return
-        except (PermissionError, OSError) as e:
-            last_err = e
-            time.sleep(delay)
-    raise last_err or RuntimeError("Failed to move file after retries")
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise
+                time.sleep(min(left, random.uniform(0.5, 1.0) * min(1.0, delay * 2 ** attempt)))
+                attempt += 1
+
+MAX_PAGE = 100_000  # no office document comes close; larger numbers are typos or abuse
+
+def normalize_pages(pages) -> str | None:
+    """
+    Canonical 1-based page range, LibreOffice PageRange style: "1-3,7".
+    Accepts None (all pages), such a string, an int, or an iterable of ints.
+    Works on the ranges themselves, so "1-99999" costs no more than "1-2".
+    """
+    if pages is None or pages == "":
+        return None
+    if isinstance(pages, int):
+        spans = [(pages, pages)]
+    elif isinstance(pages, str):
+        spans = []
+        for part in pages.replace(" ", "").split(","):
+            if not part:
+                continue
+            lo, sep, hi = part.partition("-")
+            try:
+                a, b = int(lo), int(hi) if sep else int(lo)
+            except ValueError:
+                raise ValueError(f"Invalid page range: {pages!r}") from None
+            if a > b:
+                raise ValueError(f"Invalid page range: {pages!r}")
+            spans.append((a, b))
+    else:
+        spans = [(int(p), int(p)) for p in pages]
+    if not spans or min(a for a, _ in spans) < 1:
+        raise ValueError(f"Invalid page range: {pages!r} (pages start at 1)")
+    if max(b for _, b in spans) > MAX_PAGE:
+        raise ValueError(f"Invalid page range: {pages!r} (pages go up to {MAX_PAGE})")
+    merged: list[list[int]] = []
+    for a, b in sorted(spans):
+        if merged and a <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in merged)
+
+def page_indexes(pages: str | None, page_count: int) -> list[int]:
+    """0-based page indexes selected by a normalized range, clipped to the document."""
+    if pages is None:
+        return list(range(page_count))
+    out = []
+    for part in pages.split(","):
+        lo, _, hi = part.partition("-")
+        out.extend(range(int(lo) - 1, min(int(hi or lo), page_count)))
+    return out
+
+def page_bounds(pages: str | None) -> tuple[int, int] | None:
+    """(first, last) 1-based if the range is one contiguous run, else None."""
+    if pages is None or "," in pages:
+        return None
+    lo, _, hi = pages.partition("-")
+    return int(lo), int(hi or lo)
 
 EXT_MAP = {"PDF": "pdf", "DOCX": "docx", "PPT": "pptx"}
@@ -0,0 +1,376 @@
+"""
+Hot folders: python -m generation.watch FOLDER... [--to pdf] [-o OUT]
+
+Watches folders (recursively) and converts every supported file that
+appears or changes, writing the output next to it or under --out-dir.
+
+- Linux uses inotify via ctypes. Other systems, a full watch table, or
+  --poll fall back to scanning every few seconds.
+- A file is converted only once its size and mtime have stayed the same for
+  `settle` seconds, so half-copied files are left alone.
+- Files whose output is already newer than the input are skipped.
+- Any number of events for one path collapse into one pending entry, and a
+  path that is queued or converting is not queued again.
+- A bounded worker pool does the conversions.
+- The (size, mtime) of every converted file is kept in a state file. After
+  a restart the start-up scan only stats files, and converts those that
+  changed while the watcher was down.
+"""
+import argparse, json, os, struct, sys, threading, time
+from pathlib import Path
+from .config import Config, load_config
+from .parallel import JobResult, run_job
+from .profiles import default_workers, set_concurrency
+from .scheduler import Scheduler, estimate
+from .utils import EXT_MAP, guess_ext
+
+RESCAN = object()  # a source lost events and everything must be looked at again
+
+# inotify(7)
+IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+IN_DELETE_SELF, IN_MOVE_SELF, IN_Q_OVERFLOW, IN_IGNORED = 0x400, 0x800, 0x4000, 0x8000
+IN_ONLYDIR, IN_ISDIR = 0x01000000, 0x40000000
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+               | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+
+def _ignored_name(name: str) -> bool:
+    # hidden files, Office lock files (~$x.docx) and partial downloads
+    return name.startswith((".", "~$")) or name.endswith((".tmp", ".part", ".crdownload"))
+
+
+def walk_files(root: str):
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if _ignored_name(e.name):
+                        continue
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.is_file():
+                        yield e.path
+        except OSError:
+            continue
+
+
+class InotifySource:
+    """Recursive inotify watch; poll() returns touched file paths (or RESCAN)."""
+
+    def __init__(self, roots: list[str]):
+        import ctypes, ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._ctypes = ctypes
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, str] = {}
+        for r in roots:
+            self._watch_tree(r)
+
+    def _watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = self._ctypes.get_errno()
+            if err == 28:  # ENOSPC: fs.inotify.max_user_watches reached
+                raise OSError(err, "inotify watch limit reached")
+            return  # vanished or unreadable directory
+        self._dirs[wd] = path
+
+    def _watch_tree(self, root: str):
+        self._watch(root)
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not _ignored_name(d)]
+            for d in dirnames:
+                self._watch(os.path.join(dirpath, d))
+
+    def poll(self, timeout: float) -> list:
+        import select
+        r, _, _ = select.select([self.fd], [], [], timeout)
+        if not r:
+            return []
+        try:
+            buf = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        out, i = [], 0
+        while i + 16 <= len(buf):
+            wd, mask, _, length = struct.unpack_from("iIII", buf, i)
+            name = os.fsdecode(buf[i + 16:i + 16 + length].rstrip(b"\0"))
+            i += 16 + length
+            if mask & IN_Q_OVERFLOW:
+                out.append(RESCAN)
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            parent = self._dirs.get(wd)
+            if parent is None or not name or _ignored_name(name):
+                continue
+            path = os.path.join(parent, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # files copied in together with the directory raced our watch
+                    self._watch_tree(path)
+                    out.extend(walk_files(path))
+                continue
+            out.append(path)
+        return out
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingSource:
+    """Scan the folders every `interval` seconds and report files whose size or mtime changed."""
+
+    def __init__(self, roots: list[str], interval: float = 2.0):
+        self.roots, self.interval = roots, interval
+        self._seen: dict[str, tuple[int, int]] = {}
+        self._next = 0.0
+
+    def poll(self, timeout: float) -> list:
+        wait = self._next - time.monotonic()
+        if wait > 0:
+            time.sleep(min(wait, timeout))
+            if time.monotonic() < self._next:
+                return []
+        self._next = time.monotonic() + self.interval
+        seen, out = {}, []
+        for root in self.roots:
+            for path in walk_files(root):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                sig = seen[path] = (st.st_size, st.st_mtime_ns)
+                if self._seen.get(path) != sig:
+                    out.append(path)
+        self._seen = seen
+        return out
+
+    def close(self):
+        pass
+
+
+class WatchState:
+    """path -> (size, mtime_ns) of the input when it was last converted, saved as JSON."""
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self.done: dict[str, list] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.done = json.load(f).get("done", {})
+            except (OSError, ValueError):
+                self.done = {}
+
+    def unchanged(self, path: str, sig: tuple[int, int]) -> bool:
+        with self._lock:
+            return tuple(self.done.get(path, ())) == sig
+
+    def record(self, path: str, sig: tuple[int, int]):
+        with self._lock:
+            self.done[path] = list(sig)
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            data = json.dumps({"version": 1, "done": self.done})
+            self._dirty = False
+        tmp = self.path + ".tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+class Watcher:
+    def __init__(self, roots: list[str], dst_ext: str = "pdf", out_dir: str | None = None,
+                 workers: int | None = None, settle: float = 2.0, state_path: str | None = None,
+                 poll: bool = False, poll_interval: float = 2.0, config: Config | None = None,
+                 on_result=None):
+        from . import available_sources_for
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.dst_ext = dst_ext
+        self.sources = set(available_sources_for(dst_ext))
+        if not self.sources:
+            raise RuntimeError(f"Unsupported target format: {dst_ext}")
+        self.out_dir = os.path.abspath(out_dir) if out_dir else None
+        self.config = config or load_config()
+        self.workers = max(1, workers or default_workers(self.config))
+        self.settle = settle
+        self.state = WatchState(state_path)
+        self.on_result = on_result
+        self._pending: dict[str, tuple[tuple[int, int], float]] = {}   # path -> (signature, stable since)
+        self._busy: set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.source = None
+        if not poll and sys.platform.startswith("linux"):
+            try:
+                self.source = InotifySource(self.roots)
+            except OSError as e:
+                print(f"inotify unavailable ({e}); polling instead", file=sys.stderr)
+        if self.source is None:
+            self.source = PollingSource(self.roots, poll_interval)
+
+    def output_for(self, path: str) -> str:
+        p = Path(path)
+        name = p.stem + "." + self.dst_ext
+        if not self.out_dir:
+            return str(p.with_name(name))
+        for root in self.roots:
+            try:
+                rel = p.parent.relative_to(root)
+                return str(Path(self.out_dir) / Path(root).name / rel / name)
+            except ValueError:
+                continue
+        return str(Path(self.out_dir) / name)
+
+    def _wanted(self, path: str) -> bool:
+        if guess_ext(path) not in self.sources:
+            return False
+        return not (self.out_dir and path.startswith(self.out_dir + os.sep))
+
+    def notice(self, path: str):
+        """A path was created or changed: (re)start its settle timer."""
+        if not self._wanted(path):
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._pending.pop(path, None)
+            return
+        sig = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            old = self._pending.get(path)
+            if old is None or old[0] != sig:
+                self._pending[path] = (sig, time.monotonic())
+
+    def _ready(self) -> list[tuple[str, tuple[int, int]]]:
+        """Pending files that stopped changing at least `settle` seconds ago."""
+        now, ready = time.monotonic(), []
+        with self._lock:
+            items = list(self._pending.items())
+        for path, (sig, since) in items:
+            try:
+                st = os.stat(path)
+            except OSError:
+                with self._lock:
+                    self._pending.pop(path, None)
+                continue
+            cur = (st.st_size, st.st_mtime_ns)
+            with self._lock:
+                if cur != sig:
+                    self._pending[path] = (cur, now)  # still growing
+                elif now - since >= self.settle and path not in self._busy:
+                    del self._pending[path]
+                    ready.append((path, sig))
+        return ready
+
+    def _up_to_date(self, path: str, sig: tuple[int, int]) -> bool:
+        if self.state.unchanged(path, sig):
+            return True
+        try:
+            return os.stat(self.output_for(path)).st_mtime_ns >= sig[1]
+        except OSError:
+            return False
+
+    def _convert(self, path: str, sig: tuple[int, int]):
+        res = JobResult(path, self.output_for(path))
+        try:
+            res = run_job(path, res.output_path, config=self.config)
+            if res.ok:
+                self.state.record(path, sig)
+        finally:
+            with self._lock:
+                self._busy.discard(path)
+            if self.on_result:
+                self.on_result(res)
+
+    def scan(self):
+        for root in self.roots:
+            for path in walk_files(root):
+                self.notice(path)
+
+    def run(self):
+        set_concurrency(self.workers, self.config)
+        self.scan()
+        last_save = time.monotonic()
+        tick = min(0.5, self.settle / 2) if self.settle else 0.1
+        with Scheduler(self.workers, self.config, name="watch") as sched:
+            try:
+                while not self._stop.is_set():
+                    for item in self.source.poll(tick):
+                        if item is RESCAN:
+                            self.scan()
+                        else:
+                            self.notice(item)
+                    for path, sig in self._ready():
+                        if self._up_to_date(path, sig):
+                            self.state.record(path, sig)
+                            continue
+                        with self._lock:
+                            self._busy.add(path)
+                        sched.submit(estimate(path, self.dst_ext, self.config), self._convert, path, sig)
+                    if time.monotonic() - last_save > 5:
+                        self.state.save()
+                        last_save = time.monotonic()
+            finally:
+                self.source.close()
+                self.state.save()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m generation.watch", description="Convert files dropped into folders.")
+    ap.add_argument("folders", nargs="+")
+    ap.add_argument("-t", "--to", default="pdf", help="target format (default: pdf)")
+    ap.add_argument("-o", "--out-dir", help="write outputs here instead of next to the inputs")
+    ap.add_argument("-j", "--jobs", type=int, help="parallel conversions (default: CPU count)")
+    ap.add_argument("--settle", type=float, default=2.0, help="seconds a file must stay unchanged (default 2)")
+    ap.add_argument("--state", help="state file (default: .pdf_creator_watch.json in the first folder)")
+    ap.add_argument("--poll", action="store_true", help="scan periodically instead of using inotify")
+    ap.add_argument("--poll-interval", type=float, default=2.0)
+    ap.add_argument("--config", help="path to config.json")
+    args = ap.parse_args(argv)
+
+    for f in args.folders:
+        if not os.path.isdir(f):
+            print(f"Not a folder: {f}", file=sys.stderr)
+            return 2
+    dst_ext = EXT_MAP.get(args.to.upper(), args.to.lower().lstrip("."))
+    state = args.state or os.path.join(args.folders[0], ".pdf_creator_watch.json")
+
+    def _report(res):
+        if res.ok:
+            print(f"OK    {res.seconds:8.2f}s  {res.input_path} -> {res.output_path}", flush=True)
+        else:
+            print(f"FAIL  {res.seconds:8.2f}s  {res.input_path}: {res.error}", flush=True)
+
+    w = Watcher(args.folders, dst_ext, args.out_dir, args.jobs, args.settle, state, args.poll,
+                args.poll_interval, load_config(args.config), on_result=_report)
+    print(f"Watching {', '.join(w.roots)} with {type(w.source).__name__} ({w.workers} workers)", flush=True)
+    try:
+        w.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
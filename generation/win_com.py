@@ -1,5 +1,6 @@
 from pathlib import Path
 import tempfile
+from .utils import page_bounds
 
 def _ensure_pywin32():
     try:
@@ -8,7 +9,13 @@ def _ensure_pywin32():
     except Exception as e:
         raise RuntimeError("pywin32 is required for Microsoft Office automation. Install with: pip install pywin32") from e
 
-def word_docx_to_pdf(input_path: str, output_path: str):
+def _contiguous(pages: str, app: str) -> tuple[int, int]:
+    bounds = page_bounds(pages)
+    if bounds is None:
+        raise RuntimeError(f"{app} can only export one contiguous page range (got {pages}).")
+    return bounds
+
+def word_docx_to_pdf(input_path: str, output_path: str, pages: str | None = None):
     _ensure_pywin32()
     import win32com.client, pythoncom
     pythoncom.CoInitialize()
@@ -18,15 +25,22 @@ def word_docx_to_pdf(input_path: str, output_path: str):
         word.Visible = False
         word.DisplayAlerts = 0  # wdAlertsNone
         doc = word.Documents.Open(str(Path(input_path).resolve()), ReadOnly=True)
-        # 17 = wdFormatPDF
-        doc.SaveAs2(str(Path(output_path).resolve()), FileFormat=17)
+        if pages:
+            first, last = _contiguous(pages, "Word")
+            # 17 = wdExportFormatPDF, 3 = wdExportFromTo
+            doc.ExportAsFixedFormat(str(Path(output_path).resolve()), 17, False, 0, 3, first, last)
+        else:
+            # 17 = wdFormatPDF
+            doc.SaveAs2(str(Path(output_path).resolve()), FileFormat=17)
         doc.Close(False)
     finally:
         if word:
             try: word.Quit()
             except Exception: pass
 
-def word_pdf_to_docx(input_path: str, output_path: str):
+def word_pdf_to_docx(input_path: str, output_path: str, pages: str | None = None):
+    if pages:
+        raise RuntimeError("Word always reflows the whole PDF; use pdf2docx for page ranges.")
     _ensure_pywin32()
     import win32com.client, pythoncom
     pythoncom.CoInitialize()
@@ -44,7 +58,7 @@ def word_pdf_to_docx(input_path: str, output_path: str):
             try: word.Quit()
             except Exception: pass
 
-def ppt_to_pdf(input_path: str, output_path: str):
+def ppt_to_pdf(input_path: str, output_path: str, pages: str | None = None):
     _ensure_pywin32()
     import win32com.client, pythoncom
     pythoncom.CoInitialize()
@@ -53,8 +67,17 @@ def ppt_to_pdf(input_path: str, output_path: str):
         ppt = win32com.client.Dispatch("PowerPoint.Application")
         ppt.Visible = True
         pres = ppt.Presentations.Open(str(Path(input_path).resolve()), WithWindow=False)
-        # 32 = ppSaveAsPDF
-        pres.SaveAs(str(Path(output_path).resolve()), 32)
+        if pages:
+            first, last = _contiguous(pages, "PowerPoint")
+            pres.PrintOptions.Ranges.ClearAll()
+            rng = pres.PrintOptions.Ranges.Add(first, last)
+            # 2 = ppFixedFormatTypePDF, 1 = ppFixedFormatIntentScreen, 0 = msoFalse,
+            # 1 = ppPrintHandoutVerticalFirst, 1 = ppPrintOutputSlides, 0 = msoFalse,
+            # 4 = ppPrintSlideRange (PrintRange must be passed positionally)
+            pres.ExportAsFixedFormat(str(Path(output_path).resolve()), 2, 1, 0, 1, 1, 0, rng, 4)
+        else:
+            # 32 = ppSaveAsPDF
+            pres.SaveAs(str(Path(output_path).resolve()), 32)
         pres.Close()
     finally:
         if ppt:
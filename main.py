@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from PyQt6 import QtGui
 from PyQt6.QtWidgets import QApplication, QWidget
 from window.form import Ui_Form
@@ -17,7 +18,20 @@ class MainWindow(QWidget):
         # (Optional) set on this window explicitly too:
         self.setWindowIcon(QtGui.QIcon(resource_path("assets/icon.ico")))
 
+    def closeEvent(self, e):
+        # drop queued conversions, let running ones finish writing their files
+        self.ui.jobs.shutdown()
+        super().closeEvent(e)
+
 if __name__ == "__main__":
+    # page-parallel PDF -> DOCX uses worker processes (needed for PyInstaller builds)
+    multiprocessing.freeze_support()
+    try:
+        # metrics_jsonl / metrics_prom in config.json turn on per-stage metrics
+        from generation.instrument import install_from_config
+        install_from_config()
+    except Exception:
+        pass  # no config yet: the settings window handles that
     app = QApplication(sys.argv)
 
     # Set app icon (affects all windows/dialogs)
@@ -0,0 +1,21 @@
+import pytest
+from generation.config import Config
+
+
+@pytest.fixture
+def config(tmp_path):
+    """A config that never touches the user's config.json, soffice or templates."""
+    def make(**values):
+        values.setdefault("profile_template", False)
+        values.setdefault("stats_path", str(tmp_path / "stats.json"))
+        return Config(tmp_path / "config.json", values, False)
+    return make
+
+
+@pytest.fixture
+def fake_soffice(tmp_path, monkeypatch):
+    """Path of a `soffice` launcher running bench/fake_soffice.py, with no delays."""
+    from bench.run import _write_fake_soffice
+    for var in ("STARTUP", "FIRST_RUN", "RENDER", "RENDER_PER_MB", "FAIL_MATCH", "CRASH_MATCH", "HANG_MATCH"):
+        monkeypatch.delenv("FAKE_SOFFICE_" + var, raising=False)
+    return str(_write_fake_soffice(tmp_path / "bin"))
@@ -0,0 +1,55 @@
+import asyncio
+from generation import aio
+from generation.profiles import ProfileSlots
+
+
+def test_cancelled_acquire_does_not_leak_a_slot(tmp_path, config):
+    slots = ProfileSlots(1, root=str(tmp_path / "profiles"), config=config())
+
+    async def main():
+        held = slots.acquire()
+        waiter = asyncio.ensure_future(aio._acquire_profile(slots))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        slots.release(held)
+        await asyncio.sleep(0.2)
+        return await asyncio.wait_for(aio._acquire_profile(slots), 1)
+
+    assert asyncio.run(main()) is not None
+    assert slots.acquire(block=False) is None  # the one slot is held by main()'s last acquire
+
+
+def test_seeding_runs_off_the_loop(tmp_path, config, monkeypatch):
+    import time
+    from generation import profiles
+    monkeypatch.setattr(profiles, "seed_profile", lambda p, config=None: time.sleep(0.3))
+    slots = ProfileSlots(1, root=str(tmp_path / "profiles"), config=config())
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        # cancelled mid-seed: the slot comes back once seeding is done
+        waiter = asyncio.ensure_future(aio._acquire_profile(slots))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        profile = await asyncio.wait_for(aio._acquire_profile(slots), 2)
+        ticker.cancel()
+        return profile, ticks
+
+    profile, ticks = asyncio.run(main())
+    assert profile is not None and ticks >= 10
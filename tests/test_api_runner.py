@@ -0,0 +1,24 @@
+import os, time
+from concurrent.futures import ThreadPoolExecutor
+from generation.api_runner import map_in_processes
+
+
+def _pid(_):
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def test_concurrent_jobs_share_one_bounded_pool():
+    with ThreadPoolExecutor(4) as threads:
+        parts = list(threads.map(lambda _: map_in_processes(_pid, list(range(6)), 2), range(4)))
+    pids = {pid for part in parts for pid in part}
+    assert len(pids) <= 2 and os.getpid() not in pids
+
+
+def test_memory_limit_is_set_before_exec(tmp_path, config):
+    from generation.api_runner import run_office_api
+    soffice = tmp_path / "soffice"
+    soffice.write_text(f"#!/bin/sh\nulimit -v > {tmp_path / 'limit'}\n")
+    soffice.chmod(0o755)
+    run_office_api([], config(api_path=str(soffice), child_memory_mb=512), timeout=10)
+    assert (tmp_path / "limit").read_text().strip() == str(512 << 10)
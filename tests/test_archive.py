@@ -0,0 +1,26 @@
+import zipfile
+from generation.archive import _output_name, convert_archive
+
+
+def test_output_name_avoids_collisions():
+    used = {"x/report.pdf"}
+    assert _output_name("x/report.docx", "pdf", used) == "x/report.docx.pdf"
+    assert _output_name("x/a.docx", "pdf", used) == "x/a.pdf"
+    assert _output_name("x/A.pptx", "pdf", used) == "x/A.pptx.pdf"
+    assert _output_name("x/report.docx", "pdf", used) == "x/report.docx (2).pdf"
+
+
+def test_kept_members_keep_their_names(tmp_path, config, fake_soffice):
+    src = tmp_path / "in.zip"
+    with zipfile.ZipFile(src, "w") as z:
+        z.writestr("x/report.docx", b"converted")
+        z.writestr("x/report.pdf", b"kept")
+        z.writestr("x/notes.txt", b"notes")
+    cfg = config(api_path=fake_soffice, soffice_pool=False)
+    results = convert_archive(str(src), str(tmp_path / "out.zip"), "pdf", cfg, max_workers=2, keep_others=True)
+    assert [r.ok for r in results] == [True]
+    with zipfile.ZipFile(tmp_path / "out.zip") as z:
+        names = z.namelist()
+        assert sorted(names) == ["x/notes.txt", "x/report.docx.pdf", "x/report.pdf"]
+        assert z.read("x/report.pdf") == b"kept"
+        assert z.read("x/report.docx.pdf") == b"converted"
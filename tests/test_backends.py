@@ -0,0 +1,52 @@
+import pytest
+from generation import backends
+from generation.errors import BadInput, BackendCrash
+from generation.routing import get_stats
+
+
+@pytest.fixture
+def pair(monkeypatch):
+    """A (src, dst) pair with two test backends; returns the list of backends called."""
+    monkeypatch.setattr(backends, "_BACKENDS", {})
+    called = []
+
+    def make(name, error=None):
+        def convert(i, o, config, pages):
+            called.append(name)
+            if error is not None:
+                raise error
+            with open(o, "wb") as f:
+                f.write(b"out")
+        return backends.Backend(name, convert, lambda config: True, prior=(1.0 if name == "a" else 2.0, 1.0))
+    return make, called
+
+
+def test_falls_back_on_backend_failure(tmp_path, config, pair):
+    make, called = pair
+    backends.register("t1", "t2", make("a", BackendCrash("boom")))
+    backends.register("t1", "t2", make("b"))
+    (tmp_path / "in.t1").write_bytes(b"x")
+    cfg = config(backend_explore=0)
+    assert backends.run_backends("t1", "t2", str(tmp_path / "in.t1"), str(tmp_path / "out.t2"), cfg) == "b"
+    assert called == ["a", "b"]
+    assert get_stats(cfg).get(backends.stats_key("t1", "t2", "a", backends.size_bucket(1))).failed == 1
+
+
+def test_bad_input_is_not_retried_or_counted(tmp_path, config, pair):
+    make, called = pair
+    backends.register("t1", "t2", make("a", BadInput("corrupt")))
+    backends.register("t1", "t2", make("b"))
+    (tmp_path / "in.t1").write_bytes(b"x")
+    cfg = config(backend_explore=0)
+    with pytest.raises(BadInput):
+        backends.run_backends("t1", "t2", str(tmp_path / "in.t1"), str(tmp_path / "out.t2"), cfg)
+    assert called == ["a"]
+    assert get_stats(cfg).get(backends.stats_key("t1", "t2", "a", backends.size_bucket(1))).failed == 0
+
+
+def test_missing_input_raises_bad_input(tmp_path, config, pair):
+    make, called = pair
+    backends.register("t1", "t2", make("a"))
+    with pytest.raises(BadInput):
+        backends.run_backends("t1", "t2", str(tmp_path / "missing.t1"), str(tmp_path / "out.t2"), config())
+    assert called == []
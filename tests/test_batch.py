@@ -0,0 +1,36 @@
+from generation import instrument
+from generation.batch import convert_many
+
+
+def _soffice_runs(fn):
+    runs = []
+    hook = instrument.add_hook(lambda ev: runs.append(ev) if ev.stage == "soffice" else None)
+    try:
+        return fn(), runs
+    finally:
+        instrument.remove_hook(hook)
+
+
+def _config(config, fake_soffice, **values):
+    return config(api_path=fake_soffice, soffice_pool=False, soffice_timeout=0.5, soffice_timeout_per_mb=0,
+                  soffice_retries=1, **values)
+
+
+def test_file_alone_in_its_run_is_retried(tmp_path, config, fake_soffice, monkeypatch):
+    monkeypatch.setenv("FAKE_SOFFICE_HANG_MATCH", "hang")
+    (tmp_path / "hang.docx").write_bytes(b"x")
+    cfg = _config(config, fake_soffice)
+    (res,), runs = _soffice_runs(lambda: convert_many([(tmp_path / "hang.docx", tmp_path / "hang.pdf")],
+                                                      max_workers=2, config=cfg))
+    assert not res.ok and getattr(res.error, "retryable", False)
+    assert len(runs) == 2
+
+
+def test_group_converts_every_file(tmp_path, config, fake_soffice):
+    pairs = []
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.docx").write_bytes(name.encode())
+        pairs.append((tmp_path / f"{name}.docx", tmp_path / "out" / f"{name}.pdf"))
+    results = convert_many(pairs, max_workers=1, config=_config(config, fake_soffice))
+    assert all(r.ok for r in results)
+    assert [(tmp_path / "out" / f"{n}.pdf").read_bytes() for n in "abc"] == [b"a", b"b", b"c"]
@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from generation.cache import ConversionCache
+
+
+def _file(path, data: bytes) -> str:
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_key_covers_content_pages_and_optimization(tmp_path, config, fake_soffice):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    cfg = config(api_path=fake_soffice, soffice_pool=False)
+    a, b = _file(tmp_path / "a.docx", b"one"), _file(tmp_path / "b.docx", b"two")
+    same = _file(tmp_path / "same.docx", b"one")
+    key = cache.key_for(a, "docx", "pdf", cfg)
+    assert cache.key_for(same, "docx", "pdf", cfg) == key
+    assert cache.key_for(b, "docx", "pdf", cfg) != key
+    assert cache.key_for(a, "docx", "pdf", cfg, "1-2") != key
+    assert cache.key_for(a, "docx", "pdf", config(api_path=fake_soffice, soffice_pool=False, pdf_optimize=True)) != key
+
+
+def test_overwrite_does_not_double_count(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"), max_bytes=1500)
+    cache.put("k1", _file(tmp_path / "o1", b"x" * 600))
+    cache.evict()  # counts the cache once
+    for _ in range(5):
+        cache.put("k2", _file(tmp_path / "o2", b"y" * 600))
+    assert cache._size == 1200
+    assert sorted(p.name for p, _, _ in cache.entries()) == ["k1", "k2"]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"), max_bytes=1000)
+    for i, key in enumerate(("old", "mid", "new")):
+        cache.put(key, _file(tmp_path / key, b"z" * 400))
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    cache.put("newest", _file(tmp_path / "newest", b"z" * 400))
+    assert sorted(p.name for p, _, _ in cache.entries()) == ["new", "newest"]
+    assert cache.fetch("new", str(tmp_path / "out"))
+    assert not cache.fetch("old", str(tmp_path / "out2"))
+
+
+def test_counters_are_thread_safe(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    with ThreadPoolExecutor(8) as ex:
+        list(ex.map(lambda i: cache.count(hit=i % 2 == 0), range(20000)))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (10000, 10000)
@@ -0,0 +1,9 @@
+from generation import cli
+
+
+def test_colliding_outputs_fail_before_converting(tmp_path, capsys):
+    (tmp_path / "deck.ppt").write_bytes(b"x")
+    (tmp_path / "deck.pptx").write_bytes(b"x")
+    assert cli.main([str(tmp_path / "deck.ppt"), str(tmp_path / "deck.pptx"), "--to", "pdf"]) == 2
+    assert "would be written to" in capsys.readouterr().err
+    assert not (tmp_path / "deck.pdf").exists()
@@ -0,0 +1,83 @@
+import os
+from generation.journal import Journal
+
+
+def _touch(path, data=b"x"):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_resume_skips_only_unchanged_finished_jobs(tmp_path):
+    path = tmp_path / "run.journal"
+    a_in, a_out = _touch(tmp_path / "a.docx"), str(tmp_path / "a.pdf")
+    b_in, b_out = _touch(tmp_path / "b.docx"), str(tmp_path / "b.pdf")
+    c_in, c_out = _touch(tmp_path / "c.docx"), str(tmp_path / "c.pdf")
+    with Journal(str(path)) as j:
+        fp = j.start(a_in, a_out)
+        _touch(tmp_path / "a.pdf")
+        j.finish(a_in, a_out, input_fp=fp)
+        fp = j.start(b_in, b_out)
+        j.finish(b_in, b_out, error=RuntimeError("boom"), input_fp=fp)
+        j.start(c_in, c_out)            # still running when the process died
+
+    j = Journal(str(path))
+    assert j.completed(a_in, a_out)
+    assert not j.completed(b_in, b_out)
+    assert not j.completed(c_in, c_out)
+    assert not j.completed(a_in, a_out, "1-2")  # another page range is another job
+    _touch(tmp_path / "a.docx", b"changed")
+    assert not j.completed(a_in, a_out)
+    j.close()
+
+
+def test_changed_output_is_redone(tmp_path):
+    path = tmp_path / "run.journal"
+    a_in, a_out = _touch(tmp_path / "a.docx"), _touch(tmp_path / "a.pdf")
+    with Journal(str(path)) as j:
+        j.finish(a_in, a_out, input_fp=j.start(a_in, a_out))
+    _touch(tmp_path / "a.pdf", b"edited")
+    with Journal(str(path)) as j:
+        assert not j.completed(a_in, a_out)
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "run.journal"
+    a_in, a_out = _touch(tmp_path / "a.docx"), _touch(tmp_path / "a.pdf")
+    with Journal(str(path)) as j:
+        j.finish(a_in, a_out, input_fp=j.start(a_in, a_out))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "torn')
+    with Journal(str(path)) as j:
+        assert j.completed(a_in, a_out)
+        j.start(a_in, a_out)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[-1].startswith("{") and lines[-1].endswith("}")
+
+
+def test_compacts_superseded_entries(tmp_path):
+    path = tmp_path / "run.journal"
+    a_in, a_out = _touch(tmp_path / "a.docx"), _touch(tmp_path / "a.pdf")
+    with Journal(str(path), sync_interval=3600) as j:
+        for _ in range(600):
+            j.finish(a_in, a_out, input_fp=j.start(a_in, a_out))
+    assert len(path.read_text().splitlines()) == 1200
+    with Journal(str(path)) as j:
+        assert j.completed(a_in, a_out)
+    assert len(path.read_text().splitlines()) == 1
+    assert os.path.getsize(path) > 0
+
+
+def test_compaction_threshold(tmp_path):
+    path = tmp_path / "run.journal"
+    jobs = [(_touch(tmp_path / f"{i}.docx"), _touch(tmp_path / f"{i}.pdf")) for i in range(3)]
+    with Journal(str(path)) as j:
+        for inp, out in jobs:
+            j.finish(inp, out, input_fp=j.start(inp, out))
+    # 6 lines, 3 live: superseded entries do not outnumber the live ones yet
+    Journal(str(path)).close()
+    assert len(path.read_text().splitlines()) == 6
+    with Journal(str(path)) as j:
+        j.start(*jobs[0])
+    assert len(path.read_text().splitlines()) == 7
+    Journal(str(path)).close()
+    assert len(path.read_text().splitlines()) == 3
@@ -0,0 +1,44 @@
+import pytest
+from generation.utils import normalize_pages, page_bounds, page_indexes
+
+
+@pytest.mark.parametrize("pages, expected", [
+    (None, None),
+    ("", None),
+    (3, "3"),
+    ("1-3,7", "1-3,7"),
+    (" 7, 1-3 ,2 ", "1-3,7"),
+    ("1,2,3,5,6", "1-3,5-6"),
+    ([4, 2, 3], "2-4"),
+])
+def test_normalize_pages(pages, expected):
+    assert normalize_pages(pages) == expected
+
+
+@pytest.mark.parametrize("pages", ["0", "3-1", "a", "1-b", [0], ","])
+def test_normalize_pages_rejects(pages):
+    with pytest.raises(ValueError):
+        normalize_pages(pages)
+
+
+def test_page_indexes_clip_to_document():
+    assert page_indexes(None, 3) == [0, 1, 2]
+    assert page_indexes("2-3,5-9", 6) == [1, 2, 4, 5]
+    assert page_indexes("8", 6) == []
+
+
+def test_page_bounds():
+    assert page_bounds("2-5") == (2, 5)
+    assert page_bounds("4") == (4, 4)
+    assert page_bounds("1-2,4") is None
+
+
+def test_huge_ranges_are_cheap_or_rejected():
+    import time
+    t0 = time.perf_counter()
+    assert normalize_pages("1-100000,5-7,3") == "1-100000"
+    assert normalize_pages("1-50,40-60,62") == "1-60,62"
+    assert time.perf_counter() - t0 < 0.1
+    for pages in ("1-20000000", "100001", [10 ** 12]):
+        with pytest.raises(ValueError):
+            normalize_pages(pages)
@@ -0,0 +1,57 @@
+import pytest
+from generation.pdf_optimize import _eligible, optimize_pdf
+
+pymupdf = pytest.importorskip("pymupdf")
+
+
+def _write_pdf(path, pages: int):
+    doc = pymupdf.open()
+    for i in range(pages):
+        # a 1200 x 900 photo-like image drawn 3 inches wide: 400 dpi
+        small = pymupdf.Pixmap(pymupdf.csRGB, 16, 12, bytes((i * 37 + k * 11) % 256 for k in range(16 * 12 * 3)), False)
+        image = pymupdf.Pixmap(small, 1200, 900)
+        page = doc.new_page()
+        page.insert_image(pymupdf.Rect(72, 72, 288, 234), stream=image.tobytes("png"))
+        page.insert_text((72, 300), f"Page {i + 1}")
+    doc.save(str(path))
+
+
+def test_optimize_shrinks_images_the_same_in_parallel(tmp_path, config):
+    src = tmp_path / "in.pdf"
+    _write_pdf(src, 8)
+    reports = [optimize_pdf(str(src), str(tmp_path / f"out{w}.pdf"), config(), workers=w) for w in (1, 2)]
+    for r in reports:
+        assert r.recompressed == r.images == 8
+        assert r.output_bytes < r.input_bytes / 4
+    one, two = (pymupdf.open(str(tmp_path / f"out{w}.pdf")) for w in (1, 2))
+    for a, b in zip(one, two):
+        assert a.get_pixmap(dpi=36).samples == b.get_pixmap(dpi=36).samples
+        assert a.get_image_info()[0]["width"] <= 460  # 150 dpi x 3 inches
+
+
+def test_nothing_to_gain_keeps_the_file(tmp_path, config):
+    src = tmp_path / "text.pdf"
+    doc = pymupdf.open()
+    doc.new_page().insert_text((72, 72), "hello")
+    doc.save(str(src), garbage=4, deflate=True, use_objstms=1)
+    report = optimize_pdf(str(src), config=config())
+    assert report.recompressed == 0
+    assert len(src.read_bytes()) == report.output_bytes <= report.input_bytes
+
+
+def test_indirect_image_dimensions(tmp_path, config):
+    src = tmp_path / "in.pdf"
+    _write_pdf(src, 2)
+    doc = pymupdf.open(str(src))
+    first = doc[0].get_images()[0][0]
+    # Width and Height as indirect numbers, as some PDF writers emit them
+    for key, value in (("Width", "1200"), ("Height", "900")):
+        n = doc.get_new_xref()
+        doc.update_object(n, value)
+        doc.xref_set_key(first, key, f"{n} 0 R")
+    doc.save(str(tmp_path / "indirect.pdf"))
+    report = optimize_pdf(str(tmp_path / "indirect.pdf"), str(tmp_path / "out.pdf"), config(), workers=1)
+    assert report.images == report.recompressed == 2
+    doc = pymupdf.open(str(tmp_path / "indirect.pdf"))
+    doc.xref_set_key(first, "Width", "/Wide")
+    assert not _eligible(doc, first)  # not a number: left alone
@@ -0,0 +1,23 @@
+import pytest
+from generation.pdf_to_docx import _convert_with_pdf2docx, docx_equivalent
+
+pymupdf = pytest.importorskip("pymupdf")
+pytest.importorskip("pdf2docx")
+
+
+def _write_pdf(path, pages: int):
+    doc = pymupdf.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {i + 1}", fontsize=18)
+        page.insert_text((72, 120), "Some body text on this page. " * 3, fontsize=10)
+    doc.save(str(path))
+
+
+def test_page_parallel_matches_single_process(tmp_path, config):
+    pdf = tmp_path / "in.pdf"
+    _write_pdf(pdf, 7)
+    single, parallel = tmp_path / "single.docx", tmp_path / "parallel.docx"
+    _convert_with_pdf2docx(str(pdf), str(single), config(pdf2docx_workers=1, pdf2docx_chunk_pages=2))
+    _convert_with_pdf2docx(str(pdf), str(parallel), config(pdf2docx_workers=2, pdf2docx_chunk_pages=2))
+    assert docx_equivalent(str(single), str(parallel))
@@ -0,0 +1,28 @@
+from generation import profiles
+
+
+def test_resize_keeps_config_and_removes_retired_profiles(config, monkeypatch):
+    monkeypatch.setattr(profiles, "_slots", None)
+    cfg = config()
+    profiles.set_concurrency(1, cfg)
+    old = profiles.get_slots()
+    assert old.config is cfg
+    held = old.acquire()
+    assert held.is_dir()
+
+    profiles.set_concurrency(2, cfg)
+    new = profiles.get_slots()
+    assert new is not old and new.size == 2 and new.config is cfg
+    assert old.root.exists()            # still leased
+    old.release(held)
+    assert not old.root.exists()
+    new.close()
+
+
+def test_unused_set_is_removed_when_replaced(config, monkeypatch):
+    monkeypatch.setattr(profiles, "_slots", None)
+    profiles.set_concurrency(1, config())
+    old = profiles.get_slots()
+    profiles.set_concurrency(3, config())
+    assert not old.root.exists()
+    profiles.get_slots().close()
@@ -0,0 +1,63 @@
+import pytest
+from generation import routing
+from generation.routing import edge_key, get_stats, plan, reachable
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    # a -> b -> d and a -> c -> d, plus a dead end e
+    g = {"a": ["b", "c"], "b": ["d"], "c": ["d"], "e": []}
+    monkeypatch.setattr(routing, "_graph", lambda: g)
+    monkeypatch.setattr(routing, "DEFAULT_COSTS", {})
+    return g
+
+
+def _measure(stats, src, dst, seconds, times=routing.MIN_SAMPLES):
+    for mb in range(1, times + 1):
+        stats.record(edge_key(src, dst), mb << 20, seconds, mb << 20)
+
+
+def test_reachable(graph):
+    assert reachable("a") == ["b", "c", "d"]
+    assert reachable("e") == []
+
+
+def test_plan_follows_measured_costs(graph, config):
+    cfg = config()
+    stats = get_stats(cfg)
+    _measure(stats, "a", "b", 20.0)
+    assert plan("a", "d", 0, cfg) == [("a", "c"), ("c", "d")]
+    _measure(stats, "a", "c", 60.0, times=10)
+    assert plan("a", "d", 0, cfg) == [("a", "b"), ("b", "d")]
+
+
+def test_plan_without_route_raises(graph, config):
+    with pytest.raises(RuntimeError):
+        plan("a", "e", 0, config())
+
+
+def test_fit_needs_min_samples():
+    st = routing.EdgeStats()
+    st.add(1.0, 5.0, None)
+    assert st.model((3.0, 1.0)) == (3.0, 1.0)
+    for mb, secs in ((2.0, 7.0), (4.0, 11.0), (8.0, 19.0)):
+        st.add(mb, secs, None)
+    overhead, per_mb = st.model((3.0, 1.0))
+    assert overhead == pytest.approx(3.0, abs=0.01) and per_mb == pytest.approx(2.0, abs=0.01)
+
+
+def test_same_format_needs_a_round_trip(graph, config):
+    cfg = config()
+    with pytest.raises(RuntimeError):
+        plan("a", "a", 0, cfg)
+    graph["d"] = ["a"]
+    assert plan("a", "a", 0, cfg) in ([("a", "b"), ("b", "d"), ("d", "a")], [("a", "c"), ("c", "d"), ("d", "a")])
+
+
+def test_docx_to_docx_goes_through_pdf(config):
+    from generation import get_converter
+    assert routing.has_route("docx", "docx") and not routing.has_route("ppt", "ppt")
+    get_converter("docx", "docx")
+    assert plan("docx", "docx", 0, config()) == [("docx", "pdf"), ("pdf", "docx")]
+    with pytest.raises(RuntimeError):
+        get_converter("ppt", "ppt")
@@ -0,0 +1,59 @@
+import queue, time
+import pytest
+from generation.scheduler import JobCost, JobQueue
+
+
+def test_shortest_job_first():
+    q = JobQueue()
+    q.put("long", JobCost(10, 1))
+    q.put("short", JobCost(1, 1))
+    q.put("mid", JobCost(5, 1))
+    assert [q.get(0) for _ in range(3)] == ["short", "mid", "long"]
+
+
+def test_waiting_job_ages_ahead():
+    q = JobQueue(aging=100.0)
+    q.put("long", JobCost(10, 1))
+    time.sleep(0.2)  # 20 seconds of priority at this aging rate
+    q.put("short", JobCost(1, 1))
+    assert q.get(0) == "long"
+
+
+def test_memory_admission():
+    q = JobQueue(memory_mb=100)
+    q.put("a", JobCost(1, 60))
+    q.put("b", JobCost(2, 60))
+    q.put("c", JobCost(3, 30))
+    assert q.get(0) == "a"
+    assert q.get(0) == "c"          # b does not fit next to a, c does
+    with pytest.raises(queue.Empty):
+        q.get(0.05)
+    q.done("a")
+    assert q.get(0) == "b"
+    assert q.memory_in_use() == 90
+
+
+def test_job_larger_than_budget_runs_alone():
+    q = JobQueue(memory_mb=100)
+    q.put("huge", JobCost(1, 500))
+    assert q.get(0) == "huge"
+
+
+def test_bypassed_job_holds_the_queue():
+    q = JobQueue(memory_mb=100, max_bypass=0.1)
+    q.put("a", JobCost(1, 60))
+    assert q.get(0) == "a"
+    q.put("big", JobCost(1, 60))
+    time.sleep(0.15)
+    q.put("small", JobCost(5, 10))
+    with pytest.raises(queue.Empty):
+        q.get(0.05)                 # small would fit, but big has waited long enough
+    q.done("a")
+    assert q.get(0) == "big"
+
+
+def test_full_queue_raises():
+    q = JobQueue(maxsize=1)
+    q.put("a")
+    with pytest.raises(queue.Full):
+        q.put("b")
@@ -0,0 +1,14 @@
+from generation.server import _content_disposition
+
+
+def test_content_disposition_cannot_be_broken_out_of():
+    header = _content_disposition('a"b\r\nSet-Cookie: x=1\\.pdf')
+    assert "\r" not in header and "\n" not in header
+    fallback = header.split('filename="', 1)[1].split('"', 1)[0]
+    assert fallback == "a_bSet-Cookie: x=1_.pdf"
+    assert header.endswith("filename*=UTF-8''a%22bSet-Cookie%3A%20x%3D1%5C.pdf")
+
+
+def test_content_disposition_keeps_unicode_names():
+    assert _content_disposition("Bericht ä.pdf") == \
+        "attachment; filename=\"Bericht _.pdf\"; filename*=UTF-8''Bericht%20%C3%A4.pdf"
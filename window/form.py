@@ -1,8 +1,10 @@
 from PyQt6 import QtCore, QtGui, QtWidgets
 from pathlib import Path
-from generation import get_converter, EXT_MAP, available_targets_for
+from generation import EXT_MAP, available_sources_for, available_targets_for
 from generation.utils import guess_ext
 from .settingsWindow import SettingsDialog
+from .jobs import JobQueue
+from .job_table import FileTableModel, FolderScanner
 
 class Ui_Form(object):
     def setupUi(self, Form):
@@ -88,7 +90,23 @@ class Ui_Form(object):
             "QPushButton:hover{background-color:#45a049;}"
             "QPushButton:pressed{background-color:#3e8e41;}"
         )
-        self.dropLayout.addWidget(self.btnBrowse, alignment=QtCore.Qt.AlignmentFlag.AlignHCenter)
+        self.btnBrowseFolder = QtWidgets.QPushButton(parent=self.dropArea)
+        self.btnBrowseFolder.setObjectName("btnBrowseFolder")
+        self.btnBrowseFolder.setFixedHeight(44)
+        self.btnBrowseFolder.setCursor(QtGui.QCursor(QtCore.Qt.CursorShape.PointingHandCursor))
+        self.btnBrowseFolder.setStyleSheet(
+            "QPushButton{background-color:#f5f5f5;color:#333;border:0px;"
+            "padding:10px 20px;border-radius:6px;font-size:16px;font-weight:bold;}"
+            "QPushButton:hover{background-color:#eee;}"
+            "QPushButton:pressed{background-color:#e0e0e0;}"
+        )
+        browseRow = QtWidgets.QHBoxLayout()
+        browseRow.setSpacing(10)
+        browseRow.addStretch(1)
+        browseRow.addWidget(self.btnBrowse)
+        browseRow.addWidget(self.btnBrowseFolder)
+        browseRow.addStretch(1)
+        self.dropLayout.addLayout(browseRow)
         self.root.addWidget(self.dropArea)
 
         # ===== row: file chosen =====
@@ -147,6 +165,61 @@ class Ui_Form(object):
         row2.addWidget(self.btnGenerate)
         self.root.addLayout(row2)
 
+        # ===== job table (model-backed, handles thousands of rows) =====
+        self.files = FileTableModel(Form)
+        self.tableJobs = QtWidgets.QTableView(parent=Form)
+        self.tableJobs.setModel(self.files)
+        self.tableJobs.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tableJobs.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.tableJobs.setAlternatingRowColors(True)
+        self.tableJobs.setWordWrap(False)
+        self.tableJobs.setShowGrid(False)
+        self.tableJobs.setStyleSheet(
+            "QTableView{background:#fafafa;border:0px;border-radius:4px;font-size:13px;}"
+        )
+        # fixed row heights and no content-based sizing keep layout O(visible rows)
+        vh = self.tableJobs.verticalHeader()
+        vh.setVisible(False)
+        vh.setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        vh.setDefaultSectionSize(24)
+        hh = self.tableJobs.horizontalHeader()
+        hh.setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Interactive)
+        hh.setStretchLastSection(True)
+        for col, width in enumerate((260, 60, 90, 70)):
+            self.tableJobs.setColumnWidth(col, width)
+        self.tableJobs.setSizePolicy(
+            QtWidgets.QSizePolicy.Policy.Expanding,
+            QtWidgets.QSizePolicy.Policy.Expanding
+        )
+        self.root.addWidget(self.tableJobs, 1)
+
+        row3 = QtWidgets.QHBoxLayout()
+        row3.setSpacing(10)
+        self.lblQueue = QtWidgets.QLabel(parent=Form)
+        self.lblQueue.setStyleSheet("color:#555; font-size:13px; border:0px;")
+        row3.addWidget(self.lblQueue)
+        row3.addStretch(1)
+        self.btnClear = QtWidgets.QPushButton(parent=Form)
+        self.btnClear.setCursor(QtGui.QCursor(QtCore.Qt.CursorShape.PointingHandCursor))
+        self.btnClear.setStyleSheet(
+            "QPushButton{background:#f5f5f5;color:#333;border:0px;"
+            "padding:6px 14px;border-radius:6px;font-size:13px;}"
+            "QPushButton:hover{background:#eee;}"
+        )
+        row3.addWidget(self.btnClear)
+        self.btnCancel = QtWidgets.QPushButton(parent=Form)
+        self.btnCancel.setCursor(QtGui.QCursor(QtCore.Qt.CursorShape.PointingHandCursor))
+        self.btnCancel.setStyleSheet(
+            "QPushButton{background:#f5f5f5;color:#333;border:0px;"
+            "padding:6px 14px;border-radius:6px;font-size:13px;}"
+            "QPushButton:hover{background:#eee;}"
+        )
+        row3.addWidget(self.btnCancel)
+        self.root.addLayout(row3)
+
+        self.jobs = JobQueue(Form)
+        self.scanner = FolderScanner({src for dst in EXT_MAP.values() for src in available_sources_for(dst)}, Form)
+
                 # ===== footer: copyright =====
         self.footer = QtWidgets.QLabel(parent=Form)
         self.footer.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
@@ -166,9 +239,16 @@ class Ui_Form(object):
 
         # hookups
         self.btnBrowse.clicked.connect(self._pick_file)
+        self.btnBrowseFolder.clicked.connect(self._pick_folder)
         self.btnGenerate.clicked.connect(self._on_generate_clicked)
-        self.dropArea.fileDropped.connect(self._on_drop_file)
+        self.dropArea.pathsDropped.connect(self._add_paths)
         self.btnSettings.clicked.connect(self._open_settings)
+        self.btnCancel.clicked.connect(self._cancel_jobs)
+        self.btnClear.clicked.connect(self._clear_finished)
+        self.jobs.jobChanged.connect(self._on_job_changed)
+        self.scanner.filesFound.connect(self._on_files_found)
+        self.scanner.finished.connect(self._update_queue_label)
+        self._update_queue_label()
 
     def retranslateUi(self, Form):
         _t = QtCore.QCoreApplication.translate
@@ -177,73 +257,133 @@ class Ui_Form(object):
             "<html><head/><body><p align=\"center\"><span style=\" color:#ff5500;\">pdf / docx / ppt generation</span></p></body></html>"
         ))
         self.label.setText(_t("Form",
-            "<html><head/><body><p align=\"center\"><span style=\" font-size:16pt;\">Drop file here</span></p></body></html>"
+            "<html><head/><body><p align=\"center\"><span style=\" font-size:16pt;\">Drop files or folders here</span></p></body></html>"
         ))
         self.btnBrowse.setText(_t("Form", "Browse files"))
+        self.btnBrowseFolder.setText(_t("Form", "Add folder"))
         self.label_2.setText(_t("Form",
-            "<html><head/><body><p align=\"center\"><span style=\" font-size:16pt; color:#000000;\">File chosen :</span></p></body></html>"
+            "<html><head/><body><p align=\"center\"><span style=\" font-size:16pt; color:#000000;\">Files chosen :</span></p></body></html>"
         ))
         self.label_3.setText(_t("Form",
             "<html><head/><body><p align=\"center\"><span style=\" font-size:12pt;\">Type to generate :</span></p></body></html>"
         ))
         self.btnGenerate.setText(_t("Form", "Generate"))
+        self.btnCancel.setText(_t("Form", "Cancel pending"))
+        self.btnClear.setText(_t("Form", "Clear finished"))
 
     # ===== helpers =====
     def _pick_file(self):
-        path, _ = QtWidgets.QFileDialog.getOpenFileName(
-            None, "Choose a file", "", "All Files (*.*)"
+        paths, _ = QtWidgets.QFileDialog.getOpenFileNames(
+            None, "Choose files", "", "All Files (*.*)"
         )
-        if path:
-            self.lineFilePath.setText(path)
-
-    def _on_drop_file(self, path: str):
-        self.lineFilePath.setText(path)
+        if paths:
+            self._add_paths(paths)
+
+    def _pick_folder(self):
+        folder = QtWidgets.QFileDialog.getExistingDirectory(None, "Choose a folder")
+        if folder:
+            self._add_paths([folder])
+
+    def _add_paths(self, paths: list[str]):
+        files = []
+        for p in paths:
+            if Path(p).is_dir():
+                self.scanner.scan(p)   # expanded lazily, in batches
+            else:
+                files.append(p)
+        self._on_files_found(files)
+
+    def _on_files_found(self, files: list[str]):
+        self.files.add_paths(files)
+        self._update_queue_label()
 
     def _open_settings(self):
         SettingsDialog(self.dropArea).exec()
 
     def _on_generate_clicked(self):
-        in_path = self.lineFilePath.text().strip()
-        if not in_path:
+        rows = self.files.ready_rows()
+        if not rows:
             QtWidgets.QMessageBox.warning(None, "No file", "Please choose a file first.")
             return
 
-        src_ext = guess_ext(in_path)
         wanted_ui = self.comboType.currentText().upper()
         dst_ext = EXT_MAP.get(wanted_ui, wanted_ui.lower())
-        if dst_ext == src_ext:
-            QtWidgets.QMessageBox.information(None, "Same Type", "Source and target are the same.")
-            return
 
-        targets = available_targets_for(src_ext)
-        if dst_ext not in targets:
-            QtWidgets.QMessageBox.warning(
-                None, "Unsupported",
-                f"This build supports: {src_ext} -> {', '.join(targets) or '—'}"
+        if len(rows) == 1:
+            row = self.files.rows[rows[0]]
+            if dst_ext == row.src_ext:
+                QtWidgets.QMessageBox.information(None, "Same Type", "Source and target are the same.")
+                return
+            targets = available_targets_for(row.src_ext)
+            if dst_ext not in targets:
+                QtWidgets.QMessageBox.warning(
+                    None, "Unsupported",
+                    f"This build supports: {row.src_ext} -> {', '.join(targets) or '—'}"
+                )
+                return
+            default_name = str(Path(row.path).with_suffix("." + dst_ext).name)
+            out_path, _ = QtWidgets.QFileDialog.getSaveFileName(
+                None, "Save As", default_name, "*/*"
             )
+            if not out_path:
+                return
+            self._submit(rows[0], out_path, dst_ext)
             return
 
-        default_name = str(Path(in_path).with_suffix("." + dst_ext).name)
-        out_path, _ = QtWidgets.QFileDialog.getSaveFileName(
-            None, "Save As", default_name, "*/*"
-        )
-        if not out_path:
+        out_dir = QtWidgets.QFileDialog.getExistingDirectory(None, "Save converted files to")
+        if not out_dir:
             return
-
-        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.CursorShape.WaitCursor)
-        try:
-            converter = get_converter(src_ext, dst_ext)
-            converter(in_path, out_path)
-            QtWidgets.QApplication.restoreOverrideCursor()
-            QtWidgets.QMessageBox.information(None, "Done", f"Saved to:\n{out_path}")
-        except Exception as e:
-            QtWidgets.QApplication.restoreOverrideCursor()
-            QtWidgets.QMessageBox.critical(None, "Error", f"{type(e).__name__}: {e}")
+        taken: set[str] = set()
+        for i in rows:
+            row = self.files.rows[i]
+            if dst_ext == row.src_ext or dst_ext not in available_targets_for(row.src_ext):
+                self.files.set_skipped(i, f"No {row.src_ext} -> {dst_ext} conversion")
+                continue
+            self._submit(i, _unique_output(out_dir, Path(row.path).stem, dst_ext, taken), dst_ext)
+
+    def _submit(self, row: int, out_path: str, dst_ext: str):
+        # runs in the background; progress shows up in the job table
+        r = self.files.rows[row]
+        job_id = self.jobs.submit(r.path, out_path, r.src_ext, dst_ext)
+        self.files.bind_job(row, job_id, out_path)
+        self._update_queue_label()
+
+    def _cancel_jobs(self):
+        rows = [i.row() for i in self.tableJobs.selectionModel().selectedRows()]
+        if rows:
+            for jid in self.files.job_ids(rows):
+                self.jobs.cancel(jid)
+        else:
+            self.jobs.cancel_pending()
+
+    def _clear_finished(self):
+        self.files.clear_inactive()
+        self._update_queue_label()
+
+    def _on_job_changed(self, job_id: int):
+        job = self.jobs.jobs[job_id]
+        self.files.update_job(job_id, job.status, job.seconds, job.error)
+        self._update_queue_label()
+
+    def _update_queue_label(self):
+        n = len(self.files.rows)
+        self.lineFilePath.setText(f"{n} file(s)" + (" — scanning folders…" if self.scanner.is_busy() else ""))
+        self.lblQueue.setText(f"{self.jobs.active_count()} job(s) in progress")
+
+
+def _unique_output(out_dir: str, stem: str, ext: str, taken: set[str]) -> str:
+    """out_dir/stem.ext, or "stem (2).ext" etc. if another file of this batch already writes there."""
+    name, n = f"{stem}.{ext}", 1
+    while name.lower() in taken:
+        n += 1
+        name = f"{stem} ({n}).{ext}"
+    taken.add(name.lower())
+    return str(Path(out_dir) / name)
 
 
 # --- simple drop frame ---
 class DropFrame(QtWidgets.QFrame):
-    fileDropped = QtCore.pyqtSignal(str)
+    pathsDropped = QtCore.pyqtSignal(list)
 
     def __init__(self, *a, **k):
         super().__init__(*a, **k)
@@ -254,8 +394,7 @@ class DropFrame(QtWidgets.QFrame):
             e.acceptProposedAction()
 
     def dropEvent(self, e: QtGui.QDropEvent):
-        urls = e.mimeData().urls()
-        if urls:
-            local = urls[0].toLocalFile()
-            if local:
-                self.fileDropped.emit(local)
+        paths = [u.toLocalFile() for u in e.mimeData().urls()]
+        paths = [p for p in paths if p]
+        if paths:
+            self.pathsDropped.emit(paths)
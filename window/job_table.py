@@ -0,0 +1,177 @@
+from __future__ import annotations
+from PyQt6 import QtCore, QtGui
+from pathlib import Path
+import os
+from generation.utils import guess_ext
+from .jobs import PENDING, RUNNING, DONE, FAILED, CANCELLED
+
+READY, SKIPPED = "Ready", "Skipped"
+
+_STATUS_COLORS = {
+    RUNNING: "#1976D2",
+    DONE: "#2e7d32",
+    FAILED: "#c62828",
+    CANCELLED: "#888888",
+    SKIPPED: "#888888",
+}
+
+
+class FileRow:
+    __slots__ = ("path", "src_ext", "job_id", "status", "seconds", "error", "out_path")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.src_ext = guess_ext(path)
+        self.job_id: int | None = None
+        self.status = READY
+        self.seconds = 0.0
+        self.error = ""
+        self.out_path = ""
+
+
+class FileTableModel(QtCore.QAbstractTableModel):
+    """
+    One row per chosen file. Rows live in a plain list and data() is O(1),
+    so a QTableView on top stays smooth with tens of thousands of entries.
+    """
+    COLUMNS = ("File", "Type", "Status", "Time", "Folder")
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self.rows: list[FileRow] = []
+        self._paths: set[str] = set()
+        self._by_job: dict[int, int] = {}
+
+    # --- Qt model API ---
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if role == QtCore.Qt.ItemDataRole.DisplayRole and orientation == QtCore.Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        r = self.rows[index.row()]
+        col = index.column()
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return os.path.basename(r.path)
+            if col == 1:
+                return r.src_ext.upper()
+            if col == 2:
+                return r.status
+            if col == 3:
+                return f"{r.seconds:.1f}s" if r.status in (DONE, FAILED) else ""
+            if col == 4:
+                return os.path.dirname(r.path)
+        elif role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            return r.error or r.out_path or r.path
+        elif role == QtCore.Qt.ItemDataRole.ForegroundRole and col == 2:
+            color = _STATUS_COLORS.get(r.status)
+            return QtGui.QColor(color) if color else None
+        return None
+
+    # --- rows ---
+    def add_paths(self, paths: list[str]) -> int:
+        new = []
+        for p in paths:
+            p = str(Path(p))
+            if p not in self._paths:
+                self._paths.add(p)
+                new.append(FileRow(p))
+        if new:
+            first = len(self.rows)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(new) - 1)
+            self.rows.extend(new)
+            self.endInsertRows()
+        return len(new)
+
+    def ready_rows(self) -> list[int]:
+        return [i for i, r in enumerate(self.rows) if r.status == READY]
+
+    def bind_job(self, row: int, job_id: int, out_path: str):
+        r = self.rows[row]
+        r.job_id = job_id
+        r.out_path = out_path
+        r.status = PENDING
+        self._by_job[job_id] = row
+        self._row_changed(row)
+
+    def set_skipped(self, row: int, reason: str):
+        r = self.rows[row]
+        r.status = SKIPPED
+        r.error = reason
+        self._row_changed(row)
+
+    def update_job(self, job_id: int, status: str, seconds: float, error: str):
+        row = self._by_job.get(job_id)
+        if row is None:
+            return
+        r = self.rows[row]
+        r.status, r.seconds, r.error = status, seconds, error
+        self._row_changed(row)
+
+    def job_ids(self, rows) -> list[int]:
+        return [self.rows[i].job_id for i in rows if self.rows[i].job_id is not None]
+
+    def clear_inactive(self):
+        """Drop finished, failed, cancelled and skipped rows; keep rows not yet submitted, queued or converting."""
+        self.beginResetModel()
+        self.rows = [r for r in self.rows if r.status in (READY, PENDING, RUNNING)]
+        self._paths = {r.path for r in self.rows}
+        self._by_job = {r.job_id: i for i, r in enumerate(self.rows) if r.job_id is not None}
+        self.endResetModel()
+
+    def _row_changed(self, row: int):
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+
+
+class FolderScanner(QtCore.QObject):
+    """
+    Walks folders a slice at a time from a zero-interval timer, so dropping a
+    huge tree never blocks the event loop. Emits found paths in batches.
+    """
+    filesFound = QtCore.pyqtSignal(list)
+    finished = QtCore.pyqtSignal()
+
+    BATCH = 500
+
+    def __init__(self, extensions: set[str], parent: QtCore.QObject | None = None):
+        super().__init__(parent)
+        self.extensions = extensions
+        self._walks = []
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._step)
+
+    def is_busy(self) -> bool:
+        return self._timer.isActive()
+
+    def scan(self, folder: str):
+        self._walks.append(os.walk(folder))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _step(self):
+        found = []
+        while self._walks and len(found) < self.BATCH:
+            try:
+                root, dirs, files = next(self._walks[0])
+            except StopIteration:
+                self._walks.pop(0)
+                continue
+            dirs.sort()
+            for name in sorted(files):
+                if guess_ext(name) in self.extensions:
+                    found.append(os.path.join(root, name))
+        if found:
+            self.filesFound.emit(found)
+        if not self._walks:
+            self._timer.stop()
+            self.finished.emit()
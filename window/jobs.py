@@ -0,0 +1,119 @@
+from __future__ import annotations
+from PyQt6 import QtCore
+from pathlib import Path
+import time
+from generation import get_converter
+from generation.profiles import default_workers
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "Pending", "Running", "Done", "Failed", "Cancelled"
+
+
+class ConversionJob:
+    def __init__(self, job_id: int, in_path: str, out_path: str, src_ext: str, dst_ext: str):
+        self.id = job_id
+        self.in_path = in_path
+        self.out_path = out_path
+        self.src_ext = src_ext
+        self.dst_ext = dst_ext
+        self.status = PENDING
+        self.error = ""
+        self.seconds = 0.0
+
+    @property
+    def name(self) -> str:
+        return Path(self.in_path).name
+
+
+# ---------- worker ----------
+class _JobSignals(QtCore.QObject):
+    started = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(int, float, str)   # id, seconds, error ("" on success)
+
+
+class _JobRunnable(QtCore.QRunnable):
+    def __init__(self, job: ConversionJob):
+        super().__init__()
+        self.job = job
+        self.signals = _JobSignals()
+        self.setAutoDelete(False)  # JobQueue keeps the reference (needed for tryTake)
+
+    def run(self):
+        j = self.job
+        self.signals.started.emit(j.id)
+        t0 = time.perf_counter()
+        err = ""
+        try:
+            get_converter(j.src_ext, j.dst_ext)(j.in_path, j.out_path)
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"
+        self.signals.finished.emit(j.id, time.perf_counter() - t0, err)
+
+
+# ---------- queue ----------
+class JobQueue(QtCore.QObject):
+    """
+    Runs conversions on a QThreadPool and reports back through signals,
+    which Qt delivers on the GUI thread.
+    """
+    jobAdded = QtCore.pyqtSignal(int)
+    jobChanged = QtCore.pyqtSignal(int)
+
+    def __init__(self, parent: QtCore.QObject | None = None, max_workers: int | None = None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers or default_workers())
+        self.jobs: dict[int, ConversionJob] = {}
+        self._runnables: dict[int, _JobRunnable] = {}
+        self._next_id = 1
+        self._active = 0
+
+    def submit(self, in_path: str, out_path: str, src_ext: str, dst_ext: str) -> int:
+        job = ConversionJob(self._next_id, in_path, out_path, src_ext, dst_ext)
+        self._next_id += 1
+        self.jobs[job.id] = job
+        r = _JobRunnable(job)
+        r.signals.started.connect(self._on_started)
+        r.signals.finished.connect(self._on_finished)
+        self._runnables[job.id] = r
+        self._active += 1
+        self.jobAdded.emit(job.id)
+        self.pool.start(r)
+        return job.id
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not started yet. Running jobs cannot be interrupted."""
+        job = self.jobs.get(job_id)
+        r = self._runnables.get(job_id)
+        if job is None or r is None or job.status != PENDING:
+            return False
+        if not self.pool.tryTake(r):
+            return False
+        job.status = CANCELLED
+        self._active -= 1
+        self._runnables.pop(job_id, None)
+        self.jobChanged.emit(job_id)
+        return True
+
+    def cancel_pending(self) -> int:
+        return sum(1 for jid in list(self._runnables) if self.cancel(jid))
+
+    def active_count(self) -> int:
+        return self._active
+
+    def shutdown(self):
+        self.cancel_pending()
+        self.pool.waitForDone()
+
+    def _on_started(self, job_id: int):
+        job = self.jobs[job_id]
+        job.status = RUNNING
+        self.jobChanged.emit(job_id)
+
+    def _on_finished(self, job_id: int, seconds: float, error: str):
+        job = self.jobs[job_id]
+        job.seconds = seconds
+        job.error = error
+        job.status = FAILED if error else DONE
+        self._active -= 1
+        self._runnables.pop(job_id, None)
+        self.jobChanged.emit(job_id)
@@ -1,40 +1,26 @@
 from __future__ import annotations
 from PyQt6 import QtCore, QtGui, QtWidgets
 from pathlib import Path
-import json, os
+import os
+from generation.config import default_config_path, load_config, save_config
 
 # ---------- config helpers ----------
 def user_config_dir() -> Path:
-    return Path("C:/PDF_Creator")
+    return default_config_path().parent
 
 def user_config_path() -> Path:
-    return user_config_dir() / "config.json"
-
-def ensure_config_dir() -> Path:
-    cfg_dir = user_config_dir()
-    cfg_dir.mkdir(parents=True, exist_ok=True)
-    return cfg_dir
-
-def atomic_write_json(path: Path, data: dict) -> None:
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, path)
+    return default_config_path()
 
 def load_api_path() -> str | None:
-    cfg = user_config_path()
     try:
-        if cfg.exists():
-            return json.loads(cfg.read_text(encoding="utf-8")).get("api_path") or None
+        return load_config().data.get("api_path") or None
     except Exception:
         pass
     return None
 
 def save_api_path(api_path: str) -> Path:
-    cfg_dir = ensure_config_dir()
-    cfg = cfg_dir / "config.json"
-    atomic_write_json(cfg, {"api_path": api_path})
-    return cfg
+    # merge, so other settings in config.json survive
+    return save_config({"api_path": api_path})
 
 
 # ---------- drag & drop field ----------
@@ -242,7 +228,7 @@ QLabel#dropHint{ color:#475569; font-size:13px; padding:6px; border:0px; }
         except PermissionError:
             QtWidgets.QMessageBox.critical(
                 self, "Permission denied",
-                "Windows blocked writing to C:\\PDF_Creator.\n"
+                f"Windows blocked writing to {user_config_dir()}.\n"
                 "Run the app as Administrator or choose another folder."
             )
         except Exception as e: